@@ -0,0 +1,140 @@
+import hashlib
+import os
+import threading
+from datetime import datetime
+from logging import Logger
+
+from src.common.Constants import CHECKPOINT_FOLDER
+from src.common.ThreadLocalLogger import get_current_logger
+
+
+class CheckpointJournal(object):
+    """
+        CheckpointJournal - an append-only journal recording which items of a task's input have been processed,
+        keyed by the task name and the input file.
+        Each processed item appends one line `<status>\t<time>\t<item>` which is flushed and synced to disk
+        straight away, so the journal survives a crash of the tool in the middle of a run.
+        Reading it back, the last status of an item wins.
+        Given the fingerprint of the input items, the journal also records it: a journal written for other items
+        (the sheet was edited, or another file saved under the same name) is started over instead of being resumed.
+    """
+
+    DONE: str = 'DONE'
+    FAILED: str = 'FAILED'
+    INPUT: str = 'INPUT'
+
+    def __init__(self, task_name: str, input_file: str, journal_folder: str = CHECKPOINT_FOLDER,
+                 input_fingerprint: str = None):
+        logger: Logger = get_current_logger()
+        self.__lock: threading.Lock = threading.Lock()
+        self.__item_to_status: dict[str, str] = {}
+        self.__input_fingerprint: str = None
+
+        input_key: str = hashlib.sha1(os.path.abspath(input_file).lower().encode('utf-8')).hexdigest()[:12]
+        self.journal_path: str = os.path.join(journal_folder, '{}_{}.journal'.format(task_name, input_key))
+
+        if not os.path.exists(journal_folder):
+            os.makedirs(journal_folder, exist_ok=True)
+
+        if os.path.exists(self.journal_path):
+            self.__load()
+
+        if input_fingerprint is not None and self.__input_fingerprint is not None \
+                and self.__input_fingerprint != input_fingerprint:
+            logger.info('The input {} changed since checkpoint journal {} was written, start it over'
+                        .format(input_file, self.journal_path))
+            os.remove(self.journal_path)
+            self.__item_to_status = {}
+            self.__input_fingerprint = None
+
+        self.__journal_stream = open(self.journal_path, 'a', encoding='utf-8')
+        if self.__journal_stream.tell() > 0 and not self.__is_ending_with_new_line():
+            # start on a fresh line instead of gluing the next record to a torn one
+            self.__journal_stream.write('\n')
+
+        if input_fingerprint is not None and self.__input_fingerprint is None:
+            self.__append(CheckpointJournal.INPUT, input_fingerprint)
+            self.__input_fingerprint = input_fingerprint
+
+    @staticmethod
+    def fingerprint_of(items: list[str]) -> str:
+        """
+        Identifies the input items, in their order. Only the items count, not the rest of the input file: the
+        statuses a task writes into its own input workbook do not change it
+        """
+        return hashlib.sha1('\n'.join(str(item) for item in items).encode('utf-8')).hexdigest()
+
+    def __is_ending_with_new_line(self) -> bool:
+        with open(self.journal_path, 'rb') as journal_stream:
+            journal_stream.seek(-1, os.SEEK_END)
+            return journal_stream.read(1) == b'\n'
+
+    def __load(self) -> None:
+        with open(self.journal_path, 'r', encoding='utf-8') as journal_stream:
+            for line in journal_stream:
+                tokens: list[str] = line.rstrip('\n').split('\t', 2)
+
+                # a torn last line left by a crash is simply ignored
+                if len(tokens) != 3 or tokens[0] not in (CheckpointJournal.DONE, CheckpointJournal.FAILED,
+                                                         CheckpointJournal.INPUT):
+                    continue
+
+                if tokens[0] == CheckpointJournal.INPUT:
+                    self.__input_fingerprint = tokens[2]
+                    continue
+
+                self.__item_to_status[tokens[2]] = tokens[0]
+
+    def is_done(self, item: str) -> bool:
+        return self.__item_to_status.get(item) == CheckpointJournal.DONE
+
+    def failed_items(self) -> set[str]:
+        return {item for item, status in self.__item_to_status.items() if status == CheckpointJournal.FAILED}
+
+    def pending(self, collection: list, only_failed: bool = False, key_of_element=str) -> list:
+        """
+        Keep the elements a rerun still has to process: everything not done yet or, when only_failed is set,
+        only the elements which failed in the previous runs
+        """
+        return [element for element in collection if self.is_pending(key_of_element(element), only_failed)]
+
+    def is_pending(self, item: str, only_failed: bool = False) -> bool:
+        if only_failed:
+            return self.__item_to_status.get(item) == CheckpointJournal.FAILED
+
+        return not self.is_done(item)
+
+    def mark_done(self, item: str) -> None:
+        self.__append(CheckpointJournal.DONE, item)
+
+    def mark_failed(self, item: str) -> None:
+        self.__append(CheckpointJournal.FAILED, item)
+
+    def __append(self, status: str, item: str) -> None:
+        item = str(item).replace('\n', ' ').replace('\t', ' ')
+        with self.__lock:
+            if status != CheckpointJournal.INPUT:
+                self.__item_to_status[item] = status
+            self.__journal_stream.write('{}\t{}\t{}\n'.format(status, datetime.now().isoformat(), item))
+            self.__journal_stream.flush()
+            os.fsync(self.__journal_stream.fileno())
+
+    def complete(self) -> None:
+        """
+        The run went through the whole collection: forget the journal if nothing failed so the next run starts
+        from the first item again, otherwise keep it for a rerun of the failed items
+        """
+        logger: Logger = get_current_logger()
+        self.close()
+
+        if len(self.failed_items()) == 0:
+            os.remove(self.journal_path)
+            logger.info('All items are done, removed checkpoint journal {}'.format(self.journal_path))
+        else:
+            logger.info('{} failed items are kept in checkpoint journal {}'.format(len(self.failed_items()),
+                                                                                  self.journal_path))
+
+    def close(self) -> None:
+        with self.__lock:
+            if not self.__journal_stream.closed:
+                self.__journal_stream.close()
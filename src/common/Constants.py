@@ -9,3 +9,7 @@ PREFIX_DRIVER_NAME = 'chromedriver-'
 DRIVER_EXTENSION = '.exe'
 
 ZIP_EXTENSION = '.zip'
+
+CHECKPOINT_FOLDER = os.path.join(ROOT_DIR, 'checkpoint')
+
+PDF_TEXT_CACHE_FOLDER = os.path.join(ROOT_DIR, 'cache')
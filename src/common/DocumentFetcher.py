@@ -0,0 +1,113 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, Future
+from logging import Logger
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.common.ThreadLocalLogger import get_current_logger, set_current_logger
+
+
+class DocumentFetcher(object):
+    """
+        DocumentFetcher - downloads documents over plain HTTP with the cookies of a logged-in browser session,
+        bypassing the browser's download manager.
+        All requests share one pooled requests.Session; up to `max_workers` documents are fetched at the same time
+        and each one is streamed to a `.part` file which is renamed to its final name only when it is complete.
+        The credentials given as auth are only sent to auth_host, the other hosts only get the cookies.
+        It supports the with statement so the connection pool is always released.
+    """
+
+    def __init__(self,
+                 cookies: list[dict],
+                 headers: dict[str, str] = None,
+                 auth: tuple[str, str] = None,
+                 auth_host: str = None,
+                 max_workers: int = 4,
+                 timeout: float = 60,
+                 verify: bool = True):
+        self.__max_workers: int = max(1, max_workers)
+        self.__timeout: float = timeout
+
+        self.__session: requests.Session = requests.Session()
+        self.__session.verify = verify
+        # not set on the session: it would go to every url, whatever its host
+        self.__auth: tuple[str, str] = auth
+        self.__auth_host: str = None if auth_host is None else auth_host.lower()
+        if headers is not None:
+            self.__session.headers.update(headers)
+
+        adapter: HTTPAdapter = HTTPAdapter(pool_connections=self.__max_workers,
+                                           pool_maxsize=self.__max_workers,
+                                           max_retries=Retry(total=3, backoff_factor=0.5,
+                                                             status_forcelist=(502, 503, 504)))
+        self.__session.mount('http://', adapter)
+        self.__session.mount('https://', adapter)
+
+        # the cookie dictionaries as returned by selenium's get_cookies()
+        for cookie in cookies:
+            self.__session.cookies.set(name=cookie['name'],
+                                       value=cookie['value'],
+                                       domain=cookie.get('domain', ''),
+                                       path=cookie.get('path', '/'))
+
+    def fetch(self, url: str, file_path: str) -> str:
+        logger: Logger = get_current_logger()
+        part_file_path: str = file_path + '.part'
+
+        with self.__session.get(url, stream=True, timeout=self.__timeout, auth=self.__auth_of(url)) as response:
+            if response.status_code != 200:
+                raise Exception('Can not download {}, the server answered {}'.format(url, response.status_code))
+
+            with open(part_file_path, 'wb') as part_file:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    part_file.write(chunk)
+
+        os.replace(part_file_path, file_path)
+        logger.info('Downloaded {} to {}'.format(url, file_path))
+        return file_path
+
+    def __auth_of(self, url: str) -> tuple[str, str]:
+        if self.__auth is None or self.__auth_host is None or urlparse(url).hostname != self.__auth_host:
+            return None
+
+        return self.__auth
+
+    def fetch_all(self, url_to_file_path: dict[str, str]) -> dict[str, Exception]:
+        """
+        Download every url to its file path, at most max_workers at the same time.
+        Return the urls which could not be downloaded mapped to their error
+        """
+        logger: Logger = get_current_logger()
+
+        def fetch_in_worker(url: str, file_path: str) -> str:
+            set_current_logger(logger)
+            return self.fetch(url, file_path)
+
+        url_to_failure: dict[str, Exception] = {}
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            url_to_future: dict[str, Future] = {url: executor.submit(fetch_in_worker, url, file_path)
+                                                for url, file_path in url_to_file_path.items()}
+
+            for url, future in url_to_future.items():
+                exception: BaseException = future.exception()
+                if exception is not None:
+                    logger.error(str(exception))
+                    url_to_failure[url] = exception
+
+                    part_file_path: str = url_to_file_path[url] + '.part'
+                    if os.path.exists(part_file_path):
+                        os.remove(part_file_path)
+
+        return url_to_failure
+
+    def close(self) -> None:
+        self.__session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
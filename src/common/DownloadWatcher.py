@@ -0,0 +1,166 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from logging import Logger
+
+from src.common.ThreadLocalLogger import get_current_logger
+
+
+class DownloadTimeoutException(Exception):
+    pass
+
+
+class DownloadWatcher(object):
+    """
+        DownloadWatcher - waits for downloaded files to be complete in a folder.
+        A file counts as complete once it exists, is not a partial download (.crdownload, .part, ...) and its non-zero
+        size has not changed for `stable_time` seconds.
+        On Linux the watcher sleeps on inotify and wakes up as soon as a file is written or renamed into the folder,
+        on the other platforms it falls back to polling every `poll_interval` seconds.
+        It supports the with statement so the inotify handle is always released.
+    """
+
+    PARTIAL_DOWNLOAD_EXTENSIONS: tuple[str, ...] = ('.crdownload', '.part', '.partial', '.tmp', '.download')
+
+    # inotify(7) event masks: a file written and closed, moved into or created in the folder
+    __IN_CLOSE_WRITE: int = 0x00000008
+    __IN_MOVED_TO: int = 0x00000080
+    __IN_CREATE: int = 0x00000100
+
+    def __init__(self, folder: str, poll_interval: float = 0.25, stable_time: float = 0.5):
+        self.__folder: str = folder
+        self.__poll_interval: float = poll_interval
+        self.__stable_time: float = stable_time
+        self.__inotify_fd: int = -1
+        # file path -> (size, mtime, first time this exact size/mtime was seen)
+        self.__path_to_observation: dict[str, tuple[int, float, float]] = {}
+
+        if sys.platform.startswith('linux'):
+            self.__inotify_fd = DownloadWatcher.__open_inotify(folder)
+
+    @staticmethod
+    def __open_inotify(folder: str) -> int:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            inotify_fd: int = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if inotify_fd < 0:
+                return -1
+
+            watch_mask: int = (DownloadWatcher.__IN_CLOSE_WRITE | DownloadWatcher.__IN_MOVED_TO
+                               | DownloadWatcher.__IN_CREATE)
+            if libc.inotify_add_watch(inotify_fd, os.fsencode(os.path.abspath(folder)), watch_mask) < 0:
+                os.close(inotify_fd)
+                return -1
+
+            return inotify_fd
+        except (OSError, AttributeError):
+            return -1
+
+    def wait_for_files(self, file_paths: list[str], timeout: float) -> list[str]:
+        """
+        Wait until all the given files are complete, raise DownloadTimeoutException listing the missing ones
+        after `timeout` seconds
+        """
+        logger: Logger = get_current_logger()
+        deadline: float = time.time() + timeout
+        waiting_paths: set[str] = set(file_paths)
+
+        while True:
+            waiting_paths = {file_path for file_path in waiting_paths if not self.__is_complete(file_path)}
+            if len(waiting_paths) == 0:
+                logger.debug('Downloaded completely {} files into {}'.format(len(file_paths), self.__folder))
+                return file_paths
+
+            if time.time() >= deadline:
+                raise DownloadTimeoutException('Waiting too long to download {}'.format(', '.join(waiting_paths)))
+
+            self.__wait_for_change(deadline)
+
+    def wait_for_any_file(self, timeout: float, extension: str = None, ignored_file_names: set[str] = None) -> str:
+        """
+        Wait until any file (ending with `extension` if given, and not in `ignored_file_names`) is complete in the
+        folder and return its name, raise DownloadTimeoutException after `timeout` seconds
+        """
+        deadline: float = time.time() + timeout
+        ignored_file_names = set() if ignored_file_names is None else ignored_file_names
+
+        while True:
+            for file_name in sorted(os.listdir(self.__folder)):
+                if file_name in ignored_file_names:
+                    continue
+
+                if extension is not None and not file_name.lower().endswith(extension.lower()):
+                    continue
+
+                if self.__is_complete(os.path.join(self.__folder, file_name)):
+                    return file_name
+
+            if time.time() >= deadline:
+                raise DownloadTimeoutException('Waiting too long for a download into {}'.format(self.__folder))
+
+            self.__wait_for_change(deadline)
+
+    def __is_complete(self, file_path: str) -> bool:
+        if file_path.lower().endswith(DownloadWatcher.PARTIAL_DOWNLOAD_EXTENSIONS):
+            return False
+
+        try:
+            file_stat: os.stat_result = os.stat(file_path)
+        except OSError:
+            self.__path_to_observation.pop(file_path, None)
+            return False
+
+        if file_stat.st_size == 0:
+            self.__path_to_observation.pop(file_path, None)
+            return False
+
+        for partial_extension in DownloadWatcher.PARTIAL_DOWNLOAD_EXTENSIONS:
+            if os.path.exists(file_path + partial_extension):
+                return False
+
+        now: float = time.time()
+        observation: tuple[int, float, float] = self.__path_to_observation.get(file_path)
+        if observation is None or observation[0] != file_stat.st_size or observation[1] != file_stat.st_mtime:
+            self.__path_to_observation[file_path] = (file_stat.st_size, file_stat.st_mtime, now)
+            return False
+
+        if now - observation[2] < self.__stable_time:
+            return False
+
+        del self.__path_to_observation[file_path]
+        return True
+
+    def __wait_for_change(self, deadline: float) -> None:
+        # a seen but not yet stable file must be re-checked once its stable time is over, even without any event
+        wait_seconds: float = max(0.0, deadline - time.time())
+        if len(self.__path_to_observation) > 0:
+            wait_seconds = min(wait_seconds, self.__stable_time)
+
+        if self.__inotify_fd < 0:
+            time.sleep(min(wait_seconds, self.__poll_interval))
+            return
+
+        readable, _, _ = select.select([self.__inotify_fd], [], [], wait_seconds)
+        if len(readable) > 0:
+            try:
+                while os.read(self.__inotify_fd, 64 * 1024):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        if self.__inotify_fd >= 0:
+            os.close(self.__inotify_fd)
+            self.__inotify_fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
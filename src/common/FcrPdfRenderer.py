@@ -0,0 +1,79 @@
+import os
+
+from fpdf import FPDF
+
+
+class FcrPdfRenderer(object):
+    """
+        FcrPdfRenderer - renders an FCR text file into a PDF with fpdf, one line of text per line of the page,
+        applying the rules of the former FCR macro:
+            the first 3 lines are skipped and the page starts with an empty line
+            the 5th line is cut to 80 characters, a line starting with Receipt to 34 characters
+            the lines starting with 1`1B, `1B or 1 `1 are left empty
+            a line Attachment starts a new page, from the line before it
+    """
+
+    FONT_FAMILY: str = 'Courier'
+
+    def __init__(self, font_size: float = 8, line_height: float = 3.5, margin: float = 10):
+        self.__font_size: float = font_size
+        self.__line_height: float = line_height
+        self.__margin: float = margin
+
+    @staticmethod
+    def rows_of(lines: list[str]) -> list[tuple[str, bool]]:
+        """
+        The rows of the page from the lines of the text file, with whether a new page starts at each row
+        """
+        # the rows are numbered as the cells of the former sheet, from 1
+        row_values: dict[int, str] = {1: ''}
+        page_break_rows: set[int] = set()
+        for line_number, line in enumerate(lines, start=1):
+            if line_number < 4:
+                continue
+
+            row: int = line_number - 2
+            value: str = line.strip()
+            row_values[row] = value
+            if line_number == 5:
+                row_values[row] = value[:80]
+            if value.strip()[:4] in ["1`1B", "`1B", "1 `1"]:
+                row_values[row] = ""
+            if value.strip()[:11] == "Attachment":
+                page_break_rows.add(row - 1)
+            if value.strip()[:7] == "Receipt":
+                row_values[row] = value[:34]
+
+        return [(row_values[row], row in page_break_rows and row > 1) for row in sorted(row_values.keys())]
+
+    def render(self, txt_path: str, pdf_path: str) -> str:
+        with open(txt_path, 'r', encoding='cp1252', errors='replace') as txt_file:
+            # only CR / LF end a line, as for the macro: str.splitlines would also split on the form feeds and the
+            # other control characters of the print files, and shift the line numbers the rules rely on
+            lines: list[str] = [line.rstrip('\n') for line in txt_file]
+
+        pdf: FPDF = FPDF(orientation='P', unit='mm', format='A4')
+        pdf.set_margins(self.__margin, self.__margin, self.__margin)
+        pdf.set_auto_page_break(True, self.__margin)
+        pdf.add_page()
+        pdf.set_font(FcrPdfRenderer.FONT_FAMILY, size=self.__font_size)
+
+        for value, is_starting_page in FcrPdfRenderer.rows_of(lines):
+            if is_starting_page:
+                pdf.add_page()
+            # the core fonts of fpdf are latin-1
+            pdf.cell(0, self.__line_height, value.encode('latin-1', 'replace').decode('latin-1'), ln=1)
+
+        pdf.output(pdf_path, 'F')
+        return pdf_path
+
+
+def render_fcr_text_file(txt_path: str, pdf_path: str, font_size: float = 8) -> str:
+    """
+    Render one FCR text file into a PDF, only takes and returns picklable values so it can run in a worker process
+    """
+    output_folder: str = os.path.dirname(pdf_path)
+    if output_folder != '' and not os.path.exists(output_folder):
+        os.makedirs(output_folder, exist_ok=True)
+
+    return FcrPdfRenderer(font_size=font_size).render(txt_path, pdf_path)
@@ -1,13 +1,15 @@
 import copy
 import os
 import re
+import shutil
+import threading
 import zipfile
 from datetime import datetime, timedelta
 from logging import Logger
 from typing import Callable
 
 import openpyxl
-from openpyxl.cell.cell import Cell
+from openpyxl.utils import column_index_from_string
 from openpyxl.workbook.workbook import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
 
@@ -57,58 +59,130 @@ def load_key_value_from_file_properties(setting_file: str) -> dict[str, str]:
         return settings
 
 
-def get_excel_data_in_column_start_at_row(file_path, sheet_name, start_cell) -> list[str]:
-    logger: Logger = get_current_logger()
-    column: str = 'A'
-    start_row: int = 0
+class ExcelInputRecord(object):
+    """
+        One row of an input sheet: its row number and the value of each requested column, None when the cell is empty
+    """
 
-    result = re.search('([a-zA-Z]+)(\d+)', start_cell)
-    if result:
-        column = result.group(1)
-        start_row = int(result.group(2))
-    else:
+    def __init__(self, row: int, values: dict[str, str]):
+        self.row: int = row
+        self.values: dict[str, str] = values
+
+    def __getitem__(self, name: str) -> str:
+        return self.values[name]
+
+    def is_complete(self) -> bool:
+        return all(value is not None for value in self.values.values())
+
+    def __repr__(self) -> str:
+        return 'ExcelInputRecord(row={}, values={})'.format(self.row, self.values)
+
+
+# (absolute path, sheet) -> (modification time, size, values of all the rows of the sheet)
+_sheet_values_cache: dict[tuple[str, str], tuple[int, int, list[tuple]]] = {}
+_sheet_values_cache_lock: threading.Lock = threading.Lock()
+
+
+def _parse_start_cell(start_cell: str) -> tuple[str, int]:
+    result = re.search('([a-zA-Z]+)(\\d+)', start_cell)
+    if not result:
         raise Exception("Not match excel cell position format")
 
+    return result.group(1), int(result.group(2))
+
+
+def _get_sheet_values(file_path: str, sheet_name: str) -> list[tuple]:
+    """
+    All the cell values of the sheet, read in one read-only pass and kept until the file is modified
+    """
+    logger: Logger = get_current_logger()
+    cache_key: tuple[str, str] = (os.path.abspath(file_path), sheet_name)
+
+    with _sheet_values_cache_lock:
+        file_stat: os.stat_result = os.stat(file_path)
+        cached: tuple[int, int, list[tuple]] = _sheet_values_cache.get(cache_key)
+        if cached is not None and cached[0] == file_stat.st_mtime_ns and cached[1] == file_stat.st_size:
+            logger.debug('Reuse the cached data of file {} at sheet {}'.format(file_path, sheet_name))
+            return cached[2]
+
+        with ResourceLock(file_path=file_path):
+            workbook: Workbook = openpyxl.load_workbook(filename=file_path, read_only=True, data_only=True)
+            try:
+                worksheet: Worksheet = workbook[sheet_name]
+                sheet_values: list[tuple] = list(worksheet.iter_rows(values_only=True))
+            finally:
+                workbook.close()
+
+        _sheet_values_cache[cache_key] = (file_stat.st_mtime_ns, file_stat.st_size, sheet_values)
+        return sheet_values
+
+
+def get_excel_records_start_at_row(file_path: str,
+                                   sheet_name: str,
+                                   name_to_start_cell: dict[str, str]) -> list[ExcelInputRecord]:
+    """
+    Read several columns of a sheet at once, e.g. {'so': 'B2', 'becode': 'C2'}: every column is collected from its own
+    start cell down and the values stay aligned on their Excel row. Rows where all the requested cells are empty are
+    left out
+    """
+    logger: Logger = get_current_logger()
     file_path = r'{}'.format(file_path)
-    logger.info(
-        r"Read data from file {} at sheet {}, collect all data at column {} start from row {}".format(
-            file_path, sheet_name, column, start_row))
 
-    with ResourceLock(file_path=file_path):
+    name_to_column_index: dict[str, int] = {}
+    name_to_start_row: dict[str, int] = {}
+    for name, start_cell in name_to_start_cell.items():
+        column, start_row = _parse_start_cell(start_cell)
+        name_to_column_index[name] = column_index_from_string(column.upper()) - 1
+        name_to_start_row[name] = start_row
 
-        workbook: Workbook = openpyxl.load_workbook(filename=r'{}'.format(file_path), data_only=True, keep_vba=True)
-        worksheet: Worksheet = workbook[sheet_name]
+    logger.info(r"Read data from file {} at sheet {}, collect all data at {}".format(file_path, sheet_name,
+                                                                                     name_to_start_cell))
 
-        values: list[str] = []
-        runner: int = 0
-        max_index = start_row - 1
-        for cell in worksheet[column]:
-            cell: Cell = cell
+    records: list[ExcelInputRecord] = []
+    for row_index, row_values in enumerate(_get_sheet_values(file_path, sheet_name), start=1):
 
-            if runner < max_index:
-                runner += 1
+        values: dict[str, str] = {}
+        for name, column_index in name_to_column_index.items():
+            value = row_values[column_index] if column_index < len(row_values) else None
+            if row_index < name_to_start_row[name] or value is None:
+                values[name] = None
                 continue
 
-            if cell.value is None:
-                continue
+            values[name] = str(value)
 
-            values.append(str(cell.value))
-            runner += 1
+        if all(value is None for value in values.values()):
+            continue
 
-        if len(values) == 0:
-            logger.error(
-                r'Not containing any data from file {} at sheet {} at column {} start from row {}'.format(
-                    file_path, sheet_name, column, start_row))
-            raise Exception("Not containing required data in the specified place in file Excel")
+        records.append(ExcelInputRecord(row=row_index, values=values))
 
-        logger.info('Collect data from excel file successfully')
-        return values
+    if len(records) == 0:
+        logger.error(r'Not containing any data from file {} at sheet {} at {}'.format(file_path, sheet_name,
+                                                                                     name_to_start_cell))
+        raise Exception("Not containing required data in the specified place in file Excel")
+
+    logger.info('Collect data from excel file successfully')
+    return records
+
+
+def get_excel_data_in_column_start_at_row(file_path, sheet_name, start_cell) -> list[str]:
+    records: list[ExcelInputRecord] = get_excel_records_start_at_row(file_path, sheet_name, {'value': start_cell})
+    return [record['value'] for record in records]
 
 
 def extract_zip(zip_file_path: str,
                 extracted_dir: str,
                 callback_on_root_folder: Callable[[str], None],
-                callback_on_extracted_folder: Callable[[str], None]) -> None:
+                callback_on_extracted_folder: Callable[[str], None],
+                member_filter: Callable[[str], bool] = None,
+                member_name_mapping: Callable[[str], str] = None,
+                extracted_folder_name: str = None) -> None:
+    """
+    Extract the zip into a folder of extracted_dir named after the zip (or extracted_folder_name), then delete it.
+    With a member_filter only the members it accepts (by their name in the zip) are extracted, and with a
+    member_name_mapping each one is streamed straight to the file name it gives, relative to the extracted folder,
+    so the unwanted members never land on the disk and nothing has to be renamed afterwards. Members mapped to a
+    name already taken in this extraction get a _2, _3... suffix rather than overwrite each other
+    """
     logger: Logger = get_current_logger()
     if not os.path.isfile(zip_file_path) or not zip_file_path.lower().endswith('.zip'):
         raise Exception('{} is not a zip file'.format(zip_file_path))
@@ -117,20 +191,39 @@ def extract_zip(zip_file_path: str,
     file_name_contain_extension: str = zip_file_path.split('/')[-1]
     clean_file_name: str = file_name_contain_extension.split('.')[0]
 
-    if not extracted_dir.endswith('/') and not extracted_dir.endswith('\\'):
-        extracted_dir += '\\'
+    if extracted_folder_name is not None:
+        extracted_dir = os.path.join(extracted_dir, extracted_folder_name)
+        os.makedirs(extracted_dir, exist_ok=True)
+    else:
+        if not extracted_dir.endswith('/') and not extracted_dir.endswith('\\'):
+            extracted_dir += '\\'
 
-    if clean_file_name not in extracted_dir:
-        extracted_dir = r'{}{}'.format(extracted_dir, clean_file_name)
-        if not os.path.exists(extracted_dir):
-            os.mkdir(extracted_dir)
+        if clean_file_name not in extracted_dir:
+            extracted_dir = r'{}{}'.format(extracted_dir, clean_file_name)
+            if not os.path.exists(extracted_dir):
+                os.mkdir(extracted_dir)
 
     logger.debug(r'Start extracting file {} into {}'.format(zip_file_path, extracted_dir))
 
     with ResourceLock(file_path=zip_file_path):
         with ResourceLock(file_path=extracted_dir):
             with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                zip_ref.extractall(extracted_dir)
+                if member_filter is None and member_name_mapping is None:
+                    zip_ref.extractall(extracted_dir)
+                else:
+                    extracted_names: set[str] = set()
+                    for member in zip_ref.infolist():
+                        if member.is_dir() or (member_filter is not None and not member_filter(member.filename)):
+                            continue
+
+                        target_name: str = member.filename if member_name_mapping is None \
+                            else member_name_mapping(member.filename)
+                        unique_name: str = _unique_name_of(target_name, extracted_names)
+                        if unique_name != target_name:
+                            logger.warning('{} of {} is extracted as {}, {} is already taken'
+                                           .format(member.filename, zip_file_path, unique_name, target_name))
+                        extracted_names.add(unique_name.lower())
+                        _stream_zip_member(zip_ref, member, extracted_dir, unique_name)
 
     if callback_on_extracted_folder is not None:
         callback_on_extracted_folder(extracted_dir)
@@ -143,6 +236,32 @@ def extract_zip(zip_file_path: str,
         callback_on_root_folder(current_dir)
 
 
+def _unique_name_of(target_name: str, taken_names: set[str]) -> str:
+    # the taken names are lower case, the file systems on Windows don't tell the case apart
+    stem, extension = os.path.splitext(target_name)
+    unique_name: str = target_name
+    suffix: int = 2
+    while unique_name.lower() in taken_names:
+        unique_name = '{}_{}{}'.format(stem, suffix, extension)
+        suffix += 1
+
+    return unique_name
+
+
+def _stream_zip_member(zip_ref: zipfile.ZipFile, member: zipfile.ZipInfo, extracted_dir: str,
+                        target_name: str) -> None:
+    target_path: str = os.path.abspath(os.path.join(extracted_dir, target_name))
+    if os.path.commonpath([target_path, os.path.abspath(extracted_dir)]) != os.path.abspath(extracted_dir):
+        raise Exception('The member {} would be extracted out of {}'.format(member.filename, extracted_dir))
+
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    # written aside then moved, the final name only ever holds a complete file
+    partial_path: str = target_path + '.part'
+    with zip_ref.open(member, 'r') as source, open(partial_path, 'wb') as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+    os.replace(partial_path, target_path)
+
+
 def check_parent_folder_contain_all_required_sub_folders(parent_folder: str,
                                                          required_sub_folders: set[str]) -> (bool, set[str], set[str]):
     contained_set: set[str] = set()
@@ -0,0 +1,24 @@
+import os
+
+from PyPDF2 import PdfMerger
+
+
+def merge_pdfs_into_file(pdf_paths: list[str], output_file: str) -> str:
+    """
+    Merge the PDFs, in the given order, into the output file (replaced if it exists) and return its path.
+    Only takes and returns picklable values, so it can run in a worker process
+    """
+    merger = PdfMerger()
+    try:
+        for pdf_path in pdf_paths:
+            merger.append(pdf_path)
+
+        if os.path.exists(output_file):
+            os.remove(output_file)
+
+        with open(output_file, 'wb') as output:
+            merger.write(output)
+    finally:
+        merger.close()
+
+    return output_file
@@ -1,3 +1,4 @@
+import threading
 from abc import ABC
 
 from src.observer.EventBroker import EventBroker
@@ -10,6 +11,7 @@ class Percentage(ABC):
         super().__init__()
         self.total_element_size = -1
         self.__current_element_count = 0
+        self.__current_element_count_lock = threading.Lock()
 
     @property
     def current_element_count(self) -> int:
@@ -25,6 +27,11 @@ class Percentage(ABC):
                                            event=PercentChangedEvent(task_name=self.__class__.__name__,
                                                                      current_percent=self._get_current_percentage()))
 
+    def increase_current_element_count(self, step: int = 1) -> None:
+        # Several worker threads could finish their elements at the same time, the read-then-write must be atomic
+        with self.__current_element_count_lock:
+            self.current_element_count = self.__current_element_count + step
+
     @property
     def __class__(self):
         return super().__class__
@@ -0,0 +1,58 @@
+import os
+from bisect import bisect_left, insort
+
+
+class PrefixIndex(object):
+    """
+        PrefixIndex - the file names of a folder listed once and sorted, so the files starting with a prefix are found
+        by a binary search instead of a new listing of the folder.
+        The files found are returned in the order of the listing, as os.listdir would have given them.
+        The index only knows the changes made through it (rename, add, remove).
+    """
+
+    def __init__(self, folder: str):
+        self.folder: str = folder
+        self.__position_of_name: dict[str, int] = {}
+        for position, file_name in enumerate(os.listdir(folder)):
+            self.__position_of_name[file_name] = position
+        self.__sorted_names: list[str] = sorted(self.__position_of_name.keys())
+        self.__next_position: int = len(self.__position_of_name)
+
+    def names(self) -> list[str]:
+        return sorted(self.__position_of_name.keys(), key=self.__position_of_name.get)
+
+    def names_starting_with(self, prefix: str) -> list[str]:
+        matching_names: list[str] = []
+        index: int = bisect_left(self.__sorted_names, prefix)
+        while index < len(self.__sorted_names) and self.__sorted_names[index].startswith(prefix):
+            matching_names.append(self.__sorted_names[index])
+            index += 1
+
+        return sorted(matching_names, key=self.__position_of_name.get)
+
+    def count_starting_with(self, prefix: str, extensions: tuple[str, ...] = None) -> int:
+        return sum(1 for file_name in self.names_starting_with(prefix)
+                   if extensions is None or file_name.endswith(extensions))
+
+    def add(self, file_name: str) -> None:
+        if file_name in self.__position_of_name:
+            return
+
+        self.__position_of_name[file_name] = self.__next_position
+        self.__next_position += 1
+        insort(self.__sorted_names, file_name)
+
+    def remove(self, file_name: str) -> None:
+        if self.__position_of_name.pop(file_name, None) is not None:
+            self.__sorted_names.pop(bisect_left(self.__sorted_names, file_name))
+
+    def rename(self, old_file_name: str, new_file_name: str) -> None:
+        """
+        Rename the file on disk and in the index, where it keeps its place in the listing order
+        """
+        os.rename(os.path.join(self.folder, old_file_name), os.path.join(self.folder, new_file_name))
+        self.remove(new_file_name)
+        position: int = self.__position_of_name.pop(old_file_name)
+        self.__sorted_names.pop(bisect_left(self.__sorted_names, old_file_name))
+        self.__position_of_name[new_file_name] = position
+        insort(self.__sorted_names, new_file_name)
@@ -28,10 +28,10 @@ class ResumableThread(threading.Thread):
     def resume(self):
         with self.pause_condition:
             self.paused = False
-            self.pause_condition.notify()
+            self.pause_condition.notify_all()
 
     def terminate(self):
         self.terminated = True
         with self.pause_condition:
             self.paused = False
-            self.pause_condition.notify()
+            self.pause_condition.notify_all()
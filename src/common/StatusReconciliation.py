@@ -0,0 +1,97 @@
+import os
+from logging import Logger
+from typing import Callable
+
+import openpyxl
+from openpyxl.workbook.workbook import Workbook
+from openpyxl.worksheet.worksheet import Worksheet
+
+from src.common.ResourceLock import ResourceLock
+from src.common.ThreadLocalLogger import get_current_logger
+
+
+class StatusReconciliation(object):
+    """
+        StatusReconciliation - the post-run check of what a task has produced.
+        The output folder is scanned once into an index of names, then every input key is matched against it through
+        `produced_names_of_key` (the file or folder names which prove the key has been processed).
+        The statuses can be written back into a status column of a workbook, all rows at once and saved one time.
+    """
+
+    DONE: str = 'Done'
+    MISSING: str = 'Missing'
+
+    def __init__(self,
+                 produced_folder: str,
+                 produced_names_of_key: Callable[[str], list[str]] = lambda key: [key],
+                 only_folders: bool = False):
+        self.__produced_folder: str = produced_folder
+        self.__produced_names_of_key: Callable[[str], list[str]] = produced_names_of_key
+        self.__only_folders: bool = only_folders
+        self.__produced_names: set[str] = None
+
+    def __index_produced_names(self) -> set[str]:
+        if self.__produced_names is None:
+            with os.scandir(self.__produced_folder) as entries:
+                self.__produced_names = {entry.name for entry in entries
+                                         if not self.__only_folders or entry.is_dir()}
+        return self.__produced_names
+
+    def is_produced(self, key: str) -> bool:
+        produced_names: set[str] = self.__index_produced_names()
+        return any(name in produced_names for name in self.__produced_names_of_key(key))
+
+    def reconcile(self, keys: list[str]) -> tuple[list[str], list[str]]:
+        """
+        Split the keys into the produced ones and the missing ones, both in the input order
+        """
+        produced_keys: list[str] = []
+        missing_keys: list[str] = []
+        for key in keys:
+            if self.is_produced(key):
+                produced_keys.append(key)
+            else:
+                missing_keys.append(key)
+
+        return produced_keys, missing_keys
+
+    def write_statuses(self,
+                       excel_path: str,
+                       sheet_name: str,
+                       key_start_cell: str,
+                       status_column: str,
+                       output_path: str = None) -> tuple[int, int]:
+        """
+        Write Done / Missing next to every key of the column starting at key_start_cell (e.g. A2), into the status
+        column of the same row, and save the workbook once, into output_path when given. The rows without a key are
+        left as they are.
+        Return the number of Done and Missing rows
+        """
+        logger: Logger = get_current_logger()
+        output_path = excel_path if output_path is None else output_path
+        key_column: str = key_start_cell.rstrip('0123456789')
+        start_row: int = int(key_start_cell[len(key_column):])
+
+        done_count: int = 0
+        missing_count: int = 0
+        with ResourceLock(file_path=excel_path):
+            workbook: Workbook = openpyxl.load_workbook(filename=excel_path,
+                                                        keep_vba=excel_path.lower().endswith('.xlsm'))
+            worksheet: Worksheet = workbook[sheet_name]
+
+            for cell in worksheet[key_column][start_row - 1:]:
+                if cell.value is None or str(cell.value).strip() == '':
+                    continue
+
+                if self.is_produced(str(cell.value)):
+                    worksheet['{}{}'.format(status_column, cell.row)] = StatusReconciliation.DONE
+                    done_count += 1
+                else:
+                    worksheet['{}{}'.format(status_column, cell.row)] = StatusReconciliation.MISSING
+                    missing_count += 1
+
+            workbook.save(output_path)
+            workbook.close()
+
+        logger.info('Wrote {} Done and {} Missing statuses into {}'.format(done_count, missing_count, output_path))
+        return done_count, missing_count
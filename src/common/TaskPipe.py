@@ -0,0 +1,114 @@
+import threading
+from collections import deque
+from typing import Callable
+
+
+class TaskPipe(object):
+    """
+        TaskPipe - a bounded queue handing the elements produced by one task over to the next task of a pipeline.
+        The producer blocks on put() while `max_size` elements are waiting, so a fast stage can not run away from a
+        slow one. The consumer iterates over the pipe, the iteration ends once the producer has closed the pipe and
+        every element has been taken.
+        len() is the number of elements the consumer should expect, as announced by the producer through
+        expected_size, or the number of elements received so far when that is bigger. A consumer which needs it
+        before its first element waits for the announcement with wait_for_expected_size().
+    """
+
+    def __init__(self, max_size: int = 8):
+        self.__max_size: int = max(1, max_size)
+        self.__elements: deque = deque()
+        self.__condition: threading.Condition = threading.Condition()
+        self.__closed: bool = False
+        self.__abandoned: bool = False
+        self.__received_count: int = 0
+        self.__expected_size: int = 0
+        self.__is_expected_size_announced: bool = False
+        self.__predicate: Callable[[object], bool] = None
+
+    @property
+    def expected_size(self) -> int:
+        return self.__expected_size
+
+    @expected_size.setter
+    def expected_size(self, new_value: int) -> None:
+        with self.__condition:
+            self.__expected_size = new_value
+            self.__is_expected_size_announced = True
+            self.__condition.notify_all()
+
+    @property
+    def is_expected_size_announced(self) -> bool:
+        return self.__is_expected_size_announced
+
+    def wait_for_expected_size(self) -> int:
+        """
+        Wait until the producer has announced how many elements to expect, or closed the pipe without doing it
+        """
+        with self.__condition:
+            while not self.__is_expected_size_announced and not self.__closed and not self.__abandoned:
+                self.__condition.wait()
+
+        return len(self)
+
+    def put(self, element) -> None:
+        """
+        Hand an element over to the consumer, waiting while the pipe is full.
+        The element is dropped when the consumer has abandoned the pipe
+        """
+        with self.__condition:
+            while len(self.__elements) >= self.__max_size and not self.__abandoned:
+                self.__condition.wait()
+
+            if self.__abandoned:
+                return
+
+            if self.__closed:
+                raise Exception('Can not put {} into a closed pipe'.format(element))
+
+            self.__elements.append(element)
+            self.__condition.notify_all()
+
+    def close(self) -> None:
+        """
+        The producer will not put anything more
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+    def abandon(self) -> None:
+        """
+        The consumer will not take anything more, a producer blocked on put() is released
+        """
+        with self.__condition:
+            self.__abandoned = True
+            self.__elements.clear()
+            self.__condition.notify_all()
+
+    def keep_only(self, predicate: Callable[[object], bool]) -> None:
+        """
+        Skip the elements not satisfying the predicate, they are not counted in the expected size anymore
+        """
+        self.__predicate = predicate
+
+    def __iter__(self):
+        while True:
+            with self.__condition:
+                while len(self.__elements) == 0 and not self.__closed and not self.__abandoned:
+                    self.__condition.wait()
+
+                if len(self.__elements) == 0:
+                    return
+
+                element = self.__elements.popleft()
+                self.__condition.notify_all()
+
+            if self.__predicate is not None and not self.__predicate(element):
+                self.__expected_size -= 1
+                continue
+
+            self.__received_count += 1
+            yield element
+
+    def __len__(self) -> int:
+        return max(self.__expected_size, self.__received_count)
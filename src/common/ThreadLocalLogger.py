@@ -18,6 +18,12 @@ def create_thread_local_logger(class_name: str, thread_uuid: str, logging_consol
     return thread_local_logger.logger
 
 
+def set_current_logger(logger: Logger) -> Logger:
+    # Let a helper thread keep writing into the logger of the task which spawned it
+    thread_local_logger.logger = logger
+    return thread_local_logger.logger
+
+
 def get_current_logger() -> Logger:
     if not hasattr(thread_local_logger, 'logger'):
         default_logger: Logger = logging.getLogger('DefaultLogger')
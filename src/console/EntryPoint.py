@@ -1,4 +1,5 @@
 import os
+import sys
 import threading
 from logging import Logger
 from threading import Thread
@@ -8,15 +9,42 @@ from src.common.FileUtil import load_key_value_from_file_properties
 from src.common.ReflectionUtil import create_task_instance
 from src.common.StringUtil import validate_keys_of_dictionary
 from src.common.ThreadLocalLogger import get_current_logger
+from src.console.ProcessTaskRunner import run_tasks_in_processes
+from src.console.TaskPipelineRunner import run_tasks_in_pipeline, parse_pipeline
+from src.excel_reader_provider.ExcelIOService import ExcelIOService
+from src.setup.WebDriverBroker import WebDriverBroker
 from src.task.AutomatedTask import AutomatedTask
 
 if __name__ == "__main__":
 
     setting_file: str = os.path.join(ROOT_DIR, 'input', 'InvokedClasses.properties')
     settings: dict[str, str] = load_key_value_from_file_properties(setting_file)
-    validate_keys_of_dictionary(settings, {'invoked_classes', 'run.sequentially'})
+
+    # pipeline = Producer -> Consumer runs the stages together, each SO produced is consumed straight away
+    if settings.get('pipeline') is not None:
+        queue_size: int = 8 if settings.get('pipeline.queue.size') is None else int(settings['pipeline.queue.size'])
+        run_tasks_in_pipeline(parse_pipeline(settings['pipeline']), queue_size)
+        ExcelIOService.shutdown()
+        sys.exit(0)
+
+    validate_keys_of_dictionary(settings, {'invoked_classes'})
     defined_classes: list[str] = [class_name.strip() for class_name in settings['invoked_classes'].split(',')]
-    run_sequentially: bool = 'True'.lower() == str(settings['run.sequentially']).lower()
+    run_sequentially: bool = 'True'.lower() == str(settings.get('run.sequentially')).lower()
+
+    # run.mode = sequential / thread / process, falling back on run.sequentially when it is not given
+    run_mode: str = 'sequential' if run_sequentially else 'thread'
+    if settings.get('run.mode') is not None:
+        run_mode = settings['run.mode'].strip().lower()
+        run_sequentially = run_mode == 'sequential'
+
+    if run_mode == 'process':
+        max_workers: int = os.cpu_count() if settings.get('run.max_workers') is None \
+            else max(1, int(settings['run.max_workers']))
+        run_tasks_in_processes(defined_classes, max_workers)
+        sys.exit(0)
+
+    # sequential browser tasks hand their warm browser session over to the next one
+    driver_broker: WebDriverBroker = WebDriverBroker()
 
     running_threads: list[Thread] = []
     for invoked_class in defined_classes:
@@ -30,6 +58,7 @@ if __name__ == "__main__":
         automated_task: AutomatedTask = create_task_instance(settings, invoked_class, None)
 
         if run_sequentially:
+            automated_task.driver_broker = driver_broker
             automated_task.perform()
             continue
 
@@ -41,3 +70,6 @@ if __name__ == "__main__":
 
     for thread in running_threads:
         thread.join(timeout=60 * 60)
+
+    driver_broker.shutdown()
+    ExcelIOService.shutdown()
@@ -0,0 +1,109 @@
+import logging
+import multiprocessing
+import os
+import sys
+from logging import Logger, Handler, Formatter
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from multiprocessing.connection import wait
+from multiprocessing.context import SpawnProcess
+
+from src.common.Constants import ROOT_DIR, LOG_FOLDER
+from src.common.FileUtil import load_key_value_from_file_properties
+from src.common.ReflectionUtil import create_task_instance
+from src.common.ThreadLocalLogger import get_current_logger
+from src.excel_reader_provider.ExcelIOService import ExcelIOService
+from src.observer.Event import Event
+from src.observer.EventBroker import EventBroker
+from src.observer.EventHandler import EventHandler
+from src.observer.PercentChangedEvent import PercentChangedEvent
+from src.task.AutomatedTask import AutomatedTask
+
+PROGRESS_LOGGER_NAME = 'Progress'
+
+
+class ProgressForwarder(EventHandler):
+    """
+        Turns the PercentChangedEvent of a task running in a worker process into a log record,
+        so the progress travels to the parent process through the same queue as the logs
+    """
+
+    def handle_incoming_event(self, event: Event) -> None:
+        if isinstance(event, PercentChangedEvent):
+            logging.getLogger(PROGRESS_LOGGER_NAME).info('{} {}%'.format(event.task_name,
+                                                                          round(event.current_percent)))
+
+
+def perform_task_in_worker_process(invoked_class: str, log_queue: multiprocessing.Queue) -> None:
+    # every record of the worker, whatever its logger, also reaches the parent process
+    root_logger: Logger = logging.getLogger()
+    root_logger.addHandler(QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+
+    EventBroker.get_instance().subscribe(topic=PercentChangedEvent.event_name, observer=ProgressForwarder())
+
+    try:
+        setting_file: str = os.path.join(ROOT_DIR, 'input', '{}.properties'.format(invoked_class))
+        settings: dict[str, str] = load_key_value_from_file_properties(setting_file)
+        settings['invoked_class'] = invoked_class
+        automated_task: AutomatedTask = create_task_instance(settings, invoked_class, None)
+        automated_task.perform()
+    except Exception:
+        root_logger.exception('Task {} stopped with an unexpected error'.format(invoked_class))
+        raise
+    finally:
+        # the Excel session of the worker is not left behind by its daemon thread
+        ExcelIOService.shutdown()
+
+
+def run_tasks_in_processes(invoked_classes: list[str], max_workers: int) -> None:
+    """
+    Run each task in its own worker process, at most max_workers at the same time.
+    The logs of all workers are collected into log/ProcessTaskRunner.log and their progress is shown on the console.
+    A worker which crashes is reported and does not stop the others
+    """
+    logger: Logger = get_current_logger()
+    spawn_context = multiprocessing.get_context('spawn')
+    log_queue: multiprocessing.Queue = spawn_context.Queue()
+
+    if not os.path.exists(LOG_FOLDER):
+        os.mkdir(LOG_FOLDER)
+
+    central_file_handler: Handler = RotatingFileHandler(filename=os.path.join(LOG_FOLDER, 'ProcessTaskRunner.log'),
+                                                        maxBytes=1024 * 1000 * 10,
+                                                        backupCount=3)
+    central_file_handler.setFormatter(Formatter('%(processName)s - %(asctime)s - %(levelname)s - %(name)s '
+                                                '%(filename)s %(funcName)s#%(lineno)d: %(message)s'))
+    progress_console_handler: Handler = logging.StreamHandler(sys.stdout)
+    progress_console_handler.addFilter(logging.Filter(PROGRESS_LOGGER_NAME))
+    progress_console_handler.setFormatter(Formatter('%(processName)s - progress %(message)s'))
+
+    log_listener: QueueListener = QueueListener(log_queue, central_file_handler, progress_console_handler,
+                                                respect_handler_level=True)
+    log_listener.start()
+
+    pending_classes: list[str] = list(invoked_classes)
+    sentinel_to_process: dict[int, SpawnProcess] = {}
+    try:
+        while len(pending_classes) > 0 or len(sentinel_to_process) > 0:
+
+            while len(pending_classes) > 0 and len(sentinel_to_process) < max_workers:
+                invoked_class: str = pending_classes.pop(0)
+                process: SpawnProcess = spawn_context.Process(target=perform_task_in_worker_process,
+                                                              args=(invoked_class, log_queue),
+                                                              name=invoked_class,
+                                                              daemon=False)
+                process.start()
+                sentinel_to_process[process.sentinel] = process
+                logger.info('Started {} in worker process {}'.format(invoked_class, process.pid))
+
+            for sentinel in wait(list(sentinel_to_process.keys())):
+                process: SpawnProcess = sentinel_to_process.pop(sentinel)
+                process.join()
+                if process.exitcode == 0:
+                    logger.info('Worker process of {} finished'.format(process.name))
+                else:
+                    logger.error('Worker process of {} crashed with exit code {}'.format(process.name,
+                                                                                      process.exitcode))
+    finally:
+        log_listener.stop()
+        central_file_handler.close()
@@ -0,0 +1,48 @@
+import os
+import threading
+from logging import Logger
+from threading import Thread
+
+from src.common.Constants import ROOT_DIR
+from src.common.FileUtil import load_key_value_from_file_properties
+from src.common.ReflectionUtil import create_task_instance
+from src.common.TaskPipe import TaskPipe
+from src.common.ThreadLocalLogger import get_current_logger
+from src.task.AutomatedTask import AutomatedTask
+
+
+def parse_pipeline(pipeline: str) -> list[str]:
+    # e.g. 'Download_CottonOn -> Upload'
+    return [stage.strip() for stage in pipeline.split('->') if stage.strip() != '']
+
+
+def run_tasks_in_pipeline(stage_classes: list[str], queue_size: int) -> None:
+    """
+    Run all the stages of the pipeline at the same time, each one in its own thread.
+    Every stage hands its output over to the next one through a bounded TaskPipe, so the whole pipeline takes about
+    as long as its slowest stage
+    """
+    logger: Logger = get_current_logger()
+    if len(stage_classes) < 2:
+        raise Exception('A pipeline needs at least a producer and a consumer, got {}'.format(stage_classes))
+
+    stage_tasks: list[AutomatedTask] = []
+    for stage_class in stage_classes:
+        setting_file: str = os.path.join(ROOT_DIR, 'input', '{}.properties'.format(stage_class))
+        settings: dict[str, str] = load_key_value_from_file_properties(setting_file)
+        settings['invoked_class'] = stage_class
+        stage_tasks.append(create_task_instance(settings, stage_class, None))
+
+    for producer, consumer in zip(stage_tasks, stage_tasks[1:]):
+        task_pipe: TaskPipe = TaskPipe(max_size=queue_size)
+        producer.output_pipe = task_pipe
+        consumer.input_pipe = task_pipe
+
+    logger.info('Run the pipeline {}'.format(' -> '.join(stage_classes)))
+    stage_threads: list[Thread] = [threading.Thread(target=stage_task.perform, daemon=False)
+                                   for stage_task in stage_tasks]
+    for stage_thread in stage_threads:
+        stage_thread.start()
+
+    for stage_thread in stage_threads:
+        stage_thread.join()
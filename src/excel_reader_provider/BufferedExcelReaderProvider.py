@@ -0,0 +1,172 @@
+import threading
+import time
+from logging import Logger
+
+from src.common.ThreadLocalLogger import get_current_logger
+from src.excel_reader_provider.ExcelReaderProvider import ExcelReaderProvider
+
+
+class BufferedExcelReaderProvider(ExcelReaderProvider):
+    """
+        BufferedExcelReaderProvider - a write-behind layer on top of another ExcelReaderProvider.
+        Cell changes are collected in memory and only reach the underlying provider when the workbook is really saved:
+        contiguous cells are merged into rectangular blocks, each one written by a single change_values_at call.
+        save() marks the end of an item, the workbook is really saved every `save_every` items and/or every
+        `save_interval` seconds (both 0: only when it is closed). close() always flushes and saves what is pending.
+    """
+
+    def __init__(self, provider: ExcelReaderProvider, save_every: int = 1, save_interval: float = 0):
+        self.__provider: ExcelReaderProvider = provider
+        self.__save_every: int = save_every
+        self.__save_interval: float = save_interval
+        self.__lock: threading.RLock = threading.RLock()
+
+        # id(worksheet) -> (worksheet, workbook), the workbook being None for a worksheet not got through this provider
+        self.__worksheet_to_owner: dict[int, tuple[object, object]] = {}
+        # id(worksheet) -> {(row, column): value}
+        self.__worksheet_to_pending_cells: dict[int, dict[tuple[int, int], object]] = {}
+        # id(workbook) -> number of save() calls and time of the last real save
+        self.__workbook_to_unsaved_count: dict[int, int] = {}
+        self.__workbook_to_last_save_time: dict[int, float] = {}
+
+    def get_workbook(self, path: str):
+        return self.__provider.get_workbook(path)
+
+    def get_worksheet(self, workbook, sheet_name: str):
+        worksheet = self.__provider.get_worksheet(workbook, sheet_name)
+        with self.__lock:
+            self.__worksheet_to_owner[id(worksheet)] = (worksheet, workbook)
+        return worksheet
+
+    def add_worksheet(self, workbook, sheet_name: str):
+        worksheet = self.__provider.add_worksheet(workbook, sheet_name)
+        with self.__lock:
+            self.__worksheet_to_owner[id(worksheet)] = (worksheet, workbook)
+        return worksheet
+
+    def change_value_at(self, worksheet, row, column, value):
+        with self.__lock:
+            self.__pending_cells_of(worksheet)[(row, column)] = value
+        return True
+
+    def change_values_at(self, worksheet, row, column, values: list[list]):
+        with self.__lock:
+            pending_cells: dict[tuple[int, int], object] = self.__pending_cells_of(worksheet)
+            for row_offset, row_values in enumerate(values):
+                for column_offset, value in enumerate(row_values):
+                    pending_cells[(row + row_offset, column + column_offset)] = value
+        return True
+
+    def get_value_at(self, worksheet, row, column):
+        with self.__lock:
+            pending_cells: dict[tuple[int, int], object] = self.__worksheet_to_pending_cells.get(id(worksheet), {})
+            if (row, column) in pending_cells:
+                return pending_cells[(row, column)]
+
+        return self.__provider.get_value_at(worksheet, row, column)
+
+    def delete_contents(self, worksheet, start_cell, end_cell):
+        # the pending changes were made before, they must not come back on top of the deleted range
+        with self.__lock:
+            self.__flush_worksheet(id(worksheet))
+            return self.__provider.delete_contents(worksheet, start_cell, end_cell)
+
+    def save(self, workbook):
+        with self.__lock:
+            unsaved_count: int = self.__workbook_to_unsaved_count.get(id(workbook), 0) + 1
+            self.__workbook_to_unsaved_count[id(workbook)] = unsaved_count
+            last_save_time: float = self.__workbook_to_last_save_time.setdefault(id(workbook), time.time())
+
+            is_due_by_count: bool = 0 < self.__save_every <= unsaved_count
+            is_due_by_time: bool = 0 < self.__save_interval <= time.time() - last_save_time
+            if is_due_by_count or is_due_by_time:
+                self.__save_now(workbook)
+
+    def flush(self, workbook) -> None:
+        """
+        Write every pending change of the workbook into the underlying provider, without saving
+        """
+        with self.__lock:
+            for worksheet_id, (worksheet, owner_workbook) in list(self.__worksheet_to_owner.items()):
+                if owner_workbook is workbook:
+                    self.__flush_worksheet(worksheet_id)
+
+            # the worksheets not got through get_worksheet can only belong to this workbook as far as we know
+            for worksheet_id in list(self.__worksheet_to_pending_cells.keys()):
+                if self.__worksheet_to_owner.get(worksheet_id, (None, None))[1] is None:
+                    self.__flush_worksheet(worksheet_id)
+
+    def close(self, workbook):
+        with self.__lock:
+            if self.__workbook_to_unsaved_count.get(id(workbook), 0) > 0 or self.__has_pending_cells(workbook):
+                self.__save_now(workbook)
+
+            self.__workbook_to_unsaved_count.pop(id(workbook), None)
+            self.__workbook_to_last_save_time.pop(id(workbook), None)
+            for worksheet_id, (worksheet, owner_workbook) in list(self.__worksheet_to_owner.items()):
+                if owner_workbook is workbook:
+                    del self.__worksheet_to_owner[worksheet_id]
+
+        self.__provider.close(workbook)
+
+    def quit_session(self):
+        self.__provider.quit_session()
+
+    def __save_now(self, workbook) -> None:
+        logger: Logger = get_current_logger()
+        self.flush(workbook)
+        self.__provider.save(workbook)
+        logger.debug('Saved the workbook after {} items'.format(self.__workbook_to_unsaved_count.get(id(workbook), 0)))
+        self.__workbook_to_unsaved_count[id(workbook)] = 0
+        self.__workbook_to_last_save_time[id(workbook)] = time.time()
+
+    def __pending_cells_of(self, worksheet) -> dict[tuple[int, int], object]:
+        if id(worksheet) not in self.__worksheet_to_pending_cells:
+            self.__worksheet_to_pending_cells[id(worksheet)] = {}
+            self.__worksheet_to_owner.setdefault(id(worksheet), (worksheet, None))
+        return self.__worksheet_to_pending_cells[id(worksheet)]
+
+    def __has_pending_cells(self, workbook) -> bool:
+        for worksheet_id, pending_cells in self.__worksheet_to_pending_cells.items():
+            owner_workbook = self.__worksheet_to_owner.get(worksheet_id, (None, None))[1]
+            if len(pending_cells) > 0 and (owner_workbook is workbook or owner_workbook is None):
+                return True
+        return False
+
+    def __flush_worksheet(self, worksheet_id: int) -> None:
+        pending_cells: dict[tuple[int, int], object] = self.__worksheet_to_pending_cells.pop(worksheet_id, None)
+        if pending_cells is None or len(pending_cells) == 0:
+            return
+
+        worksheet = self.__worksheet_to_owner[worksheet_id][0]
+        for row, column, values in BufferedExcelReaderProvider.merge_into_blocks(pending_cells):
+            self.__provider.change_values_at(worksheet, row, column, values)
+
+    @staticmethod
+    def merge_into_blocks(cell_to_value: dict[tuple[int, int], object]) -> list[tuple[int, int, list[list]]]:
+        """
+        Group the cells into rectangular blocks (top row, left column, rows of values): the horizontal runs of each
+        row first, then the runs of the same position and width on consecutive rows are stacked together
+        """
+        runs: list[tuple[int, int, list]] = []
+        for row, column in sorted(cell_to_value.keys()):
+            if len(runs) > 0 and runs[-1][0] == row and runs[-1][1] + len(runs[-1][2]) == column:
+                runs[-1][2].append(cell_to_value[(row, column)])
+                continue
+
+            runs.append((row, column, [cell_to_value[(row, column)]]))
+
+        blocks: list[tuple[int, int, list[list]]] = []
+        # (left column, width) -> the last block started with such a run
+        shape_to_open_block: dict[tuple[int, int], tuple[int, int, list[list]]] = {}
+        for row, column, values in runs:
+            open_block: tuple[int, int, list[list]] = shape_to_open_block.get((column, len(values)))
+            if open_block is not None and open_block[0] + len(open_block[2]) == row:
+                open_block[2].append(values)
+                continue
+
+            block: tuple[int, int, list[list]] = (row, column, [values])
+            blocks.append(block)
+            shape_to_open_block[(column, len(values))] = block
+
+        return blocks
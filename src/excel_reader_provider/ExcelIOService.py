@@ -0,0 +1,340 @@
+import queue
+import threading
+from concurrent.futures import Future
+from logging import Logger
+from typing import Callable
+
+from src.common.ThreadLocalLogger import get_current_logger
+from src.excel_reader_provider.ExcelReaderProvider import ExcelReaderProvider
+
+
+class WorkbookHandle(object):
+    """
+        An opaque reference to a workbook owned by the ExcelIOService, safe to pass around between threads
+    """
+
+    def __init__(self, provider_name: str, path: str):
+        self.provider_name: str = provider_name
+        self.fullname: str = path
+
+
+class WorksheetHandle(object):
+    """
+        An opaque reference to a worksheet of a workbook owned by the ExcelIOService
+    """
+
+    def __init__(self, workbook_handle: WorkbookHandle, sheet_name: str):
+        self.workbook_handle: WorkbookHandle = workbook_handle
+        self.sheet_name: str = sheet_name
+
+
+class ExcelIOService(object):
+    """
+        ExcelIOService - the one thread of the process talking to Excel.
+        It owns the providers (so a single hidden Excel application for xlwings) and all the workbooks they opened,
+        and runs the commands of every task one after the other, taken from a queue. Each command is answered
+        through a Future.
+        The saves are coalesced: a save waits until the queue is empty, so the saves asked by several tasks in the
+        meantime end up in one save per workbook.
+        The service is shared by reference counting: acquire() starts it for the first client, release() of the last
+        client saves what is pending, quits the Excel sessions and stops the thread. shutdown() stops it whatever
+        its clients, when the application exits.
+        Once the thread is over, for whatever reason, every command still queued or submitted later fails instead
+        of waiting forever.
+    """
+
+    _instance = None
+    _instance_lock: threading.Lock = threading.Lock()
+
+    __CALL: str = 'call'
+    __SAVE: str = 'save'
+    __STOP: str = 'stop'
+
+    @staticmethod
+    def acquire(create_provider: Callable[[str], ExcelReaderProvider]) -> 'ExcelIOService':
+        with ExcelIOService._instance_lock:
+            if ExcelIOService._instance is None:
+                ExcelIOService._instance = ExcelIOService(create_provider)
+                ExcelIOService._instance.start()
+
+            ExcelIOService._instance.__client_count += 1
+            return ExcelIOService._instance
+
+    def release(self) -> None:
+        with ExcelIOService._instance_lock:
+            self.__client_count -= 1
+            if self.__client_count > 0:
+                return
+
+            if ExcelIOService._instance is self:
+                ExcelIOService._instance = None
+
+        self.__submit(ExcelIOService.__STOP, None).result()
+
+    @staticmethod
+    def shutdown() -> None:
+        """
+        Save what is pending, quit the Excel sessions and stop the thread, even if some clients did not release it
+        """
+        with ExcelIOService._instance_lock:
+            service: ExcelIOService = ExcelIOService._instance
+            ExcelIOService._instance = None
+
+        if service is not None:
+            service.__submit(ExcelIOService.__STOP, None).result()
+
+    def __init__(self, create_provider: Callable[[str], ExcelReaderProvider]):
+        # provider name (xlwings / openpyxl) -> a new provider, called in the service thread
+        self.__create_provider: Callable[[str], ExcelReaderProvider] = create_provider
+        self.__commands: queue.Queue = queue.Queue()
+        # guards the queue against the end of the thread: nothing is queued once it is over
+        self.__commands_lock: threading.Lock = threading.Lock()
+        self.__is_stopped: bool = False
+        self.__client_count: int = 0
+        self.__thread: threading.Thread = threading.Thread(target=self.__run, name='ExcelIOService', daemon=True)
+
+        # only touched by the service thread
+        self.__name_to_provider: dict[str, ExcelReaderProvider] = {}
+        self.__workbook_key_to_open_count: dict[tuple[str, str], int] = {}
+        self.__workbook_key_to_pending_saves: dict[tuple[str, str], tuple[WorkbookHandle, list[Future]]] = {}
+
+    def start(self) -> None:
+        self.__thread.start()
+
+    @property
+    def is_stopped(self) -> bool:
+        return self.__is_stopped
+
+    def call(self, command: Callable[['ExcelIOService'], object]):
+        """
+        Run the command in the service thread and wait for its result, the command gets the service to reach the
+        providers, workbooks and worksheets behind the handles
+        """
+        return self.__submit(ExcelIOService.__CALL, command).result()
+
+    def save(self, workbook_handle: WorkbookHandle) -> None:
+        self.__submit(ExcelIOService.__SAVE, workbook_handle).result()
+
+    def __submit(self, kind: str, payload) -> Future:
+        future: Future = Future()
+        with self.__commands_lock:
+            if not self.__is_stopped and self.__thread.is_alive():
+                self.__commands.put((kind, payload, future))
+                return future
+
+        # a stopped service has nothing left to stop, anything else can not be done anymore
+        if kind == ExcelIOService.__STOP:
+            future.set_result(None)
+        else:
+            future.set_exception(Exception('The Excel IO service is stopped'))
+        return future
+
+    def __run(self) -> None:
+        logger: Logger = get_current_logger()
+        com_module = None
+
+        try:
+            com_module = ExcelIOService.__initialize_com()
+            while True:
+                kind, payload, future = self.__commands.get()
+
+                if kind == ExcelIOService.__CALL:
+                    try:
+                        future.set_result(payload(self))
+                    except Exception as exception:
+                        future.set_exception(exception)
+
+                elif kind == ExcelIOService.__SAVE:
+                    workbook_key: tuple[str, str] = (payload.provider_name, payload.fullname)
+                    self.__workbook_key_to_pending_saves.setdefault(workbook_key, (payload, []))[1].append(future)
+
+                elif kind == ExcelIOService.__STOP:
+                    try:
+                        self.__save_pending_workbooks()
+                        for provider in self.__name_to_provider.values():
+                            provider.quit_session()
+                        self.__name_to_provider.clear()
+                    finally:
+                        future.set_result(None)
+                    return
+
+                if self.__commands.empty():
+                    self.__save_pending_workbooks()
+
+        except Exception as exception:
+            logger.exception('Excel IO service stopped: {}'.format(str(exception)))
+
+        finally:
+            self.__fail_remaining_commands()
+            if com_module is not None:
+                com_module.CoUninitialize()
+
+    def __fail_remaining_commands(self) -> None:
+        with self.__commands_lock:
+            self.__is_stopped = True
+
+        with ExcelIOService._instance_lock:
+            if ExcelIOService._instance is self:
+                ExcelIOService._instance = None
+
+        stopped_exception: Exception = Exception('The Excel IO service is stopped')
+        for workbook_handle, futures in self.__workbook_key_to_pending_saves.values():
+            for future in futures:
+                future.set_exception(stopped_exception)
+        self.__workbook_key_to_pending_saves.clear()
+
+        while not self.__commands.empty():
+            kind, payload, future = self.__commands.get()
+            if kind == ExcelIOService.__STOP:
+                future.set_result(None)
+            else:
+                future.set_exception(stopped_exception)
+
+    @staticmethod
+    def __initialize_com():
+        # COM objects must be used from the thread which initialized COM, that is this service thread
+        try:
+            import pythoncom
+        except ImportError:
+            return None
+
+        pythoncom.CoInitialize()
+        return pythoncom
+
+    def __save_pending_workbooks(self) -> None:
+        logger: Logger = get_current_logger()
+        for workbook_key, (workbook_handle, futures) in list(self.__workbook_key_to_pending_saves.items()):
+            del self.__workbook_key_to_pending_saves[workbook_key]
+            try:
+                self.provider(workbook_handle.provider_name).save(self.workbook(workbook_handle))
+                if len(futures) > 1:
+                    logger.debug('Coalesced {} saves of {}'.format(len(futures), workbook_handle.fullname))
+            except Exception as exception:
+                for future in futures:
+                    future.set_exception(exception)
+                continue
+
+            for future in futures:
+                future.set_result(None)
+
+    # the methods below are only called from the service thread, through call()
+
+    def provider(self, provider_name: str) -> ExcelReaderProvider:
+        if provider_name not in self.__name_to_provider:
+            self.__name_to_provider[provider_name] = self.__create_provider(provider_name)
+        return self.__name_to_provider[provider_name]
+
+    def workbook(self, workbook_handle: WorkbookHandle):
+        return self.provider(workbook_handle.provider_name).get_workbook(workbook_handle.fullname)
+
+    def worksheet(self, worksheet_handle: WorksheetHandle):
+        workbook_handle: WorkbookHandle = worksheet_handle.workbook_handle
+        return self.provider(workbook_handle.provider_name).get_worksheet(self.workbook(workbook_handle),
+                                                                          worksheet_handle.sheet_name)
+
+    def open_workbook(self, workbook_handle: WorkbookHandle) -> None:
+        workbook_key: tuple[str, str] = (workbook_handle.provider_name, workbook_handle.fullname)
+        self.workbook(workbook_handle)
+        self.__workbook_key_to_open_count[workbook_key] = self.__workbook_key_to_open_count.get(workbook_key, 0) + 1
+
+    def close_workbook(self, workbook_handle: WorkbookHandle) -> None:
+        """
+        The workbook is really closed when the last task using it closes it
+        """
+        workbook_key: tuple[str, str] = (workbook_handle.provider_name, workbook_handle.fullname)
+        open_count: int = self.__workbook_key_to_open_count.get(workbook_key, 0) - 1
+        if open_count > 0:
+            self.__workbook_key_to_open_count[workbook_key] = open_count
+            return
+
+        self.__workbook_key_to_open_count.pop(workbook_key, None)
+        if workbook_key in self.__workbook_key_to_pending_saves:
+            self.__save_pending_workbooks()
+        self.provider(workbook_handle.provider_name).close(self.workbook(workbook_handle))
+
+
+class ExcelIOClient(ExcelReaderProvider):
+    """
+        ExcelIOClient - the ExcelReaderProvider of one task, forwarding everything to the shared ExcelIOService.
+        The workbooks and worksheets it returns are handles, the real objects never leave the service thread.
+    """
+
+    def __init__(self, provider_name: str, create_provider: Callable[[str], ExcelReaderProvider]):
+        self.__provider_name: str = provider_name
+        self.__service: ExcelIOService = ExcelIOService.acquire(create_provider)
+        self.__path_to_workbook_handle: dict[str, WorkbookHandle] = {}
+        self.__worksheet_key_to_handle: dict[tuple[str, str], WorksheetHandle] = {}
+
+    def get_workbook(self, path: str):
+        if path not in self.__path_to_workbook_handle:
+            workbook_handle: WorkbookHandle = WorkbookHandle(self.__provider_name, path)
+            self.__service.call(lambda service: service.open_workbook(workbook_handle))
+            self.__path_to_workbook_handle[path] = workbook_handle
+
+        return self.__path_to_workbook_handle[path]
+
+    def get_worksheet(self, workbook: WorkbookHandle, sheet_name: str):
+        worksheet_key: tuple[str, str] = (workbook.fullname, sheet_name)
+        if worksheet_key not in self.__worksheet_key_to_handle:
+            worksheet_handle: WorksheetHandle = WorksheetHandle(workbook, sheet_name)
+            # fail here, as the provider would, when the sheet does not exist
+            self.__service.call(lambda service: service.worksheet(worksheet_handle))
+            self.__worksheet_key_to_handle[worksheet_key] = worksheet_handle
+
+        return self.__worksheet_key_to_handle[worksheet_key]
+
+    def add_worksheet(self, workbook: WorkbookHandle, sheet_name: str):
+        worksheet_key: tuple[str, str] = (workbook.fullname, sheet_name)
+        if worksheet_key not in self.__worksheet_key_to_handle:
+            worksheet_handle: WorksheetHandle = WorksheetHandle(workbook, sheet_name)
+            self.__service.call(
+                lambda service: service.provider(self.__provider_name).add_worksheet(service.workbook(workbook),
+                                                                                     sheet_name))
+            self.__worksheet_key_to_handle[worksheet_key] = worksheet_handle
+
+        return self.__worksheet_key_to_handle[worksheet_key]
+
+    def change_value_at(self, worksheet: WorksheetHandle, row, column, value):
+        return self.__service.call(
+            lambda service: service.provider(self.__provider_name).change_value_at(service.worksheet(worksheet),
+                                                                                   row, column, value))
+
+    def change_values_at(self, worksheet: WorksheetHandle, row, column, values: list[list]):
+        return self.__service.call(
+            lambda service: service.provider(self.__provider_name).change_values_at(service.worksheet(worksheet),
+                                                                                    row, column, values))
+
+    def get_value_at(self, worksheet: WorksheetHandle, row, column):
+        return self.__service.call(
+            lambda service: service.provider(self.__provider_name).get_value_at(service.worksheet(worksheet),
+                                                                                row, column))
+
+    def delete_contents(self, worksheet: WorksheetHandle, start_cell, end_cell):
+        return self.__service.call(
+            lambda service: service.provider(self.__provider_name).delete_contents(service.worksheet(worksheet),
+                                                                                   start_cell, end_cell))
+
+    def save(self, workbook: WorkbookHandle):
+        self.__service.save(workbook)
+
+    def close(self, workbook: WorkbookHandle):
+        if self.__path_to_workbook_handle.pop(workbook.fullname, None) is None:
+            return
+
+        for worksheet_key in [key for key in self.__worksheet_key_to_handle.keys() if key[0] == workbook.fullname]:
+            del self.__worksheet_key_to_handle[worksheet_key]
+
+        self.__service.call(lambda service: service.close_workbook(workbook))
+
+    def quit_session(self):
+        if self.__service is None:
+            return
+
+        try:
+            # a stopped service already quit its Excel sessions, with their workbooks
+            if not self.__service.is_stopped:
+                for workbook_handle in list(self.__path_to_workbook_handle.values()):
+                    self.close(workbook_handle)
+        finally:
+            self.__service.release()
+            self.__service = None
@@ -10,14 +10,28 @@ class ExcelReaderProvider:
     def get_worksheet(self, workbook, sheet_name: str):
         pass
 
+    @abstractmethod
+    def add_worksheet(self, workbook, sheet_name: str):
+        # the worksheet named sheet_name, added after the last one when it does not exist yet
+        pass
+
     @abstractmethod
     def change_value_at(self, worksheet, row, column, value):
         pass
 
+    @abstractmethod
+    def change_values_at(self, worksheet, row, column, values: list[list]):
+        # values are rows of values, written from the cell (row, column) to the right and down
+        pass
+
     @abstractmethod
     def get_value_at(self, worksheet, row, column):
         pass
 
+    @abstractmethod
+    def delete_contents(self, worksheet, start_cell, end_cell):
+        pass
+
     @abstractmethod
     def save(self, workbook):
         pass
@@ -0,0 +1,42 @@
+from src.excel_reader_provider.BufferedExcelReaderProvider import BufferedExcelReaderProvider
+from src.excel_reader_provider.ExcelIOService import ExcelIOClient
+from src.excel_reader_provider.ExcelReaderProvider import ExcelReaderProvider
+
+
+def create_excel_reader_provider(settings: dict[str, str]) -> ExcelReaderProvider:
+    """
+    The provider chosen by the excel.provider setting: xlwings (default, drives a hidden Excel application) or
+    openpyxl (in process, no Excel needed), behind a write-behind buffer saving the workbook every excel.save.every
+    items (default 1) and/or every excel.save.interval seconds (default 0: not by time).
+    Unless excel.io.shared is False, the tasks of the process share one ExcelIOService thread owning the Excel
+    session and the workbooks
+    """
+    provider_name: str = 'xlwings' if settings.get('excel.provider') is None \
+        else str(settings.get('excel.provider')).strip().lower()
+    if settings.get('excel.io.shared') is None:
+        is_shared: bool = True
+    else:
+        is_shared = 'True'.lower() == str(settings.get('excel.io.shared')).lower()
+
+    save_every: int = 1 if settings.get('excel.save.every') is None else int(settings.get('excel.save.every'))
+    save_interval: float = 0 if settings.get('excel.save.interval') is None \
+        else float(settings.get('excel.save.interval'))
+
+    provider: ExcelReaderProvider = ExcelIOClient(provider_name, _create_underlying_provider) if is_shared \
+        else _create_underlying_provider(provider_name)
+    return BufferedExcelReaderProvider(provider,
+                                       save_every=save_every,
+                                       save_interval=save_interval)
+
+
+def _create_underlying_provider(provider_name: str) -> ExcelReaderProvider:
+    if provider_name == 'openpyxl':
+        from src.excel_reader_provider.OpenpyxlProvider import OpenpyxlProvider
+        return OpenpyxlProvider()
+
+    if provider_name == 'xlwings':
+        # xlwings is only available where Excel is installed, import it only when it is asked for
+        from src.excel_reader_provider.XlwingProvider import XlwingProvider
+        return XlwingProvider()
+
+    raise Exception('Unknown excel.provider {}, expected xlwings or openpyxl'.format(provider_name))
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+
+import openpyxl
+from openpyxl.workbook.workbook import Workbook
+from openpyxl.worksheet.worksheet import Worksheet
+
+from src.common.ResourceLock import ResourceLock
+from src.excel_reader_provider.ExcelReaderProvider import ExcelReaderProvider
+
+
+class OpenpyxlProvider(ExcelReaderProvider):
+    """
+        OpenpyxlProvider - works on the Excel files in process with openpyxl, no Excel application is needed.
+        Every change stays in memory until save(), which writes the whole workbook into a temporary file next to
+        the original one and swaps it in with os.replace, so a crash never leaves a half written workbook behind.
+        The VBA project of a .xlsm workbook is kept.
+    """
+
+    def __init__(self):
+        self.name_to_workbook: dict[str, Workbook] = {}
+
+    def get_workbook(self, path: str):
+        if self.name_to_workbook.get(path):
+            return self.name_to_workbook.get(path)
+
+        workbook: Workbook = openpyxl.load_workbook(filename=path, keep_vba=path.lower().endswith('.xlsm'))
+        # remember where the workbook comes from, openpyxl does not keep it
+        workbook.fullname = path
+        self.name_to_workbook[path] = workbook
+        return workbook
+
+    def get_worksheet(self, workbook, sheet_name: str):
+        return workbook[sheet_name]
+
+    def add_worksheet(self, workbook: Workbook, sheet_name: str):
+        if sheet_name in workbook.sheetnames:
+            return workbook[sheet_name]
+        return workbook.create_sheet(sheet_name)
+
+    def change_value_at(self, worksheet: Worksheet, row, column, value):
+        worksheet.cell(row=row, column=column).value = value
+        return True
+
+    def change_values_at(self, worksheet: Worksheet, row, column, values: list[list]):
+        for row_offset, row_values in enumerate(values):
+            for column_offset, value in enumerate(row_values):
+                worksheet.cell(row=row + row_offset, column=column + column_offset).value = value
+        return True
+
+    def get_value_at(self, worksheet: Worksheet, row, column):
+        return worksheet.cell(row=row, column=column).value
+
+    def delete_contents(self, worksheet: Worksheet, start_cell, end_cell):
+        for row in worksheet[start_cell + ":" + end_cell]:
+            for cell in row:
+                cell.value = None
+        return True
+
+    def save(self, workbook):
+        path_to_workbook: str = workbook.fullname
+        folder: str = os.path.dirname(os.path.abspath(path_to_workbook))
+        extension: str = os.path.splitext(path_to_workbook)[1]
+
+        with ResourceLock(file_path=path_to_workbook):
+            file_descriptor, temporary_path = tempfile.mkstemp(suffix=extension, dir=folder)
+            os.close(file_descriptor)
+            try:
+                workbook.save(temporary_path)
+                if os.path.exists(path_to_workbook):
+                    shutil.copymode(path_to_workbook, temporary_path)
+                os.replace(temporary_path, path_to_workbook)
+            except Exception:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+                raise
+
+    def close(self, workbook):
+        path_to_workbook: str = workbook.fullname
+        workbook.close()
+        if self.name_to_workbook.get(path_to_workbook) is not None:
+            del self.name_to_workbook[path_to_workbook]
+
+    def quit_session(self):
+        for workbook in list(self.name_to_workbook.values()):
+            self.close(workbook)
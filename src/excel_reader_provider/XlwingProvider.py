@@ -23,10 +23,20 @@ class XlwingProvider(ExcelReaderProvider):
         ws = workbook.sheets[sheet_name]
         return ws
 
+    def add_worksheet(self, workbook, sheet_name: str):
+        if sheet_name in [sheet.name for sheet in workbook.sheets]:
+            return workbook.sheets[sheet_name]
+        return workbook.sheets.add(name=sheet_name, after=workbook.sheets[-1])
+
     def change_value_at(self, worksheet, row, column, value):
         worksheet.range(row, column).value = value
         return True
 
+    def change_values_at(self, worksheet, row, column, values: list[list]):
+        # one COM call for the whole block
+        worksheet.range((row, column)).value = values
+        return True
+
     def get_value_at(self, worksheet, row, column):
         return worksheet.range((row, column)).value
 
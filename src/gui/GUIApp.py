@@ -10,6 +10,7 @@ from src.common.FileUtil import load_key_value_from_file_properties, persist_set
 from src.common.ReflectionUtil import create_task_instance
 from src.common.ResourceLock import ResourceLock
 from src.common.ThreadLocalLogger import get_current_logger
+from src.excel_reader_provider.ExcelIOService import ExcelIOService
 from src.gui.TextBoxLoggingHandler import setup_textbox_logger
 from src.gui.UIComponentFactory import UIComponentFactory
 from src.gui.UITaskPerformingStates import UITaskPerformingStates
@@ -99,6 +100,8 @@ class GUIApp(tk.Tk, EventHandler, UITaskPerformingStates):
     # Life cycle callback before closing the ui app
     def handle_close_app(self) -> None:
         persist_settings_to_file(self.current_task_name, self.current_task_settings)
+        # the Excel session shared by the tasks is saved and quit, even for a task which did not release it
+        ExcelIOService.shutdown()
         self.destroy()
 
     def render_header(self, parent_frame: Frame, logo: tk.PhotoImage) -> Label:
@@ -127,6 +130,7 @@ class GUIApp(tk.Tk, EventHandler, UITaskPerformingStates):
 
         automated_task_names.remove("AutomatedTask")
         automated_task_names.remove("DesktopAppTask")
+        automated_task_names.remove("PdfIngestionTask")
         automated_task_names.remove("__init__")
         dropdown['values'] = automated_task_names
 
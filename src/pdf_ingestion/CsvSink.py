@@ -0,0 +1,31 @@
+import csv
+
+from src.pdf_ingestion.PdfTextSink import PdfTextSink
+from src.pdf_ingestion.RowFileSink import RowFileSink
+
+
+class CsvSink(RowFileSink):
+    """
+        CsvSink - streams the extracted text into UTF-8 csv files (with BOM, so Excel opens them correctly)
+    """
+
+    def __init__(self, output_folder: str, base_name: str, layout: str = PdfTextSink.LONG_LAYOUT,
+                 max_rows: int = PdfTextSink.EXCEL_MAX_ROWS):
+        super().__init__(output_folder, base_name, 'csv', layout, max_rows)
+        self.__stream = None
+        self.__writer = None
+
+    def _open_file(self, output_path: str) -> None:
+        self.__stream = open(output_path, 'w', newline='', encoding='utf-8-sig')
+        self.__writer = csv.writer(self.__stream)
+
+    def _write_row(self, row_values: list) -> None:
+        self.__writer.writerow(row_values)
+
+    def _flush(self) -> None:
+        self.__stream.flush()
+
+    def _close_file(self) -> None:
+        self.__stream.close()
+        self.__stream = None
+        self.__writer = None
@@ -0,0 +1,87 @@
+from logging import Logger
+
+from src.common.ThreadLocalLogger import get_current_logger
+from src.excel_reader_provider.ExcelReaderProvider import ExcelReaderProvider
+from src.pdf_ingestion.PdfTextSink import PdfTextSink
+
+
+class ExcelProviderSink(PdfTextSink):
+    """
+        ExcelProviderSink - writes the PDFs into a sheet of an existing workbook through an ExcelReaderProvider,
+        in any layout. When the sheet is full (max_rows / max_columns) the next PDFs go into a new sheet named
+        <sheet>_2, <sheet>_3 ... added after the last one.
+        The workbook is saved (as the provider's save policy decides) after every PDF and closed by close().
+    """
+
+    def __init__(self,
+                 excel_provider: ExcelReaderProvider,
+                 excel_path: str,
+                 sheet_name: str,
+                 layout: str = PdfTextSink.COLUMN_LAYOUT,
+                 max_rows: int = PdfTextSink.EXCEL_MAX_ROWS,
+                 max_columns: int = PdfTextSink.EXCEL_MAX_COLUMNS):
+        if layout not in PdfTextSink.LAYOUTS:
+            raise Exception('Unknown output layout {}, expected one of {}'.format(layout, PdfTextSink.LAYOUTS))
+
+        self.__excel_provider: ExcelReaderProvider = excel_provider
+        self.__sheet_name: str = sheet_name
+        self.__layout: str = layout
+        self.__max_rows: int = min(max_rows, PdfTextSink.EXCEL_MAX_ROWS)
+        self.__max_columns: int = min(max_columns, PdfTextSink.EXCEL_MAX_COLUMNS)
+
+        self.__workbook = excel_provider.get_workbook(path=excel_path)
+        self.__worksheet = excel_provider.get_worksheet(self.__workbook, sheet_name)
+        self.__sheet_count: int = 1
+        # the next free column (column layout) or row (row and long layouts) of the current sheet
+        self.__next_position: int = 1
+
+    def write_pdf(self, file_name: str, lines: list[str]) -> None:
+        if self.__layout == PdfTextSink.COLUMN_LAYOUT:
+            self.__write_column(file_name, lines)
+        else:
+            self.__write_rows(PdfTextSink.rows_of(self.__layout, file_name, lines))
+
+        self.__excel_provider.save(workbook=self.__workbook)
+
+    def __write_column(self, file_name: str, lines: list[str]) -> None:
+        if len(lines) + 1 > self.__max_rows:
+            raise Exception('{} has {} lines, more than the {} rows of a sheet, use the long output layout'
+                            .format(file_name, len(lines), self.__max_rows))
+
+        if self.__next_position > self.__max_columns:
+            self.__roll_over()
+
+        column_values: list[list] = [[file_name]] + [[line] for line in lines]
+        self.__excel_provider.change_values_at(worksheet=self.__worksheet, row=1, column=self.__next_position,
+                                               values=column_values)
+        self.__next_position += 1
+
+    def __write_rows(self, rows: list[list]) -> None:
+        for row_values in rows:
+            if len(row_values) > self.__max_columns:
+                raise Exception('{} has {} lines, more than the {} columns of a sheet, use the long output layout'
+                                .format(row_values[0], len(row_values) - 1, self.__max_columns))
+
+        while len(rows) > 0:
+            if self.__next_position > self.__max_rows:
+                self.__roll_over()
+
+            fitting_rows: list[list] = rows[:self.__max_rows - self.__next_position + 1]
+            rows = rows[len(fitting_rows):]
+            for row_offset, row_values in enumerate(fitting_rows):
+                self.__excel_provider.change_values_at(worksheet=self.__worksheet,
+                                                       row=self.__next_position + row_offset,
+                                                       column=1, values=[row_values])
+            self.__next_position += len(fitting_rows)
+
+    def __roll_over(self) -> None:
+        logger: Logger = get_current_logger()
+        self.__sheet_count += 1
+        next_sheet_name: str = '{}_{}'.format(self.__sheet_name, self.__sheet_count)
+        self.__worksheet = self.__excel_provider.add_worksheet(self.__workbook, next_sheet_name)
+        self.__next_position = 1
+        logger.info('Sheet {} is full, continue writing into sheet {}'.format(self.__sheet_name, next_sheet_name))
+
+    def close(self) -> None:
+        self.__excel_provider.close(workbook=self.__workbook)
+        self.__excel_provider.quit_session()
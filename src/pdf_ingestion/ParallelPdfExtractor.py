@@ -0,0 +1,183 @@
+import gc
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from logging import Logger
+from typing import Iterator
+
+import pdfplumber
+from pdfplumber.page import Page
+
+from src.common.MemoryUtil import get_resident_memory_in_bytes
+from src.common.ThreadLocalLogger import get_current_logger
+from src.pdf_ingestion.PdfTextCache import PdfTextCache
+
+# identifies what extract_pdf_lines produces in the PdfTextCache keys, change it whenever its output changes
+EXTRACTOR_SIGNATURE: str = 'extract_pdf_lines/2 pdfplumber/{} raw'.format(pdfplumber.__version__)
+
+
+def extract_pdf_lines(pdf_path: str, memory_limit_in_bytes: int = None) -> list[str]:
+    """
+    The raw text lines of every page of a PDF, the cleaning is up to the caller.
+    The page is streamed: the layout objects of a page are released as soon as its text is taken, and the document
+    is closed on the way out, so the memory used depends on the largest page and not on the number of pages.
+    Past memory_limit_in_bytes of resident memory after a page, a MemoryError is raised for the PDF.
+    Runs in a worker process of ParallelPdfExtractor, so it only takes and returns picklable values
+    """
+    lines: list[str] = []
+    with pdfplumber.open(pdf_path) as pdf:
+        pages: list[Page] = pdf.pages
+        while len(pages) > 0:
+            # once out of the document's page list and flushed, nothing holds the layout objects of the page
+            page: Page = pages.pop(0)
+            raw_text = page.extract_text()
+            page.flush_cache()
+            lines.extend(raw_text.splitlines())
+
+            if memory_limit_in_bytes is not None:
+                _check_memory_limit(pdf_path, page.page_number, memory_limit_in_bytes)
+
+    return lines
+
+
+def _check_memory_limit(pdf_path: str, page_number: int, memory_limit_in_bytes: int) -> None:
+    resident_memory: int = get_resident_memory_in_bytes()
+    if resident_memory is None or resident_memory <= memory_limit_in_bytes:
+        return
+
+    gc.collect()
+    resident_memory = get_resident_memory_in_bytes()
+    if resident_memory > memory_limit_in_bytes:
+        raise MemoryError('{} takes {} MB at page {}, above the memory limit of {} MB'
+                          .format(os.path.basename(pdf_path), resident_memory // (1024 * 1024), page_number,
+                                  memory_limit_in_bytes // (1024 * 1024)))
+
+
+class ParallelPdfExtractor:
+    """
+        ParallelPdfExtractor - extracts the text of PDFs on a pool of worker processes, one PDF per job,
+        and hands the results back in the order of the given paths, so a single writer can consume them.
+        Only a window of jobs is in flight: the next PDFs are submitted as the results are consumed, so a caller
+        which pauses between results also pauses the pool, and one which stops iterating leaves nothing behind
+        once the extractor is closed.
+        With a single worker the PDFs are extracted in the calling thread, without any process.
+        Given a PdfTextCache, the PDFs whose content was already extracted are taken from it instead of being parsed,
+        and the ones which are parsed are added to it. The cache is closed with the extractor.
+        A PDF which takes a worker past memory_limit_in_bytes is skipped with an error, and the workers are replaced
+        by fresh processes after max_tasks_per_worker PDFs each, so what a long run leaves behind in them is returned
+        to the system. Both only apply to worker processes, so not with a single worker.
+    """
+
+    def __init__(self,
+                 max_workers: int = None,
+                 jobs_in_flight_per_worker: int = 2,
+                 text_cache: PdfTextCache = None,
+                 memory_limit_in_bytes: int = None,
+                 max_tasks_per_worker: int = None):
+        self.__max_workers: int = max(1, os.cpu_count() if max_workers is None else max_workers)
+        self.__jobs_in_flight: int = self.__max_workers * max(1, jobs_in_flight_per_worker)
+        self.__text_cache: PdfTextCache = text_cache
+        self.__memory_limit_in_bytes: int = memory_limit_in_bytes
+        self.__max_tasks_per_executor: int = None if max_tasks_per_worker is None \
+            else self.__max_workers * max(1, max_tasks_per_worker)
+        self.__executor: ProcessPoolExecutor = None
+        self.__task_count_of_executor: int = 0
+
+    def __cached_lines(self, pdf_path: str) -> tuple[bytes, list[str]]:
+        if self.__text_cache is None:
+            return None, None
+
+        cache_key: bytes = PdfTextCache.key_of(pdf_path, EXTRACTOR_SIGNATURE)
+        return cache_key, self.__text_cache.get(cache_key)
+
+    def __remember(self, cache_key: bytes, lines: list[str]) -> None:
+        if self.__text_cache is not None:
+            self.__text_cache.put(cache_key, lines)
+
+    def extract_in_order(self, pdf_paths: list[str]) -> Iterator[tuple[str, list[str]]]:
+        logger: Logger = get_current_logger()
+        if self.__max_workers == 1:
+            for pdf_path in pdf_paths:
+                cache_key, lines = self.__cached_lines(pdf_path)
+                if lines is None:
+                    # no memory limit here: the resident memory is the one of the whole tool, not of this PDF
+                    lines = extract_pdf_lines(pdf_path)
+                    self.__remember(cache_key, lines)
+                yield pdf_path, lines
+            return
+
+        pending_paths: Iterator[str] = iter(pdf_paths)
+        # (path, cache key, job) of the PDFs to parse, (path, None, lines) of the ones found in the cache
+        jobs: deque[tuple[str, bytes, Future | list[str]]] = deque()
+        try:
+            self.__fill(pending_paths, jobs)
+            while len(jobs) > 0:
+                pdf_path, cache_key, job = jobs.popleft()
+                self.__fill(pending_paths, jobs)
+                if isinstance(job, Future):
+                    try:
+                        lines: list[str] = job.result()
+                    except MemoryError as memory_error:
+                        logger.error('Skip {}: {}'.format(pdf_path, memory_error))
+                        continue
+                    self.__remember(cache_key, lines)
+                else:
+                    lines: list[str] = job
+
+                yield pdf_path, lines
+        finally:
+            for pdf_path, cache_key, job in jobs:
+                if isinstance(job, Future):
+                    job.cancel()
+
+    def __fill(self, pending_paths: Iterator[str], jobs: deque) -> None:
+        """
+        Queue the next pending PDFs until enough of them are being parsed by the workers,
+        the ones found in the cache are queued with their lines (a few times the window at most, to bound the memory)
+        """
+        parsing_count: int = sum(1 for pdf_path, cache_key, job in jobs if isinstance(job, Future))
+        while parsing_count < self.__jobs_in_flight and len(jobs) < self.__jobs_in_flight * 4:
+            pdf_path: str = next(pending_paths, None)
+            if pdf_path is None:
+                return
+
+            cache_key, lines = self.__cached_lines(pdf_path)
+            if lines is not None:
+                jobs.append((pdf_path, None, lines))
+                continue
+
+            jobs.append((pdf_path, cache_key, self.__submit(pdf_path)))
+            parsing_count += 1
+
+    def __submit(self, pdf_path: str) -> Future:
+        if self.__executor is not None and self.__max_tasks_per_executor is not None \
+                and self.__task_count_of_executor >= self.__max_tasks_per_executor:
+            # the retired workers finish the PDFs they already have, then exit
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(max_workers=self.__max_workers,
+                                                  mp_context=multiprocessing.get_context('spawn'))
+            self.__task_count_of_executor = 0
+
+        self.__task_count_of_executor += 1
+        return self.__executor.submit(extract_pdf_lines, pdf_path, self.__memory_limit_in_bytes)
+
+    def close(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True, cancel_futures=True)
+            self.__executor = None
+        if self.__text_cache is not None:
+            logger: Logger = get_current_logger()
+            logger.info('PDF text cache: {} PDFs reused, {} parsed'.format(self.__text_cache.hits,
+                                                                          self.__text_cache.misses))
+            self.__text_cache.close()
+            self.__text_cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
@@ -0,0 +1,156 @@
+import fnmatch
+import os
+from logging import Logger
+from typing import Callable, Iterator
+
+from src.common.Constants import PDF_TEXT_CACHE_FOLDER
+from src.common.ThreadLocalLogger import get_current_logger
+from src.pdf_ingestion.ParallelPdfExtractor import ParallelPdfExtractor
+from src.pdf_ingestion.PdfTextCache import PdfTextCache
+from src.pdf_ingestion.PdfTextSink import PdfTextSink
+from src.pdf_ingestion.PdfTextSinkFactory import create_pdf_text_sink
+
+# the cleaners which can be listed in pdf.cleaners, applied to each line in the listed order
+LINE_CLEANERS: dict[str, Callable[[str], str]] = {
+    'remove_nul': lambda line: line.replace('\x00', ''),
+    'remove_equals': lambda line: line.replace('=', ''),
+    'strip': lambda line: line.strip(),
+}
+
+
+class PdfIngestionEngine(object):
+    """
+        PdfIngestionEngine - lists the PDFs of a folder, extracts their text on the ParallelPdfExtractor (with its
+        cache and memory limit), cleans the lines and writes them into a PdfTextSink, all configured by the settings:
+            folder_docs.folder      the folder of the PDFs, walked with its sub folders
+            pdf.include             file name patterns of the PDFs to take, *.pdf by default (case-insensitive)
+            pdf.exclude             file name patterns of the PDFs to leave out
+            pdf.first.prefixes      in each folder, the PDFs whose name starts with these prefixes come first,
+                                    in the order of the prefixes (e.g. FCR)
+            pdf.sort                walk (default, the order of the file system) / name
+            pdf.cleaners            the cleaners of each line, remove_nul, remove_equals by default,
+                                    also strip and drop_empty_lines
+            pdf.workers, pdf.cache, pdf.cache.folder, pdf.memory.limit.mb, pdf.worker.max.tasks
+                                    the extraction, see ParallelPdfExtractor (the last two need pdf.workers > 1)
+            output.*                the sink, see create_pdf_text_sink
+        Every setting is a comma separated list where it takes several values.
+    """
+
+    DROP_EMPTY_LINES: str = 'drop_empty_lines'
+
+    def __init__(self, settings: dict[str, str], cache_name: str):
+        self.__settings: dict[str, str] = settings
+        self.__cache_name: str = cache_name
+
+        self.__include_patterns: list[str] = self.__get_list('pdf.include', ['*.pdf'])
+        self.__exclude_patterns: list[str] = self.__get_list('pdf.exclude', [])
+        self.__first_prefixes: list[str] = self.__get_list('pdf.first.prefixes', [])
+        self.__sort: str = 'walk' if settings.get('pdf.sort') is None else str(settings.get('pdf.sort')).strip().lower()
+        if self.__sort not in ('walk', 'name'):
+            raise Exception('Unknown pdf.sort {}, expected walk or name'.format(self.__sort))
+
+        cleaner_names: list[str] = self.__get_list('pdf.cleaners', ['remove_nul', 'remove_equals'])
+        for cleaner_name in cleaner_names:
+            if cleaner_name not in LINE_CLEANERS and cleaner_name != PdfIngestionEngine.DROP_EMPTY_LINES:
+                known_cleaner_names: list[str] = list(LINE_CLEANERS.keys()) + [PdfIngestionEngine.DROP_EMPTY_LINES]
+                raise Exception('Unknown pdf.cleaners {}, expected some of {}'.format(cleaner_name,
+                                                                                      known_cleaner_names))
+        self.__line_cleaners: list[Callable[[str], str]] = [LINE_CLEANERS[cleaner_name]
+                                                            for cleaner_name in cleaner_names
+                                                            if cleaner_name in LINE_CLEANERS]
+        self.__drop_empty_lines: bool = PdfIngestionEngine.DROP_EMPTY_LINES in cleaner_names
+
+        self.__pdf_extractor: ParallelPdfExtractor = None
+        self.__pdf_text_sink: PdfTextSink = None
+
+    def __get_list(self, key: str, default_values: list[str]) -> list[str]:
+        if self.__settings.get(key) is None:
+            return default_values
+
+        return [value.strip() for value in str(self.__settings.get(key)).split(',') if len(value.strip()) > 0]
+
+    def list_pdf_paths(self) -> list[str]:
+        pdf_paths: list[str] = []
+        for root, dirs, files in os.walk(self.__settings['folder_docs.folder']):
+            file_names: list[str] = [file_name for file_name in files if self.__is_taken(file_name)]
+            if self.__sort == 'name':
+                file_names.sort()
+
+            # by the rank of their prefix, the others last, keeping the order inside each group
+            file_names.sort(key=self.__rank_of)
+            pdf_paths.extend(os.path.join(root, file_name) for file_name in file_names)
+
+        return pdf_paths
+
+    def __is_taken(self, file_name: str) -> bool:
+        lower_file_name: str = file_name.lower()
+        if not any(fnmatch.fnmatchcase(lower_file_name, pattern.lower()) for pattern in self.__include_patterns):
+            return False
+
+        return not any(fnmatch.fnmatchcase(lower_file_name, pattern.lower()) for pattern in self.__exclude_patterns)
+
+    def __rank_of(self, file_name: str) -> int:
+        for rank, prefix in enumerate(self.__first_prefixes):
+            if file_name.startswith(prefix):
+                return rank
+
+        return len(self.__first_prefixes)
+
+    def open(self) -> None:
+        logger: Logger = get_current_logger()
+        self.__pdf_text_sink = create_pdf_text_sink(self.__settings)
+
+        pdf_text_cache: PdfTextCache = None
+        if 'False'.lower() != str(self.__settings.get('pdf.cache')).lower():
+            cache_folder: str = PDF_TEXT_CACHE_FOLDER if self.__settings.get('pdf.cache.folder') is None \
+                else self.__settings.get('pdf.cache.folder')
+            pdf_text_cache = PdfTextCache(self.__cache_name, cache_folder)
+
+        max_workers: int = None if self.__settings.get('pdf.workers') is None \
+            else int(self.__settings.get('pdf.workers'))
+        memory_limit_in_bytes: int = None if self.__settings.get('pdf.memory.limit.mb') is None \
+            else int(self.__settings.get('pdf.memory.limit.mb')) * 1024 * 1024
+        max_tasks_per_worker: int = None if self.__settings.get('pdf.worker.max.tasks') is None \
+            else int(self.__settings.get('pdf.worker.max.tasks'))
+        if memory_limit_in_bytes is not None and max_workers == 1:
+            logger.warning('pdf.memory.limit.mb only applies to the worker processes, not with pdf.workers = 1')
+        self.__pdf_extractor = ParallelPdfExtractor(max_workers,
+                                                    text_cache=pdf_text_cache,
+                                                    memory_limit_in_bytes=memory_limit_in_bytes,
+                                                    max_tasks_per_worker=max_tasks_per_worker)
+        logger.info('Ready to ingest the PDFs of {}'.format(self.__settings['folder_docs.folder']))
+
+    def extract_in_order(self, pdf_paths: list[str]) -> Iterator[tuple[str, list[str]]]:
+        """
+        The raw lines of the PDFs, in the order of the paths
+        """
+        return self.__pdf_extractor.extract_in_order(pdf_paths)
+
+    def clean(self, lines: list[str]) -> list[str]:
+        cleaned_lines: list[str] = []
+        for line in lines:
+            for line_cleaner in self.__line_cleaners:
+                line = line_cleaner(line)
+            if self.__drop_empty_lines and len(line) == 0:
+                continue
+            cleaned_lines.append(line)
+
+        return cleaned_lines
+
+    def write(self, pdf_path: str, lines: list[str]) -> None:
+        self.__pdf_text_sink.write_pdf(os.path.basename(pdf_path), self.clean(lines))
+
+    def close(self) -> None:
+        if self.__pdf_extractor is not None:
+            self.__pdf_extractor.close()
+            self.__pdf_extractor = None
+        if self.__pdf_text_sink is not None:
+            self.__pdf_text_sink.close()
+            self.__pdf_text_sink = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
@@ -0,0 +1,204 @@
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import threading
+from logging import Logger
+from typing import Iterator
+
+from src.common.Constants import PDF_TEXT_CACHE_FOLDER
+from src.common.ThreadLocalLogger import get_current_logger
+
+
+class PdfTextCache(object):
+    """
+        PdfTextCache - an on-disk cache of the text lines extracted from PDFs, keyed by the sha256 of the PDF content
+        and of the extractor signature (its version and options), so an unchanged PDF is never parsed twice.
+
+        It is made of two files in the cache folder:
+            <name>.dat  the records appended one after the other: the number of lines then the lines,
+                        utf-8 encoded and separated by '\\n'
+            <name>.idx  a magic header then fixed-size entries (key, offset, length) sorted by key
+        Both files are memory-mapped, a lookup is a binary search in the index and a single read of the record,
+        nothing is loaded up front. New records are appended to the data file at once and indexed in memory,
+        close() merges them into a new index which replaces the old one.
+        One process at a time should use a given cache name.
+    """
+
+    INDEX_MAGIC: bytes = b'PDFTIDX1'
+    INDEX_ENTRY: struct.Struct = struct.Struct('<32sQI')
+    RECORD_HEADER: struct.Struct = struct.Struct('<I')
+
+    def __init__(self, cache_name: str, cache_folder: str = PDF_TEXT_CACHE_FOLDER):
+        logger: Logger = get_current_logger()
+        self.__lock: threading.Lock = threading.Lock()
+
+        if not os.path.exists(cache_folder):
+            os.makedirs(cache_folder, exist_ok=True)
+
+        self.data_path: str = os.path.join(cache_folder, '{}.dat'.format(cache_name))
+        self.index_path: str = os.path.join(cache_folder, '{}.idx'.format(cache_name))
+
+        self.__index_stream = None
+        self.__index_map: mmap.mmap = None
+        self.__index_size: int = 0
+        self.__open_index()
+
+        if self.__index_size == 0 and os.path.exists(self.data_path):
+            # records which no index points to can not be found anyway
+            os.remove(self.data_path)
+
+        self.__data_stream = open(self.data_path, 'a+b')
+        self.__data_stream.seek(0, os.SEEK_END)
+        self.__data_map: mmap.mmap = None
+        if self.__data_stream.tell() > 0:
+            self.__data_map = mmap.mmap(self.__data_stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.__new_entries: dict[bytes, tuple[int, int]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        logger.info('PDF text cache {} holds {} PDFs'.format(self.data_path, self.__index_size))
+
+    @staticmethod
+    def key_of(pdf_path: str, extractor_signature: str) -> bytes:
+        content_hash = hashlib.sha256()
+        with open(pdf_path, 'rb') as pdf_stream:
+            for chunk in iter(lambda: pdf_stream.read(1024 * 1024), b''):
+                content_hash.update(chunk)
+
+        return hashlib.sha256(content_hash.digest() + extractor_signature.encode('utf-8')).digest()
+
+    def get(self, key: bytes) -> list[str]:
+        """
+        The lines cached for the key, None if there are none
+        """
+        with self.__lock:
+            location: tuple[int, int] = self.__new_entries.get(key)
+            if location is None:
+                location = self.__find_in_index(key)
+
+            if location is None:
+                self.misses += 1
+                return None
+
+            record: bytes = self.__read_record(location[0], location[1])
+            if record is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        line_count: int = PdfTextCache.RECORD_HEADER.unpack_from(record)[0]
+        if line_count == 0:
+            return []
+
+        return record[PdfTextCache.RECORD_HEADER.size:].decode('utf-8').split('\n')
+
+    def put(self, key: bytes, lines: list[str]) -> None:
+        record: bytes = PdfTextCache.RECORD_HEADER.pack(len(lines)) + '\n'.join(lines).encode('utf-8')
+        with self.__lock:
+            offset: int = self.__data_stream.seek(0, os.SEEK_END)
+            self.__data_stream.write(record)
+            self.__new_entries[key] = (offset, len(record))
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__data_stream is None:
+                return
+
+            self.__data_stream.flush()
+            os.fsync(self.__data_stream.fileno())
+            if len(self.__new_entries) > 0:
+                self.__write_index()
+
+            self.__close_index()
+            if self.__data_map is not None:
+                self.__data_map.close()
+                self.__data_map = None
+            self.__data_stream.close()
+            self.__data_stream = None
+
+    def __open_index(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+
+        index_file_size: int = os.path.getsize(self.index_path)
+        entries_size: int = index_file_size - len(PdfTextCache.INDEX_MAGIC)
+        if entries_size <= 0 or entries_size % PdfTextCache.INDEX_ENTRY.size != 0:
+            return
+
+        self.__index_stream = open(self.index_path, 'rb')
+        self.__index_map = mmap.mmap(self.__index_stream.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.__index_map[:len(PdfTextCache.INDEX_MAGIC)] != PdfTextCache.INDEX_MAGIC:
+            self.__close_index()
+            return
+
+        self.__index_size = entries_size // PdfTextCache.INDEX_ENTRY.size
+
+    def __close_index(self) -> None:
+        if self.__index_map is not None:
+            self.__index_map.close()
+            self.__index_map = None
+        if self.__index_stream is not None:
+            self.__index_stream.close()
+            self.__index_stream = None
+
+    def __index_entry_at(self, position: int) -> tuple[bytes, int, int]:
+        return PdfTextCache.INDEX_ENTRY.unpack_from(self.__index_map,
+                                                    len(PdfTextCache.INDEX_MAGIC)
+                                                    + position * PdfTextCache.INDEX_ENTRY.size)
+
+    def __find_in_index(self, key: bytes) -> tuple[int, int]:
+        low: int = 0
+        high: int = self.__index_size
+        while low < high:
+            middle: int = (low + high) // 2
+            middle_key, offset, length = self.__index_entry_at(middle)
+            if middle_key == key:
+                return offset, length
+            if middle_key < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return None
+
+    def __read_record(self, offset: int, length: int) -> bytes:
+        if self.__data_map is not None and offset + length <= len(self.__data_map):
+            return self.__data_map[offset:offset + length]
+
+        # appended during this run, past the end of the mapping
+        self.__data_stream.flush()
+        self.__data_stream.seek(offset)
+        record: bytes = self.__data_stream.read(length)
+        self.__data_stream.seek(0, os.SEEK_END)
+        return record if len(record) == length else None
+
+    def __index_entries(self) -> Iterator[tuple[bytes, int, int, int]]:
+        for position in range(self.__index_size):
+            key, offset, length = self.__index_entry_at(position)
+            yield key, 1, offset, length
+
+    def __write_index(self) -> None:
+        # on equal keys the new entry (0) is merged before the old one (1) and wins
+        new_entries: list[tuple[bytes, int, int, int]] = sorted((key, 0, offset, length)
+                                                                for key, (offset, length) in self.__new_entries.items())
+        temporary_path: str = '{}.tmp'.format(self.index_path)
+        entry_count: int = 0
+        with open(temporary_path, 'wb') as index_stream:
+            index_stream.write(PdfTextCache.INDEX_MAGIC)
+            previous_key: bytes = None
+            for key, age, offset, length in heapq.merge(new_entries, self.__index_entries()):
+                if key == previous_key:
+                    continue
+                index_stream.write(PdfTextCache.INDEX_ENTRY.pack(key, offset, length))
+                previous_key = key
+                entry_count += 1
+            index_stream.flush()
+            os.fsync(index_stream.fileno())
+
+        self.__close_index()
+        os.replace(temporary_path, self.index_path)
+        self.__index_size = entry_count
+        self.__new_entries.clear()
@@ -0,0 +1,47 @@
+from abc import abstractmethod, ABC
+
+
+class PdfTextSink(ABC):
+    """
+        PdfTextSink - where the text lines extracted from the PDFs are written, one PDF after the other.
+        The layout decides how a PDF is laid out:
+            column - the file name on the first row then one line per row, one column per PDF (the historical layout)
+            row    - one row per PDF: the file name then one line per column
+            long   - one row per line: the file name, the line number and the line
+    """
+
+    COLUMN_LAYOUT: str = 'column'
+    ROW_LAYOUT: str = 'row'
+    LONG_LAYOUT: str = 'long'
+    LAYOUTS: tuple[str, ...] = (COLUMN_LAYOUT, ROW_LAYOUT, LONG_LAYOUT)
+
+    # the size of an Excel sheet
+    EXCEL_MAX_ROWS: int = 1048576
+    EXCEL_MAX_COLUMNS: int = 16384
+
+    @abstractmethod
+    def write_pdf(self, file_name: str, lines: list[str]) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    @staticmethod
+    def rows_of(layout: str, file_name: str, lines: list[str]) -> list[list]:
+        """
+        The rows of a PDF in the row or long layout
+        """
+        if layout == PdfTextSink.ROW_LAYOUT:
+            return [[file_name] + lines]
+
+        if layout == PdfTextSink.LONG_LAYOUT:
+            return [[file_name, line_number, line] for line_number, line in enumerate(lines, start=1)]
+
+        raise Exception('The {} layout is not written row by row'.format(layout))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
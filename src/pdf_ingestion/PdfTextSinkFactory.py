@@ -0,0 +1,52 @@
+import os
+
+from src.excel_reader_provider.ExcelReaderProviderFactory import create_excel_reader_provider
+from src.pdf_ingestion.CsvSink import CsvSink
+from src.pdf_ingestion.ExcelProviderSink import ExcelProviderSink
+from src.pdf_ingestion.PdfTextSink import PdfTextSink
+from src.pdf_ingestion.WriteOnlyWorkbookSink import WriteOnlyWorkbookSink
+
+
+def create_pdf_text_sink(settings: dict[str, str]) -> PdfTextSink:
+    """
+    The sink chosen by the settings:
+        output.format       excel (default, into excel.sheet of excel.path) / xlsx (new write_only workbooks) / csv
+        output.layout       column (default for excel) / row (default for xlsx) / long (default for csv)
+        output.max.rows     rows of a sheet or file before rolling over to the next one
+        output.max.columns  columns of a sheet before rolling over to the next one (excel only)
+        output.folder       folder of the xlsx / csv files, the folder of excel.path by default
+        output.name         base name of the xlsx / csv files, <name of excel.path>_text by default
+    """
+    output_format: str = 'excel' if settings.get('output.format') is None \
+        else str(settings.get('output.format')).strip().lower()
+    format_to_default_layout: dict[str, str] = {'excel': PdfTextSink.COLUMN_LAYOUT,
+                                                'xlsx': PdfTextSink.ROW_LAYOUT,
+                                                'csv': PdfTextSink.LONG_LAYOUT}
+    if output_format not in format_to_default_layout:
+        raise Exception('Unknown output.format {}, expected one of {}'.format(output_format,
+                                                                              list(format_to_default_layout.keys())))
+
+    layout: str = format_to_default_layout[output_format] if settings.get('output.layout') is None \
+        else str(settings.get('output.layout')).strip().lower()
+    max_rows: int = PdfTextSink.EXCEL_MAX_ROWS if settings.get('output.max.rows') is None \
+        else int(settings.get('output.max.rows'))
+
+    if output_format == 'excel':
+        max_columns: int = PdfTextSink.EXCEL_MAX_COLUMNS if settings.get('output.max.columns') is None \
+            else int(settings.get('output.max.columns'))
+        return ExcelProviderSink(excel_provider=create_excel_reader_provider(settings),
+                                 excel_path=settings['excel.path'],
+                                 sheet_name=settings['excel.sheet'],
+                                 layout=layout,
+                                 max_rows=max_rows,
+                                 max_columns=max_columns)
+
+    output_folder: str = os.path.dirname(os.path.abspath(settings['excel.path'])) \
+        if settings.get('output.folder') is None else settings.get('output.folder')
+    output_name: str = '{}_text'.format(os.path.splitext(os.path.basename(settings['excel.path']))[0]) \
+        if settings.get('output.name') is None else settings.get('output.name')
+
+    if output_format == 'xlsx':
+        return WriteOnlyWorkbookSink(output_folder, output_name, settings['excel.sheet'], layout, max_rows)
+
+    return CsvSink(output_folder, output_name, layout, max_rows)
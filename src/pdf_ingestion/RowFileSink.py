@@ -0,0 +1,75 @@
+import os
+from abc import abstractmethod
+from logging import Logger
+
+from src.common.ThreadLocalLogger import get_current_logger
+from src.pdf_ingestion.PdfTextSink import PdfTextSink
+
+
+class RowFileSink(PdfTextSink):
+    """
+        RowFileSink - streams the PDFs row by row (row or long layout) into output files of its own, nothing is kept
+        in memory. When a file holds max_rows rows, the next rows go into a new file: <base name>.<ext>, then
+        <base name>_2.<ext>, <base name>_3.<ext> ...
+    """
+
+    def __init__(self, output_folder: str, base_name: str, extension: str, layout: str, max_rows: int):
+        if layout not in (PdfTextSink.ROW_LAYOUT, PdfTextSink.LONG_LAYOUT):
+            raise Exception('{} files are written row by row, use the row or long output layout, not {}'
+                            .format(extension, layout))
+
+        if not os.path.exists(output_folder):
+            os.makedirs(output_folder)
+
+        self.__output_folder: str = output_folder
+        self.__base_name: str = base_name
+        self.__extension: str = extension
+        self.__layout: str = layout
+        self.__max_rows: int = max_rows
+        self.__file_count: int = 0
+        self.__row_count_in_file: int = 0
+        self.output_paths: list[str] = []
+
+    def write_pdf(self, file_name: str, lines: list[str]) -> None:
+        for row_values in PdfTextSink.rows_of(self.__layout, file_name, lines):
+            if self.__file_count == 0 or self.__row_count_in_file >= self.__max_rows:
+                self.__roll_over()
+
+            self._write_row(row_values)
+            self.__row_count_in_file += 1
+
+        self._flush()
+
+    def __roll_over(self) -> None:
+        logger: Logger = get_current_logger()
+        if self.__file_count > 0:
+            self._close_file()
+
+        self.__file_count += 1
+        suffix: str = '' if self.__file_count == 1 else '_{}'.format(self.__file_count)
+        output_path: str = os.path.join(self.__output_folder,
+                                        '{}{}.{}'.format(self.__base_name, suffix, self.__extension))
+        self._open_file(output_path)
+        self.output_paths.append(output_path)
+        self.__row_count_in_file = 0
+        logger.info('Writing the extracted text into {}'.format(output_path))
+
+    def close(self) -> None:
+        if self.__file_count > 0:
+            self._close_file()
+            self.__file_count = 0
+
+    @abstractmethod
+    def _open_file(self, output_path: str) -> None:
+        pass
+
+    @abstractmethod
+    def _write_row(self, row_values: list) -> None:
+        pass
+
+    def _flush(self) -> None:
+        pass
+
+    @abstractmethod
+    def _close_file(self) -> None:
+        pass
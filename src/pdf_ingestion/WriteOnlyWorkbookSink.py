@@ -0,0 +1,33 @@
+import openpyxl
+from openpyxl.workbook.workbook import Workbook
+
+from src.pdf_ingestion.PdfTextSink import PdfTextSink
+from src.pdf_ingestion.RowFileSink import RowFileSink
+
+
+class WriteOnlyWorkbookSink(RowFileSink):
+    """
+        WriteOnlyWorkbookSink - streams the extracted text into new xlsx workbooks with openpyxl's write_only mode,
+        the rows are written to a temporary file as they come so the memory stays flat
+    """
+
+    def __init__(self, output_folder: str, base_name: str, sheet_name: str, layout: str = PdfTextSink.ROW_LAYOUT,
+                 max_rows: int = PdfTextSink.EXCEL_MAX_ROWS):
+        super().__init__(output_folder, base_name, 'xlsx', layout, min(max_rows, PdfTextSink.EXCEL_MAX_ROWS))
+        self.__sheet_name: str = sheet_name
+        self.__workbook: Workbook = None
+        self.__worksheet = None
+        self.__output_path: str = None
+
+    def _open_file(self, output_path: str) -> None:
+        self.__workbook = openpyxl.Workbook(write_only=True)
+        self.__worksheet = self.__workbook.create_sheet(self.__sheet_name)
+        self.__output_path = output_path
+
+    def _write_row(self, row_values: list) -> None:
+        self.__worksheet.append(row_values)
+
+    def _close_file(self) -> None:
+        self.__workbook.save(self.__output_path)
+        self.__workbook = None
+        self.__worksheet = None
@@ -0,0 +1,99 @@
+import os
+import threading
+from logging import Logger
+from typing import Callable
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from src.common.ThreadLocalLogger import get_current_logger
+
+
+class WebDriverBroker:
+    """
+        WebDriverBroker - keeps the browser session released by a finished task warm and hands it over to the next
+        task running in the same mode (headless or GUI), so a chain of browser tasks pays for Chrome and
+        chromedriver startup only once.
+        Cookies are wiped between tasks unless the acquiring task asks to keep them.
+    """
+
+    def __init__(self):
+        self.__lock: threading.Lock = threading.Lock()
+        self.__use_gui_to_idle_driver: dict[bool, WebDriver] = {}
+
+    def acquire(self,
+                use_gui: bool,
+                keep_cookies: bool,
+                download_folder: str,
+                create_driver: Callable[[], WebDriver]) -> WebDriver:
+        logger: Logger = get_current_logger()
+
+        with self.__lock:
+            driver: WebDriver = self.__use_gui_to_idle_driver.pop(use_gui, None)
+
+        if driver is not None and not WebDriverBroker.__is_alive(driver):
+            logger.info('The warm browser session is not reachable anymore, a new one will be launched')
+            WebDriverBroker.__quit_silently(driver)
+            driver = None
+
+        if driver is None:
+            return create_driver()
+
+        logger.info('Reuse the warm browser session of the previous task')
+        if not keep_cookies:
+            WebDriverBroker.__clear_cookies(driver)
+
+        if download_folder is not None:
+            # the download folder is a launch preference, it must be re-pointed for the new task
+            driver.execute_cdp_cmd('Browser.setDownloadBehavior', {'behavior': 'allow',
+                                                                   'downloadPath': os.path.abspath(download_folder)})
+        return driver
+
+    def release(self, driver: WebDriver, use_gui: bool) -> None:
+        if not WebDriverBroker.__is_alive(driver):
+            WebDriverBroker.__quit_silently(driver)
+            return
+
+        # leave only one blank tab for the next task
+        window_handles: list[str] = driver.window_handles
+        for window_handle in window_handles[1:]:
+            driver.switch_to.window(window_handle)
+            driver.close()
+        driver.switch_to.window(window_handles[0])
+        driver.get('about:blank')
+
+        with self.__lock:
+            replaced_driver: WebDriver = self.__use_gui_to_idle_driver.get(use_gui)
+            self.__use_gui_to_idle_driver[use_gui] = driver
+
+        if replaced_driver is not None:
+            WebDriverBroker.__quit_silently(replaced_driver)
+
+    def shutdown(self) -> None:
+        with self.__lock:
+            idle_drivers: list[WebDriver] = list(self.__use_gui_to_idle_driver.values())
+            self.__use_gui_to_idle_driver.clear()
+
+        for driver in idle_drivers:
+            WebDriverBroker.__quit_silently(driver)
+
+    @staticmethod
+    def __is_alive(driver: WebDriver) -> bool:
+        try:
+            return len(driver.window_handles) > 0
+        except Exception:
+            return False
+
+    @staticmethod
+    def __clear_cookies(driver: WebDriver) -> None:
+        try:
+            # wipe the cookies of every domain, delete_all_cookies only covers the current page's domain
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except Exception:
+            driver.delete_all_cookies()
+
+    @staticmethod
+    def __quit_silently(driver: WebDriver) -> None:
+        try:
+            driver.quit()
+        except Exception as exception:
+            get_current_logger().debug('Can not quit the browser session: {}'.format(str(exception)))
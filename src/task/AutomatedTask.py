@@ -1,5 +1,6 @@
 import logging
 import os
+import threading
 import time
 import uuid
 from abc import abstractmethod, ABC
@@ -8,18 +9,25 @@ from logging import Logger
 from typing import Callable
 
 from selenium import webdriver
-from selenium.common import TimeoutException
+from selenium.common import TimeoutException, NoSuchElementException, StaleElementReferenceException, \
+    ElementNotInteractableException, ElementClickInterceptedException
 from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver as AnyDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions
 from selenium.webdriver.support.wait import WebDriverWait
 
+from src.common.CheckpointJournal import CheckpointJournal
+from src.common.DocumentFetcher import DocumentFetcher
+from src.common.DownloadWatcher import DownloadWatcher, DownloadTimeoutException
 from src.common.Percentage import Percentage
 from src.common.ResumableThread import ResumableThread
 from src.common.StringUtil import validate_keys_of_dictionary
-from src.common.ThreadLocalLogger import get_current_logger, create_thread_local_logger
+from src.common.TaskPipe import TaskPipe
+from src.common.ThreadLocalLogger import get_current_logger, create_thread_local_logger, set_current_logger
 from src.setup.DownloadDriver import place_suitable_chromedriver, get_full_browser_driver_path
+from src.setup.WebDriverBroker import WebDriverBroker
 
 
 class AutomatedTask(Percentage, ResumableThread, ABC):
@@ -47,6 +55,9 @@ class AutomatedTask(Percentage, ResumableThread, ABC):
 
         super().__init__()
 
+        # per-thread state of the worker sessions used by perform_mainloop_on_collection in parallel mode
+        self._parallel_session = threading.local()
+
         logger: Logger = get_current_logger()
         self._settings: dict[str, str] = settings
         self.callback_before_run_task = callback_before_run_task
@@ -75,20 +86,96 @@ class AutomatedTask(Percentage, ResumableThread, ABC):
 
         if not self.use_gui:
             logger.info('Run in headless mode')
+
+        # the browser is only launched when the task touches self._driver for the first time
+        self.__driver_lock: threading.Lock = threading.Lock()
         self._driver = None
+        # when a broker is attached (console sequential runs), the browser session is borrowed from it
+        self.driver_broker: WebDriverBroker = None
+
+        if self._settings.get('browser.keep_cookies') is None:
+            self._keep_cookies = False
+        else:
+            self._keep_cookies = 'True'.lower() == str(self._settings.get('browser.keep_cookies')).lower()
 
         if settings.get('time.unit.factor') is None:
             self._time_sleep: float = 1
         else:
             self._time_sleep = float(settings.get('time.unit.factor'))
 
+        if settings.get('parallel.sessions') is None:
+            self._parallel_sessions: int = 1
+        else:
+            self._parallel_sessions = max(1, int(settings.get('parallel.sessions')))
+
+        if settings.get('download.http.workers') is None:
+            self._http_download_workers: int = 4
+        else:
+            self._http_download_workers = max(1, int(settings.get('download.http.workers')))
+
+        # resume: skip the items already done by a previous run / failed: only re-run the failed ones /
+        # off (default): every run processes the whole input, a task opts in from its properties file
+        if settings.get('checkpoint.mode') is None:
+            self._checkpoint_mode: str = 'off'
+        else:
+            self._checkpoint_mode = str(settings.get('checkpoint.mode')).strip().lower()
+
+        # connected by the pipeline run mode: the task consumes its input from input_pipe instead of its own input
+        # file and/or hands what it produces over to the next task through output_pipe
+        self.input_pipe: TaskPipe = None
+        self.output_pipe: TaskPipe = None
+
+    @property
+    def _driver(self) -> WebDriver:
+        # A worker thread of the parallel mainloop drives its own browser session, other threads use the main one
+        if getattr(self._parallel_session, 'is_worker', False):
+            if self._parallel_session.driver is None:
+                self._parallel_session.driver = self._setup_driver(get_full_browser_driver_path())
+                self._prepare_parallel_session()
+            return self._parallel_session.driver
+
+        if self.__driver is None:
+            with self.__driver_lock:
+                if self.__driver is None:
+                    self.__driver = self.__create_main_driver()
+
+        return self.__driver
+
+    @_driver.setter
+    def _driver(self, driver: WebDriver):
+        self.__driver = driver
+
+    def __create_main_driver(self) -> WebDriver:
+        if self.driver_broker is None:
+            return self._setup_driver(get_full_browser_driver_path())
+
+        return self.driver_broker.acquire(use_gui=self.use_gui,
+                                          keep_cookies=self._keep_cookies,
+                                          download_folder=self._download_folder,
+                                          create_driver=lambda: self._setup_driver(get_full_browser_driver_path()))
+
+    def _release_driver(self) -> None:
+        """
+        Done with the browser: hand the session back to the broker if any, otherwise close it as before
+        """
+        with self.__driver_lock:
+            driver: WebDriver = self.__driver
+            self.__driver = None
+
+        if driver is None:
+            return
+
+        if self.driver_broker is None:
+            driver.close()
+            return
+
+        self.driver_broker.release(driver, self.use_gui)
+
     def perform(self) -> None:
         mandatory_settings: list[str] = self.mandatory_settings()
         mandatory_settings.append('invoked_class')
         validate_keys_of_dictionary(self._settings, set(mandatory_settings))
 
-        browser_driver: str = get_full_browser_driver_path()
-        self._driver = self._setup_driver(browser_driver)
         logger: Logger = create_thread_local_logger(class_name=self._settings['invoked_class'],
                                                     thread_uuid=str(uuid.uuid4()))
 
@@ -99,20 +186,87 @@ class AutomatedTask(Percentage, ResumableThread, ABC):
             self.automate()
         except Exception as exception:
             logger.exception(str(exception))
+
+        # a pipeline stage lets its neighbours know it is over, even when it failed or was terminated
+        if self.output_pipe is not None:
+            self.output_pipe.close()
+        if self.input_pipe is not None:
+            self.input_pipe.abandon()
+
+        if self.driver_broker is not None:
+            self._release_driver()
         logger.info("Done task. It ends at {}".format(datetime.now()))
         del logging.Logger.manager.loggerDict[self._settings['invoked_class']]
 
     def perform_mainloop_on_collection(self,
                                        collection,
-                                       critical_operation_on_each_element: Callable[[object], None]):
+                                       critical_operation_on_each_element: Callable[[object], None],
+                                       key_of_element: Callable[[object], str] = str):
+        logger: Logger = get_current_logger()
+        journal: CheckpointJournal = self._open_checkpoint_journal(
+            None if isinstance(collection, TaskPipe) else [key_of_element(each_element) for each_element in collection])
+        # in a pipeline, the outputs of the elements done by a previous run, the next stage may not have them yet
+        outputs_of_done_elements: list = []
+
+        if isinstance(collection, TaskPipe):
+            # the consumer of a pipeline starts with its producer, its size is the one the producer announces
+            collection.wait_for_expected_size()
+
+        if journal is not None and isinstance(collection, TaskPipe):
+            collection.keep_only(lambda each_element: journal.is_pending(key_of_element(each_element),
+                                                                         only_failed=self._checkpoint_mode == 'failed'))
+            critical_operation_on_each_element = self._journaled_operation(journal,
+                                                                           critical_operation_on_each_element,
+                                                                           key_of_element)
+        elif journal is not None:
+            pending_collection: list = journal.pending(collection,
+                                                       only_failed=self._checkpoint_mode == 'failed',
+                                                       key_of_element=key_of_element)
+            if len(pending_collection) != len(collection):
+                logger.info('Checkpoint journal {}: {} of {} items are left to process'.format(
+                    journal.journal_path, len(pending_collection), len(collection)))
+            if self.output_pipe is not None:
+                outputs_of_done_elements = [output for output in
+                                            (self._output_of_done_element(each_element) for each_element in collection
+                                             if journal.is_done(key_of_element(each_element)))
+                                            if output is not None]
+            collection = pending_collection
+            critical_operation_on_each_element = self._journaled_operation(journal,
+                                                                           critical_operation_on_each_element,
+                                                                           key_of_element)
+
         self.current_element_count = 0
         self.total_element_size = len(collection)
+
+        # by default a producer announces one output element for each of its input elements
+        if self.output_pipe is not None and not self.output_pipe.is_expected_size_announced:
+            self.output_pipe.expected_size = self.total_element_size + len(outputs_of_done_elements)
+        for output in outputs_of_done_elements:
+            self.output_pipe.put(output)
+
+        is_completed: bool = False
+        try:
+            if self._parallel_sessions > 1 and (self.total_element_size > 1 or isinstance(collection, TaskPipe)):
+                is_completed = self.__perform_mainloop_in_parallel_sessions(collection,
+                                                                            critical_operation_on_each_element)
+            else:
+                is_completed = self.__perform_mainloop_sequentially(collection, critical_operation_on_each_element)
+        finally:
+            if journal is not None:
+                if is_completed:
+                    journal.complete()
+                else:
+                    journal.close()
+
+    def __perform_mainloop_sequentially(self,
+                                        collection,
+                                        critical_operation_on_each_element: Callable[[object], None]) -> bool:
         logger: Logger = get_current_logger()
 
         for each_element in collection:
 
             if self.terminated is True:
-                return
+                return False
 
             with self.pause_condition:
 
@@ -121,10 +275,147 @@ class AutomatedTask(Percentage, ResumableThread, ABC):
                     self.pause_condition.wait()
 
                 if self.terminated is True:
-                    return
+                    return False
 
             critical_operation_on_each_element(each_element)
-            self.current_element_count = self.current_element_count + 1
+            if isinstance(collection, TaskPipe):
+                self.total_element_size = len(collection)
+            self.increase_current_element_count()
+
+        return True
+
+    def _open_checkpoint_journal(self, input_items: list[str] = None) -> CheckpointJournal:
+        """
+        The journal of this task for its input file, None when checkpoint.mode is off or the task has no input file.
+        Given the input items, a journal written for other items is started over
+        """
+        input_file: str = self._settings.get('excel.path')
+        if self._checkpoint_mode == 'off' or input_file is None:
+            return None
+
+        return CheckpointJournal(task_name=type(self).__name__,
+                                 input_file=input_file,
+                                 input_fingerprint=None if input_items is None
+                                 else CheckpointJournal.fingerprint_of(input_items))
+
+    def _journaled_operation(self,
+                             journal: CheckpointJournal,
+                             critical_operation_on_each_element: Callable[[object], None],
+                             key_of_element: Callable[[object], str] = str) -> Callable[[object], None]:
+        """
+        The operation recording each element into the journal: failed when it raises (which stops the run) or
+        returns False (for an element it could not process while the run goes on), done otherwise, and nothing when
+        the task was terminated in the middle of it
+        """
+
+        def operate_then_record(each_element) -> None:
+            try:
+                is_processed = critical_operation_on_each_element(each_element)
+            except Exception:
+                journal.mark_failed(key_of_element(each_element))
+                raise
+
+            if is_processed is False:
+                journal.mark_failed(key_of_element(each_element))
+                return
+
+            if self.terminated is True:
+                return
+
+            journal.mark_done(key_of_element(each_element))
+
+        return operate_then_record
+
+    def __perform_mainloop_in_parallel_sessions(self,
+                                                collection,
+                                                critical_operation_on_each_element: Callable[[object], None]) -> bool:
+        """
+        Spread the collection over `parallel.sessions` worker threads. The first worker keeps using the main
+        driver, every other worker gets its own browser session (created on its first use of self._driver and
+        prepared by _prepare_parallel_session). Workers pull the next element from a shared iterator, so a slow
+        element never leaves the other sessions idle.
+        """
+        logger: Logger = get_current_logger()
+        # the size of a pipe is not known until its producer is done, every session waits on it for its elements
+        session_count: int = self._parallel_sessions if isinstance(collection, TaskPipe) \
+            else min(self._parallel_sessions, self.total_element_size)
+        logger.info('Run the mainloop on {} parallel sessions'.format(session_count))
+
+        element_iterator = iter(collection)
+        element_iterator_lock: threading.Lock = threading.Lock()
+        no_more_element = object()
+        failures: list[Exception] = []
+
+        def run_session(session_index: int) -> None:
+            set_current_logger(logger)
+            self._parallel_session.is_worker = session_index > 0
+            self._parallel_session.driver = None
+            try:
+                while True:
+
+                    if self.terminated is True:
+                        return
+
+                    with self.pause_condition:
+
+                        while self.paused:
+                            logger.info("Currently pause")
+                            self.pause_condition.wait()
+
+                        if self.terminated is True:
+                            return
+
+                    with element_iterator_lock:
+                        if len(failures) > 0:
+                            return
+                        each_element = next(element_iterator, no_more_element)
+
+                    if each_element is no_more_element:
+                        return
+
+                    critical_operation_on_each_element(each_element)
+                    if isinstance(collection, TaskPipe):
+                        self.total_element_size = len(collection)
+                    self.increase_current_element_count()
+
+            except Exception as exception:
+                logger.error('Session {} stopped: {}'.format(session_index, str(exception)))
+                with element_iterator_lock:
+                    failures.append(exception)
+
+            finally:
+                if self._parallel_session.driver is not None:
+                    self._parallel_session.driver.quit()
+                    self._parallel_session.driver = None
+
+        session_threads: list[threading.Thread] = [threading.Thread(target=run_session, args=(index,), daemon=False)
+                                                   for index in range(session_count)]
+        for session_thread in session_threads:
+            session_thread.start()
+
+        for session_thread in session_threads:
+            session_thread.join()
+
+        if len(failures) > 0:
+            raise failures[0]
+
+        return self.terminated is not True
+
+    def _output_of_done_element(self, element):
+        """
+        Called in a pipeline for each element a previous run already did, which the checkpoint journal skips.
+        Producers override it to return what the element put on output_pipe (None when it is not there anymore), so
+        it is handed over again to the next stage, which skips it in turn if it already consumed it
+        """
+        return None
+
+    def _prepare_parallel_session(self) -> None:
+        """
+        Called right after a worker of the parallel mainloop opened its own browser session.
+        Tasks supporting `parallel.sessions` override it to bring the new session to the same state as the
+        main one (e.g. navigate to the portal and log in)
+        """
+        pass
 
     def _setup_driver(self, browser_driver: str) -> WebDriver:
 
@@ -187,21 +478,41 @@ class AutomatedTask(Percentage, ResumableThread, ABC):
         return
 
     def _wait_download_file_complete(self, file_path: str) -> None:
-        logger: Logger = get_current_logger()
-        logger.info(r'Waiting for downloading {} complete'.format(file_path))
-        attempt_counting: int = 0
-        max_attempt: int = 60 * 3
-        while True:
-            if attempt_counting > max_attempt:
-                raise Exception('The webapp waiting too long to download {}. Please check'.format(file_path))
+        self._wait_download_files_complete([file_path])
 
-            if not os.path.exists(file_path):
-                time.sleep(1 * self._timingFactor)
-                attempt_counting += 1
-                continue
-
-            break
-        logger.info(r'Downloading {} complete'.format(file_path))
+    def _wait_download_files_complete(self, file_paths: list[str]) -> None:
+        logger: Logger = get_current_logger()
+        logger.info(r'Waiting for downloading {} complete'.format(', '.join(file_paths)))
+
+        download_folder: str = os.path.dirname(os.path.abspath(file_paths[0]))
+        with DownloadWatcher(folder=download_folder) as download_watcher:
+            try:
+                download_watcher.wait_for_files(file_paths, timeout=60 * 3 * self._timingFactor)
+            except DownloadTimeoutException as exception:
+                raise Exception('The webapp waiting too long to download. Please check. {}'.format(str(exception)))
+
+        logger.info(r'Downloading {} complete'.format(', '.join(file_paths)))
+
+    def _fetch_documents_with_browser_session(self,
+                                              url_to_file_path: dict[str, str],
+                                              auth: tuple[str, str] = None,
+                                              auth_host: str = None) -> dict[str, Exception]:
+        """
+        Download the documents straight over HTTP with the cookies of the current browser session, up to
+        `download.http.workers` at the same time, instead of one click and one wait in Chrome per document.
+        The auth credentials, if any, are only sent to auth_host.
+        Return the urls which could not be downloaded mapped to their error
+        """
+        cookies: list[dict] = self._driver.get_cookies()
+        headers: dict[str, str] = {'User-Agent': self._driver.execute_script('return navigator.userAgent;'),
+                                   'Referer': self._driver.current_url}
+
+        with DocumentFetcher(cookies=cookies,
+                             headers=headers,
+                             auth=auth,
+                             auth_host=auth_host,
+                             max_workers=self._http_download_workers) as document_fetcher:
+            return document_fetcher.fetch_all(url_to_file_path)
 
     def _wait_navigating_to_other_page_complete(self, previous_url: str, expected_end_with: str = None) -> None:
         logger: Logger = get_current_logger()
@@ -251,93 +562,143 @@ class AutomatedTask(Percentage, ResumableThread, ABC):
                 time.sleep(1 * self._timingFactor)
                 current_attempt = current_attempt + 1
 
-    def _type_when_element_present(self, by: str, value: str, content: str, time_sleep: int = 1) -> WebElement:
-        web_element: WebElement = self.__get_element_satisfy_predicate(by,
-                                                                       value,
-                                                                       expected_conditions.presence_of_element_located(
-                                                                           (by, value)),
-                                                                       time_sleep)
-
-        web_element.send_keys(content)
-        return web_element
-
-    def _click_when_element_present(self, by: str, value: str, time_sleep: int = 1) -> WebElement:
-        web_element: WebElement = self.__get_element_satisfy_predicate(by,
-                                                                       value,
-                                                                       expected_conditions.presence_of_element_located(
-                                                                           (by, value)),
-                                                                       time_sleep)
+    def _type_when_element_present(self, by: str, value: str, content: str) -> WebElement:
+        return self._get_element_satisfy_predicate(by,
+                                                   value,
+                                                   self.__act_on_element_when_actionable(
+                                                       by, value, lambda web_element: web_element.send_keys(content)))
 
-        web_element.click()
-        return web_element
+    def _click_when_element_present(self, by: str, value: str) -> WebElement:
+        return self._get_element_satisfy_predicate(by,
+                                                   value,
+                                                   self.__act_on_element_when_actionable(
+                                                       by, value, lambda web_element: web_element.click()))
 
-    def _click_and_wait_navigate_to_other_page(self, by: str, value: str, time_sleep: int = 1) -> WebElement:
+    def _click_and_wait_navigate_to_other_page(self, by: str, value: str) -> WebElement:
         previous_url: str = self._driver.current_url
-        web_element: WebElement = self.__get_element_satisfy_predicate(by,
-                                                                       value,
-                                                                       expected_conditions.presence_of_element_located(
-                                                                           (by, value)),
-                                                                       time_sleep)
-        web_element.click()
+        web_element: WebElement = self._click_when_element_present(by, value)
         self._wait_navigating_to_other_page_complete(previous_url=previous_url)
         return web_element
 
-    def _get_when_element_present(self, by: str, value: str, time_sleep: int = 1) -> WebElement:
-        web_element: WebElement = self.__get_element_satisfy_predicate(by,
-                                                                       value,
-                                                                       expected_conditions.presence_of_element_located(
-                                                                           (by, value)),
-                                                                       time_sleep)
+    def _get_when_element_present(self, by: str, value: str) -> WebElement:
+        web_element: WebElement = self._get_element_satisfy_predicate(by,
+                                                                      value,
+                                                                      expected_conditions.presence_of_element_located(
+                                                                          (by, value)))
         return web_element
 
-    def _try_to_get_if_element_present(self, by: str, value: str, time_sleep: int = 1, waiting_time: int = 30
-                                       ) -> WebElement:
+    def _try_to_get_if_element_present(self, by: str, value: str, waiting_time: int = 30) -> WebElement:
 
         try:
-            web_element: WebElement = self.__get_element_satisfy_predicate(by,
-                                                                           value,
-                                                                           expected_conditions.presence_of_element_located(
-                                                                               (by, value)),
-                                                                           time_sleep,
-                                                                           waiting_time)
+            web_element: WebElement = self._get_element_satisfy_predicate(by,
+                                                                          value,
+                                                                          expected_conditions.presence_of_element_located(
+                                                                              (by, value)),
+                                                                          waiting_time)
 
             return web_element
         except TimeoutException:
             return None
 
-    def __get_element_satisfy_predicate(self,
-                                        by: str,
-                                        element_selector: str,
-                                        method: Callable[[AnyDriver], WebElement],
-                                        first_time_sleep: int = 1,
-                                        waiting_time: int = 30) -> WebElement:
-        time.sleep(first_time_sleep * self._timingFactor)
-        if self.use_gui:
-            WebDriverWait(self._driver, waiting_time * self._timingFactor).until(method)
-        queried_element: WebElement = self._driver.find_element(by=by, value=element_selector)
-        return queried_element
+    def _get_element_satisfy_predicate(self,
+                                       by: str,
+                                       element_selector: str,
+                                       method: Callable[[AnyDriver], WebElement],
+                                       waiting_time: int = 30) -> WebElement:
+        """
+        Poll `method` until it returns the element, the same way in headless and GUI mode, without any fixed sleep
+        before the first look: a caller which has to wait for a new page waits for it before.
+        time.unit.factor scales the timeout
+        """
+        waiter: WebDriverWait = WebDriverWait(self._driver,
+                                              timeout=waiting_time * self._timingFactor,
+                                              poll_frequency=0.1,
+                                              ignored_exceptions=(NoSuchElementException,
+                                                                  StaleElementReferenceException,
+                                                                  ElementNotInteractableException,
+                                                                  ElementClickInterceptedException))
+        return waiter.until(method, message='Element {} is not ready after {} seconds'.format(
+            element_selector, waiting_time * self._timingFactor))
+
+    @staticmethod
+    def __act_on_element_when_actionable(by: str,
+                                         element_selector: str,
+                                         action: Callable[[WebElement], None]) -> Callable[[AnyDriver], WebElement]:
+        # The action itself is the actionability check: while the element is missing, stale, covered or not
+        # interactable yet, the action raises one of the ignored exceptions and the waiter polls again
+        def act_on_element(driver: AnyDriver) -> WebElement:
+            web_element: WebElement = driver.find_element(by=by, value=element_selector)
+            action(web_element)
+            return web_element
+
+        return act_on_element
+
+    def _scrape_elements(self,
+                         by: str,
+                         elements_selector: str,
+                         attribute_names: list[str] = None,
+                         cell_selector: str = None,
+                         cell_attribute_name: str = None) -> list[dict]:
+        """
+        Read every element matching the css selector or xpath in a single execute_script round trip, instead of one
+        WebDriver call per element and per attribute. Each element becomes a plain record:
+            index            - position among the matched elements
+            child_index      - position among its siblings, usable in a :nth-child() selector
+            text             - innerText
+            attributes       - the requested attribute names mapped to their values
+            cells            - innerText (or cell_attribute_name) of its descendants matching cell_selector
+            shadow_children  - innerText of the children of its shadow root, if any
+            element          - the WebElement itself, to act on the record found
+        """
+        return self._driver.execute_script(_SCRAPE_ELEMENTS_SCRIPT,
+                                           'xpath' if by == By.XPATH else 'css',
+                                           elements_selector,
+                                           [] if attribute_names is None else attribute_names,
+                                           cell_selector,
+                                           cell_attribute_name)
 
     def find_matched_option(self: object, by: str, list_options_selector: str, search_keyword: str) -> WebElement:
-        options: list[WebElement] = self._driver.find_elements(by=by, value=list_options_selector)
-        finding_option = None
-        for current_option in options:
-            current_inner_text = current_option.get_attribute('innerText')
-            if current_inner_text == search_keyword:
-                finding_option = current_option
-                break
-        if finding_option is None:
-            raise Exception('Can not find out the option whose inner text match your search keyword')
-        return finding_option
+        for option in self._scrape_elements(by, list_options_selector):
+            if option['text'] == search_keyword:
+                return option['element']
+
+        raise Exception('Can not find out the option whose inner text match your search keyword')
 
     def find_matched_option_shadow(self: object, by: str, list_options_selector: str,
                                    search_keyword: str) -> WebElement:
-        options: list[WebElement] = self._driver.find_elements(by=by, value=list_options_selector)
-        finding_option = None
-        for current_option in options:
-            current_inner_text = current_option.get_attribute('innerText')
-            if current_inner_text == search_keyword:
-                finding_option = current_option
-                break
-        if finding_option is None:
-            raise Exception('Can not find out the option whose inner text match your search keyword')
-        return finding_option
+        return self.find_matched_option(by, list_options_selector, search_keyword)
+
+
+_SCRAPE_ELEMENTS_SCRIPT: str = """
+    const [by, selector, attributeNames, cellSelector, cellAttributeName] = arguments;
+
+    let elements = [];
+    if (by === 'xpath') {
+        const snapshot = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let index = 0; index < snapshot.snapshotLength; index++) {
+            elements.push(snapshot.snapshotItem(index));
+        }
+    } else {
+        elements = Array.from(document.querySelectorAll(selector));
+    }
+
+    const readCell = (cell) => cellAttributeName ? cell.getAttribute(cellAttributeName) : cell.innerText;
+
+    return elements.map((element, index) => {
+        const attributes = {};
+        for (const attributeName of attributeNames) {
+            attributes[attributeName] = element.getAttribute(attributeName);
+        }
+
+        return {
+            index: index,
+            child_index: element.parentElement ? Array.from(element.parentElement.children).indexOf(element) + 1 : 1,
+            text: element.innerText,
+            attributes: attributes,
+            cells: cellSelector ? Array.from(element.querySelectorAll(cellSelector)).map(readCell) : [],
+            shadow_children: element.shadowRoot ? Array.from(element.shadowRoot.children).map(
+                (child) => child.innerText) : [],
+            element: element
+        };
+    });
+"""
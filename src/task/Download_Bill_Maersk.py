@@ -9,10 +9,10 @@ from selenium.webdriver import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row
-from src.common.StringUtil import get_row_index_from_excel_cell_format
+from src.common.FileUtil import get_excel_records_start_at_row, ExcelInputRecord
 from src.common.ThreadLocalLogger import get_current_logger
-from src.excel_reader_provider.XlwingProvider import XlwingProvider
+from src.excel_reader_provider.ExcelReaderProvider import ExcelReaderProvider
+from src.excel_reader_provider.ExcelReaderProviderFactory import create_excel_reader_provider
 from src.task.AutomatedTask import AutomatedTask
 
 
@@ -27,7 +27,8 @@ class Download_Bill_Maersk(AutomatedTask):
     def __init__(self, settings: dict[str, str], callback_before_run_task: Callable[[], None]):
         super().__init__(settings, callback_before_run_task)
 
-        self._excel_provider = XlwingProvider()
+        # acquired by automate() and released when it ends, so a failed task does not hold the Excel session
+        self._excel_provider: ExcelReaderProvider = None
         self.bill_type_to_download_code: dict[str, str] = {
             'certifiedTrueCopy': 'CertifiedTrueCopy',
             'waybill': 'Waybill',
@@ -59,54 +60,49 @@ class Download_Bill_Maersk(AutomatedTask):
 
         logger.info("Login successfully")
 
-        bills: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                 self._settings['excel.sheet'],
-                                                                 self._settings['excel.column.bill'])
-
-        type_bill: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                     self._settings['excel.sheet'],
-                                                                     self._settings['excel.column.doc.type'])
-        if len(bills) == 0:
-            logger.error('Input booking id list is empty ! Please check again')
-
-        if len(bills) != len(type_bill):
+        records: list[ExcelInputRecord] = get_excel_records_start_at_row(
+            self._settings['excel.path'],
+            self._settings['excel.sheet'],
+            {'bill': self._settings['excel.column.bill'], 'type': self._settings['excel.column.doc.type']})
+        if not all(record.is_complete() for record in records):
             raise Exception("Please check your input data length of bills, type_bill are not equal")
 
-        index: int = 0
-        for bill in bills:
-            self.bill_to_info[bill] = (type_bill[index])
-            index += 1
-
-        excel_row_index: int = get_row_index_from_excel_cell_format(self._settings['excel.column.bill'])
-        for bill in bills:
-
-            if self.terminated is True:
-                return
-
-            with self.pause_condition:
-
-                while self.paused:
-                    self.pause_condition.wait()
-
-                if self.terminated is True:
-                    return
-
-            logger.info("Processing booking : " + bill)
-            self.__navigate_and_download(bill, excel_row_index)
-            excel_row_index += 1
-
-        self._driver.close()
+        for record in records:
+            self.bill_to_info[record['bill']] = (record['type'])
 
-        workbook_path = self._settings['excel.path']
-        workbook = self._excel_provider.get_workbook(workbook_path)
-        self._excel_provider.close(workbook=workbook)
-        self._excel_provider.quit_session()
+        # the statuses are written back on the row each bill was read from
+        bills_and_excel_row_indexes: list[tuple[str, int]] = [(record['bill'], record.row) for record in records]
+        self._excel_provider = create_excel_reader_provider(self._settings)
+        try:
+            self.perform_mainloop_on_collection(bills_and_excel_row_indexes,
+                                                self.operation_on_each_element,
+                                                key_of_element=lambda bill_and_excel_row_index:
+                                                bill_and_excel_row_index[0])
+        finally:
+            # also on terminate or failure, so the statuses still buffered are written and saved
+            self._release_driver()
+
+            try:
+                workbook_path = self._settings['excel.path']
+                workbook = self._excel_provider.get_workbook(workbook_path)
+                self._excel_provider.close(workbook=workbook)
+            finally:
+                self._excel_provider.quit_session()
+                self._excel_provider = None
+
+        if self.terminated is True:
+            return
 
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
         logger.info("It ends at {}. Press any key to end program...".format(datetime.now()))
-        # self.perform_mainloop_on_collection(bills, Download_Bill_Maersk.operation_on_each_element)
+
+    def operation_on_each_element(self, bill_and_excel_row_index: tuple[str, int]) -> bool:
+        logger: Logger = get_current_logger()
+        bill, excel_row_index = bill_and_excel_row_index
+        logger.info("Processing booking : " + bill)
+        return self.__navigate_and_download(bill, excel_row_index)
 
     def __login(self):
 
@@ -215,7 +211,11 @@ class Download_Bill_Maersk(AutomatedTask):
 
         logger.info('Done setting account, progressing to navigate and download Bill')
 
-    def __navigate_and_download(self, bill: str, excel_row_index: int):
+    def __navigate_and_download(self, bill: str, excel_row_index: int) -> bool:
+        """
+        Download the document of the bill and write its status, False when it is not there (Not yet / Missing),
+        so a rerun of the failed bills tries it again
+        """
 
         logger: Logger = get_current_logger()
 
@@ -233,7 +233,8 @@ class Download_Bill_Maersk(AutomatedTask):
         if shipment_content is None:
             self.filling_value(workbook_path=path_to_excel_contain_pdfs_content, sheet_name=sheet_name,
                                row_index=excel_row_index, status='Not yet')
-            return
+            logger.error('The shipment of bill {} is not there yet'.format(bill))
+            return False
 
         option_documents: WebElement = self.find_matched_option_shadow_bill_msk(by=By.CSS_SELECTOR,
                                                                                 list_options_selector='#main #maersk-app mc-tab-bar div:nth-child(1) div.documents-list__group div.tasks-documents-card',
@@ -243,7 +244,8 @@ class Download_Bill_Maersk(AutomatedTask):
         if option_documents is None:
             self.filling_value(workbook_path=path_to_excel_contain_pdfs_content, sheet_name=sheet_name,
                                row_index=excel_row_index, status='Missing')
-            return
+            logger.error('The {} document of bill {} is missing'.format(self.bill_to_info.get(bill), bill))
+            return False
 
         # click button download
         # Dậu đổ bìm leo ver1
@@ -271,20 +273,26 @@ class Download_Bill_Maersk(AutomatedTask):
             os.remove(des)
 
         os.rename(source, des)
+        return True
 
     def find_matched_option_shadow_bill_msk(self: object, by: str, list_options_selector: str,
                                             search_keyword: str) -> WebElement:
-        options: list[WebElement] = self._driver.find_elements(by=by, value=list_options_selector)
-        finding_option = None
+        # the data-test of every card's h3 is read in one round trip
+        options: list[dict] = self._scrape_elements(by=by,
+                                                    elements_selector=list_options_selector,
+                                                    cell_selector='h3',
+                                                    cell_attribute_name='data-test')
         for current_option in options:
-            current_inner_text = current_option.find_element(by=By.CSS_SELECTOR, value='h3').get_attribute('data-test')
+            if len(current_option['cells']) == 0 or current_option['cells'][0] is None:
+                continue
+
+            current_inner_text = current_option['cells'][0]
             if current_inner_text.lower() in search_keyword.lower():
-                finding_option = current_option
-                break
-        return finding_option
+                return current_option['element']
+        return None
 
     def filling_value(self, workbook_path, sheet_name: str, row_index: int, status: str):
         workbook = self._excel_provider.get_workbook(workbook_path)
-        sheet = workbook.sheets[sheet_name]
+        sheet = self._excel_provider.get_worksheet(workbook, sheet_name)
         self._excel_provider.change_value_at(sheet, row_index, 3, status)
         self._excel_provider.save(workbook)
@@ -1,6 +1,5 @@
 import os
 import threading
-import time
 from datetime import datetime, timedelta
 from logging import Logger
 from typing import Callable
@@ -8,8 +7,8 @@ from typing import Callable
 from selenium.webdriver.common.by import By
 
 from src.common.Constants import ZIP_EXTENSION
-from src.common.FileUtil import get_excel_data_in_column_start_at_row, extract_zip, \
-    check_parent_folder_contain_all_required_sub_folders, remove_all_in_folder
+from src.common.FileUtil import get_excel_data_in_column_start_at_row, extract_zip, remove_all_in_folder
+from src.common.StatusReconciliation import StatusReconciliation
 from src.common.StringUtil import join_set_of_elements
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.AutomatedTask import AutomatedTask
@@ -19,6 +18,7 @@ class Download_Blx(AutomatedTask):
 
     def __init__(self, settings: dict[str, str], callback_before_run_task: Callable[[], None]):
         super().__init__(settings, callback_before_run_task)
+        self.__extract_zip_tasks: list[threading.Thread] = []
 
     def mandatory_settings(self) -> list[str]:
         mandatory_keys: list[str] = ['username', 'password', 'download.folder', 'excel.path', 'excel.sheet',
@@ -45,10 +45,14 @@ class Download_Blx(AutomatedTask):
         if len(bills) == 0:
             logger.error('Input booking id list is empty ! Please check again')
 
-        last_bill: str = ''
-        self.perform_mainloop_on_collection(bills, self.operation_on_each_element)
+        try:
+            self.perform_mainloop_on_collection(bills, self.operation_on_each_element)
+        finally:
+            # the bill folders are only complete once their extraction is over
+            for extract_zip_task in self.__extract_zip_tasks:
+                extract_zip_task.join()
 
-        self._driver.close()
+        self._release_driver()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
@@ -56,11 +60,16 @@ class Download_Blx(AutomatedTask):
                     "booking's documents during the program")
 
         # Display summary info to the user
-        self.__check_up_all_downloads(set(bills))
+        self.__check_up_all_downloads(bills)
 
         # Pause and wait for the user to press Enter
         logger.info("It ends at {}. Press any key to end program...".format(datetime.now()))
 
+    def _prepare_parallel_session(self) -> None:
+        # each extra session of parallel.sessions must be logged in on its own browser
+        self._driver.get('https://apll.get-traction.com/')
+        self.__login()
+
     def __login(self) -> None:
         username: str = self._settings['username']
         password: str = self._settings['password']
@@ -70,39 +79,35 @@ class Download_Blx(AutomatedTask):
         self._click_and_wait_navigate_to_other_page(by=By.CSS_SELECTOR, value='input[type=button]')
 
     def operation_on_each_element(self, bill):
+        # pausing and terminating are handled by the mainloop between the bills
         logger: Logger = get_current_logger()
-
-        if self.terminated is True:
-            return
-
-        with self.pause_condition:
-
-            while self.paused:
-                self.pause_condition.wait()
-
-            if self.terminated is True:
-                return
-
         logger.info("Processing booking : " + bill)
         self.__navigate_and_download(bill)
-        last_bill = bill
 
-    def __check_up_all_downloads(self, booking_ids: set[str]) -> None:
+    def __check_up_all_downloads(self, bills: list[str]) -> None:
         logger: Logger = get_current_logger()
-        time.sleep(10 * self._timingFactor)
-        is_all_contained, successful_bills, unsuccessful_bills = check_parent_folder_contain_all_required_sub_folders(
-            parent_folder=self._download_folder, required_sub_folders=booking_ids)
+        # a bill is extracted into a folder named after its zip file, <bill> or <bill>_REVISED
+        reconciliation: StatusReconciliation = StatusReconciliation(
+            produced_folder=self._download_folder,
+            produced_names_of_key=lambda bill: [bill, '{}_REVISED'.format(bill)],
+            only_folders=True)
+        successful_bills, unsuccessful_bills = reconciliation.reconcile(bills)
 
         logger.info('{} successful booking folders containing documents has been download'
                     .format(len(successful_bills)))
-        successful_bills = join_set_of_elements(successful_bills, " ")
-        logger.info(successful_bills)
+        logger.info(join_set_of_elements(set(successful_bills), " "))
 
-        if not is_all_contained:
+        if len(unsuccessful_bills) > 0:
             logger.error('{} fail attempts for downloading documents in all these bookings'
                          .format(len(unsuccessful_bills)))
-            successful_bills = join_set_of_elements(unsuccessful_bills, " ")
-            logger.info(successful_bills)
+            logger.info(join_set_of_elements(set(unsuccessful_bills), " "))
+
+        # optionally, the Done / Missing status of every bill goes next to it in the input workbook
+        if self._settings.get('excel.column.status') is not None:
+            reconciliation.write_statuses(excel_path=self._settings['excel.path'],
+                                          sheet_name=self._settings['excel.sheet'],
+                                          key_start_cell=self._settings['excel.column.bill'],
+                                          status_column=self._settings['excel.column.status'].rstrip('0123456789'))
 
     def __navigate_and_download(self, bill: str) -> None:
         logger: Logger = get_current_logger()
@@ -126,6 +131,7 @@ class Download_Blx(AutomatedTask):
                                                   None),
                                             daemon=False)
         extract_zip_task.start()
+        self.__extract_zip_tasks.append(extract_zip_task)
 
         # click to back to the overview Booking page
         self._driver.get('https://apll.get-traction.com/')
@@ -10,9 +10,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 
 from src.common.Constants import ZIP_EXTENSION
-from src.common.FileUtil import get_excel_data_in_column_start_at_row, extract_zip, \
-    remove_all_in_folder
-from src.common.ResourceLock import ResourceLock
+from src.common.FileUtil import get_excel_records_start_at_row, extract_zip, remove_all_in_folder, \
+    ExcelInputRecord
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.AutomatedTask import AutomatedTask
 
@@ -28,6 +27,7 @@ class Download_CottonOn(AutomatedTask):
 
     def __init__(self, settings: dict[str, str], callback_before_run_task: Callable[[], None]):
         super().__init__(settings, callback_before_run_task)
+        self.__extract_zip_tasks: list[threading.Thread] = []
 
     def mandatory_settings(self) -> list[str]:
         mandatory_keys: list[str] = ['username', 'password', 'excel.path', 'excel.sheet',
@@ -54,50 +54,36 @@ class Download_CottonOn(AutomatedTask):
         # click navigating overview bookings page - on the header
         self._click_and_wait_navigate_to_other_page(by=By.CSS_SELECTOR, value='li[data-cy=bookings]')
 
-        booking_ids: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                       self._settings['excel.sheet'],
-                                                                       self._settings[
-                                                                           'excel.column.booking'])
-
-        becodes: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                   self._settings['excel.sheet'],
-                                                                   self._settings[
-                                                                       'excel.column.becode'])
-
-        so_numbers: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                      self._settings['excel.sheet'],
-                                                                      self._settings['excel.column.so'])
-        if len(booking_ids) == 0:
-            logger.error('Input booking id list is empty ! Please check again')
-
-        if len(booking_ids) != len(becodes) or len(booking_ids) != len(becodes):
+        records: list[ExcelInputRecord] = get_excel_records_start_at_row(
+            self._settings['excel.path'],
+            self._settings['excel.sheet'],
+            {'booking': self._settings['excel.column.booking'],
+             'becode': self._settings['excel.column.becode'],
+             'so': self._settings['excel.column.so']})
+        if not all(record.is_complete() for record in records):
             raise Exception("Please check your input data length of becode, sonumber and booking are not equal")
 
+        booking_ids: list[str] = [record['booking'] for record in records]
+        becodes: list[str] = [record['becode'] for record in records]
+        so_numbers: list[str] = [record['so'] for record in records]
+
         # info means becode and so number
         index: int = 0
         for booking in booking_ids:
             self.booking_to_info[booking] = (so_numbers[index], becodes[index])
             index += 1
 
-        last_booking: str = ''
-        for booking in booking_ids:
-
-            if self.terminated is True:
-                return
-
-            with self.pause_condition:
-
-                while self.paused:
-                    self.pause_condition.wait()
+        try:
+            self.perform_mainloop_on_collection(booking_ids, self.operation_on_each_element)
+        finally:
+            # the SO folders are only complete once their extraction is over
+            for extract_zip_task in self.__extract_zip_tasks:
+                extract_zip_task.join()
 
-                if self.terminated is True:
-                    return
-            
-            logger.info("Processing booking : " + booking)
-            self.__navigate_and_download(booking)
-            last_booking = booking
+        if self.terminated is True:
+            return
 
-        self._driver.close()
+        self._release_driver()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
@@ -110,6 +96,11 @@ class Download_CottonOn(AutomatedTask):
         # Pause and wait for the user to press Enter
         logger.info("It ends at {}. Press any key to end program...".format(datetime.now()))
 
+    def operation_on_each_element(self, booking: str) -> None:
+        logger: Logger = get_current_logger()
+        logger.info("Processing booking : " + booking)
+        self.__navigate_and_download(booking)
+
     def __login(self) -> None:
         username: str = self._settings['username']
         password: str = self._settings['password']
@@ -166,13 +157,24 @@ class Download_CottonOn(AutomatedTask):
 
         full_file_path: str = os.path.join(self._download_folder, booking + ZIP_EXTENSION)
         self._wait_download_file_complete(full_file_path)
+        so_number: str = Download_CottonOn.booking_to_info[booking][BookingToInfoIndex.SO_INDEX_IN_TUPLE.value]
+        becode: str = Download_CottonOn.booking_to_info[booking][BookingToInfoIndex.BECODE_INDEX_IN_TUPLE.value]
+        # only the invoice and the packing list are extracted, straight into <download folder>/<SO> as <SO>_INV.pdf
+        # and <SO>_PKL.pdf
         extract_zip_task = threading.Thread(target=extract_zip,
                                             args=(full_file_path, self._download_folder,
                                                   self.delete_redundant_opening_pdf_files,
-                                                  self.rename_all_files_in_folder_extracted),
+                                                  lambda extracted_dir: self.on_so_folder_extracted(so_number,
+                                                                                                    becode)),
+                                            kwargs={'member_filter': Download_CottonOn.is_wanted_document,
+                                                    'member_name_mapping':
+                                                        lambda member_name: Download_CottonOn.document_name_of(
+                                                            member_name, so_number),
+                                                    'extracted_folder_name': so_number},
                                             daemon=False)
 
         extract_zip_task.start()
+        self.__extract_zip_tasks.append(extract_zip_task)
         # click to back to the overview Booking page
         self._click_when_element_present(by=By.CSS_SELECTOR, value='button[data-cy=iconButtonClose] '
                                                                    'span.MuiIconButton-label svg')
@@ -188,36 +190,27 @@ class Download_CottonOn(AutomatedTask):
                              elapsed_time=timedelta(minutes=2))
 
     @staticmethod
-    def rename_all_files_in_folder_extracted(extracted_dir: str) -> None:
-        file_name_inv: str = "Invoice"
-        file_name_pkl: str = "Packing"
-
-        booking_id: str = os.path.split(extracted_dir)[1]
-        so_number = Download_CottonOn.booking_to_info[booking_id][BookingToInfoIndex.SO_INDEX_IN_TUPLE.value]
-        with ResourceLock(file_path=extracted_dir):
-
-            for file_name in os.listdir(extracted_dir):
-                file_path = os.path.join(extracted_dir, file_name)
-
-                if os.path.isdir(file_path):
-                    continue
-
-                if file_name_inv in file_name:
-                    source = file_path
-                    des = os.path.join(extracted_dir, "{}_INV.pdf".format(so_number))
-                    os.rename(source, des)
-                    continue
-
-                if file_name_pkl in file_name:
-                    source = file_path
-                    des = os.path.join(extracted_dir, "{}_PKL.pdf".format(so_number))
-                    os.rename(source, des)
-                    continue
-
-                os.remove(file_path)
-
-        # rename the folder
-        root_dir = os.path.dirname(extracted_dir)
-        source = extracted_dir
-        des = os.path.join(root_dir, so_number)
-        os.rename(source, des)
+    def is_wanted_document(member_name: str) -> bool:
+        file_name: str = os.path.basename(member_name)
+        return "Invoice" in file_name or "Packing" in file_name
+
+    @staticmethod
+    def document_name_of(member_name: str, so_number: str) -> str:
+        if "Invoice" in os.path.basename(member_name):
+            return "{}_INV.pdf".format(so_number)
+
+        return "{}_PKL.pdf".format(so_number)
+
+    def _output_of_done_element(self, booking: str):
+        # the SO folder downloaded by a previous run, as long as it is still there to be uploaded
+        so_number: str = Download_CottonOn.booking_to_info[booking][BookingToInfoIndex.SO_INDEX_IN_TUPLE.value]
+        becode: str = Download_CottonOn.booking_to_info[booking][BookingToInfoIndex.BECODE_INDEX_IN_TUPLE.value]
+        if not os.path.isdir(os.path.join(self._download_folder, so_number)):
+            return None
+
+        return so_number, becode
+
+    def on_so_folder_extracted(self, so_number: str, becode: str) -> None:
+        # in a pipeline, the SO folder is ready to be uploaded
+        if self.output_pipe is not None:
+            self.output_pipe.put((so_number, becode))
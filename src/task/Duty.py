@@ -6,13 +6,14 @@ from datetime import datetime
 from enum import Enum
 from logging import Logger
 from typing import Dict, Tuple, Callable
+from urllib.parse import urljoin
 
-import requests
-from openpyxl import load_workbook
 from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
 
+from src.common.CheckpointJournal import CheckpointJournal
+from src.common.DownloadWatcher import DownloadWatcher, DownloadTimeoutException
 from src.common.FileUtil import get_excel_data_in_column_start_at_row
+from src.common.StatusReconciliation import StatusReconciliation
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.AutomatedTask import AutomatedTask
 
@@ -24,11 +25,19 @@ class BookingToInfoIndex(Enum):
 
 class Duty(AutomatedTask):
     fcr_to_file_remane = {}
+    # the portal authenticates by HTTP auth, the credentials are only ever sent to it
+    PORTAL_HOST: str = 'amerapps-legacy.apmoller.net'
 
     def __init__(self, settings: dict[str, str], callback_before_run_task: Callable[[], None]):
         super().__init__(settings, callback_before_run_task)
         self._document_folder = self._download_folder
 
+        # browser: click and wait each document in Chrome / http: fetch the batch's documents concurrently
+        if self._settings.get('download.mode') is None:
+            self._download_mode: str = 'browser'
+        else:
+            self._download_mode = str(self._settings.get('download.mode')).strip().lower()
+
     def mandatory_settings(self) -> list[str]:
         mandatory_keys: list[str] = ['username', 'password', 'excel.path', 'excel.sheet', 'download.folder',
                                      'rename.folder',
@@ -43,8 +52,8 @@ class Duty(AutomatedTask):
 
         uid: str = self._settings['username']
         psw: str = self._settings['password']
-        login_url = ('https://{}:{}@amerapps-legacy.apmoller.net/DutyDeduction/Grid.aspx?search=true'
-                     .format((uid), (psw)))
+        login_url = ('https://{}:{}@{}/DutyDeduction/Grid.aspx?search=true'
+                     .format((uid), (psw), Duty.PORTAL_HOST))
         logger.info('Try to login')
         self._driver.get(login_url)
         logger.info("Login successfully")
@@ -54,6 +63,37 @@ class Duty(AutomatedTask):
                                                                        self._settings[
                                                                            'excel.column.fcr'])
 
+        # skip the fcr documents already downloaded by a previous run of the same input file
+        journal: CheckpointJournal = self._open_checkpoint_journal(fcr_numbers)
+        if journal is not None:
+            fcr_numbers = journal.pending(fcr_numbers, only_failed=self._checkpoint_mode == 'failed')
+            logger.info('{} fcr are left to download according to the checkpoint journal'.format(len(fcr_numbers)))
+
+        try:
+            self.__download_in_batches(login_url, fcr_numbers, journal)
+        finally:
+            if journal is not None:
+                journal.close()
+
+        if self.terminated is True:
+            return
+
+        if journal is not None:
+            journal.complete()
+
+        logger.info("Complete download")
+        self._input_excel()
+        logger.info('Checked file exist - Check your file Excel to get infor')
+        self._release_driver()
+        logger.info(
+            "---------------------------------------------------------------------------------------------------------")
+        logger.info("End processing")
+
+    def __download_in_batches(self, login_url: str, fcr_numbers: list[str], journal: CheckpointJournal):
+        logger: Logger = get_current_logger()
+        if len(fcr_numbers) == 0:
+            return
+
         needed_to_add_cookies = Duty.produce_needed_to_add_cookie_contents(batch_size=20, fcr_numbers=fcr_numbers)
         download_filter_cookies: list[str] = needed_to_add_cookies[0]
         search_filter_cookies: list[str] = needed_to_add_cookies[1]
@@ -93,18 +133,19 @@ class Duty(AutomatedTask):
 
             fcr_code_to_index_and_time: Dict[str, Tuple[int, datetime]] = {}
 
-            fcr_elements: list[WebElement] = self._driver.find_elements(by=By.CSS_SELECTOR,
-                                                                        value='table#EDIGrid.MyGrid tr td:nth-child(6) span')
-            fcr_elements = fcr_elements[1:]
+            # one round trip for the whole grid: the fcr code (column 6) and its date (column 8) of every row
+            grid_rows: list[dict] = self._scrape_elements(by=By.CSS_SELECTOR,
+                                                          elements_selector='table#EDIGrid.MyGrid tr',
+                                                          cell_selector=':scope > td:nth-child(6) span, '
+                                                                        ':scope > td:nth-child(8) span')
+            grid_rows = [grid_row for grid_row in grid_rows if len(grid_row['cells']) == 2]
+            grid_rows = grid_rows[1:]
 
-            fcr_index = 2
-            for fcr_element in fcr_elements:
+            for grid_row in grid_rows:
 
-                fcr_code: str = fcr_element.get_attribute('innerText')
-                date_element = self._driver.find_element(by=By.CSS_SELECTOR,
-                                                         value=f'table#EDIGrid.MyGrid tr:nth-child({fcr_index}) '
-                                                               f'td:nth-child(8) span')
-                date_string = date_element.get_attribute('innerText')
+                fcr_code: str = grid_row['cells'][0]
+                fcr_index: int = grid_row['child_index']
+                date_string = grid_row['cells'][1]
                 date_format = "%m/%d/%Y %I:%M:%S %p"
                 fcr_datetime = datetime.strptime(date_string, date_format)
 
@@ -115,25 +156,72 @@ class Duty(AutomatedTask):
                     if fcr_datetime >= last_fcr_datetime:
                         fcr_code_to_index_and_time[fcr_code] = (fcr_index, fcr_datetime)
 
-                fcr_index += 1
+            if self._download_mode == 'http':
+                fcr_code_to_index_and_time = self.__download_over_http(fcr_code_to_index_and_time, journal)
 
             for key, value in fcr_code_to_index_and_time.items():
                 fcr_code = key
                 fcr_index = value[0]
                 self.click_download(fcr_code, fcr_index)
 
-                self._rename_file_after_download(fcr_code, fcr_index)
+                is_renamed: bool = self._rename_file_after_download(fcr_code, fcr_index)
+                if journal is not None:
+                    if is_renamed:
+                        journal.mark_done(fcr_code)
+                    else:
+                        journal.mark_failed(fcr_code)
 
             batch_index += 1
             self.current_element_count = self.current_element_count + 1
 
-        logger.info("Complete download")
-        self._input_excel()
-        logger.info('Checked file exist - Check your file Excel to get infor')
-        self._driver.close()
-        logger.info(
-            "---------------------------------------------------------------------------------------------------------")
-        logger.info("End processing")
+    def __download_over_http(self,
+                             fcr_code_to_index_and_time: Dict[str, Tuple[int, datetime]],
+                             journal: CheckpointJournal) -> Dict[str, Tuple[int, datetime]]:
+        """
+        Fetch the documents of the batch directly into the rename folder with the browser's session.
+        Return the fcr whose link is not a plain url (e.g. a postback), they are left to the click and wait way
+        """
+        logger: Logger = get_current_logger()
+        rename_folder: str = self._settings['rename.folder']
+
+        # the download links of all grid rows in one round trip, by their :nth-child index
+        row_index_to_hrefs: dict[int, list[str]] = {
+            grid_row['child_index']: grid_row['cells']
+            for grid_row in self._scrape_elements(by=By.CSS_SELECTOR,
+                                                  elements_selector='table#EDIGrid.MyGrid tr',
+                                                  cell_selector='a',
+                                                  cell_attribute_name='href')}
+
+        current_url: str = self._driver.current_url
+        url_to_fcr_code: dict[str, str] = {}
+        url_to_file_path: dict[str, str] = {}
+        not_fetchable_fcr_code_to_index_and_time: Dict[str, Tuple[int, datetime]] = {}
+        for fcr_code, index_and_time in fcr_code_to_index_and_time.items():
+            hrefs: list[str] = row_index_to_hrefs.get(index_and_time[0], [])
+            href: str = None if len(hrefs) == 0 else hrefs[0]
+            if href is None or href.strip().lower().startswith('javascript:'):
+                not_fetchable_fcr_code_to_index_and_time[fcr_code] = index_and_time
+                continue
+
+            href = urljoin(current_url, href)
+
+            url_to_fcr_code[href] = fcr_code
+            url_to_file_path[href] = os.path.join(rename_folder, '{}_Duty.pdf'.format(fcr_code))
+
+        logger.info('Fetch {} documents over http'.format(len(url_to_file_path)))
+        url_to_failure: dict[str, Exception] = self._fetch_documents_with_browser_session(
+            url_to_file_path,
+            auth=(self._settings['username'], self._settings['password']),
+            auth_host=Duty.PORTAL_HOST)
+
+        if journal is not None:
+            for url, fcr_code in url_to_fcr_code.items():
+                if url in url_to_failure:
+                    journal.mark_failed(fcr_code)
+                else:
+                    journal.mark_done(fcr_code)
+
+        return not_fetchable_fcr_code_to_index_and_time
 
     def click_download(self, fcr_code: str, fcr_index: int):
         logger: Logger = get_current_logger()
@@ -192,34 +280,22 @@ class Duty(AutomatedTask):
 
         return download_filter_cookies, search_filter_cookies
 
-    def _rename_file_after_download(self, fcr_code: str, fcr_index: int):
+    def _rename_file_after_download(self, fcr_code: str, fcr_index: int) -> bool:
         logger: Logger = get_current_logger()
 
         download_folder: str = self._settings['download.folder']
         rename_folder: str = self._settings['rename.folder']
 
-        attempt_counter: int = 0
-        max_attempt: int = 2 * 60
-        while True:
-
-            if attempt_counter > max_attempt:
+        # wakes up as soon as the pdf is complete - neither a growing .crdownload nor a zero-byte stub
+        with DownloadWatcher(folder=download_folder) as download_watcher:
+            try:
+                download_filename: str = download_watcher.wait_for_any_file(timeout=2 * 60 * self._timingFactor,
+                                                                            extension='.pdf')
+            except DownloadTimeoutException:
                 logger.error('The tool waiting too long to download document for {}. Please check !'.format(fcr_code))
-                break
-
-            all_files_in_download_folder: list[str] = os.listdir(download_folder)
-            download_filename: str = None if len(all_files_in_download_folder) == 0 else all_files_in_download_folder[0]
-
-            if download_filename is None or not download_filename.endswith('.pdf'):
-                time.sleep(1)
-                attempt_counter += 1
-                continue
-
-            # The download has completed
-            logger.info('The document for {} has been downloaded !'.format(fcr_code))
-            break
+                return False
 
-        all_files_in_download_folder: list[str] = os.listdir(download_folder)
-        download_filename: str = None if len(all_files_in_download_folder) == 0 else all_files_in_download_folder[0]
+        logger.info('The document for {} has been downloaded !'.format(fcr_code))
 
         full_file_path: str = os.path.join(download_folder, download_filename)
         rename_filename_path = os.path.join(rename_folder, '{}_Duty.pdf'.format(fcr_code))
@@ -227,87 +303,22 @@ class Duty(AutomatedTask):
         if os.path.exists(rename_filename_path):
             os.remove(rename_filename_path)
 
-        max_attempt: int = 2 * 60
-        while True:
-            if attempt_counter > max_attempt:
-                logger.error('The tool waiting too long to download document for {}. Please check !'.format(fcr_code))
-                break
-
-            if os.path.getsize(full_file_path) > 0:
-                shutil.copy(full_file_path, rename_filename_path)
-                time.sleep(1)
-            else:
-                os.remove(full_file_path)
-                logger.info('Removed file {}'.format(full_file_path))
+        shutil.move(full_file_path, rename_filename_path)
+        logger.info('Renamed from {} to {}'.format(full_file_path, rename_filename_path))
 
-            if os.path.exists(rename_filename_path) and os.path.getsize(rename_filename_path) > 0:
-                logger.info('Renamed from {} to {}'.format(full_file_path, rename_filename_path))
-                os.remove(full_file_path)
-                break
-            else:
-                logger.info('File {} emty, try to moving'.format(rename_filename_path))
-                time.sleep(1)
-                shutil.copy(full_file_path, rename_filename_path)
-                attempt_counter += 1
-                continue
+        return os.path.exists(rename_filename_path) and os.path.getsize(rename_filename_path) > 0
 
     def _input_excel(self):
         logger: Logger = get_current_logger()
-
-        wb = load_workbook(self._settings['excel.path'])
-        ws = wb[self._settings['excel.sheet']]
-
         logger.info('Inputting Excel')
         rename_folder: str = self._settings['rename.folder']
 
-        new_status_done: str = 'Done'
-        new_status_miss: str = 'Missing'
-
-        all_file_in_rename_folders: list[str] = os.listdir(rename_folder)
-
-        for index, cell in enumerate(ws['A'], start=1):
-            cell_name = str(cell.value) + '_Duty.pdf'
-            if cell_name in all_file_in_rename_folders:
-                ws[f'B{index}'] = new_status_done
-            else:
-                ws[f'B{index}'] = new_status_miss
-
-            new_file_path = os.path.join(rename_folder, 'output.xlsx')
-
-            if os.path.exists(new_file_path):
-                os.remove(new_file_path)
-            wb.save(new_file_path)
-
-    # _______________________________________________________________________________________________________________
-    def _rename_by_asp(self, postfix_url: str):
-
-        cookie_asp_session = self._driver.get_cookie('ASP.NET_SessionId')
-        if cookie_asp_session:
-            asp_session_value = cookie_asp_session.get('value')
-
-            if asp_session_value:
-                pdf_url = postfix_url
-                cookies = self._driver.get_cookies()
-
-                session = requests.Session()
-
-                cookies_string = ';'.join([f"{cookie['name']}={cookie['value']}" for cookie in cookies])
-                headers = {'Cookie': f"NET_SessionId={asp_session_value}",
-                           'Host': 'amerapps.apmoller.net'}
-
-                session.auth = None
-                response = session.get(pdf_url, headers=headers, verify=False, auth=None)
-
-                if response.status_code == 200:
-                    # Lưu phản hồi từ yêu cầu requests dưới dạng tệp PDF
-                    download_path = '/path/to/save/downloaded_file.pdf'  # Thay thế bằng đường dẫn lưu tệp PDF
-                    with open(download_path, 'wb') as file:
-                        file.write(response.content)
-                    print(f"Download successful. File saved at: {download_path}")
-                else:
-                    print("Download failed.")
-            else:
-                print("ASPSession cookie value not found.")
-        else:
-            print("ASPSession cookie not found.")
-    # ________________________________________________________________________________________________________________
+        # one scan of the rename folder, every row of column A gets its status in column B, saved once
+        reconciliation: StatusReconciliation = StatusReconciliation(
+            produced_folder=rename_folder,
+            produced_names_of_key=lambda fcr_number: [fcr_number + '_Duty.pdf'])
+        reconciliation.write_statuses(excel_path=self._settings['excel.path'],
+                                      sheet_name=self._settings['excel.sheet'],
+                                      key_start_cell='A1',
+                                      status_column='B',
+                                      output_path=os.path.join(rename_folder, 'output.xlsx'))
@@ -8,11 +8,11 @@ from pywinauto import Application, WindowSpecification
 from pywinauto.controls.common_controls import ListViewWrapper, _listview_item
 from pywinauto.controls.win32_controls import ComboBoxWrapper, ButtonWrapper, EditWrapper
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row
+from src.common.FileUtil import get_excel_records_start_at_row, ExcelInputRecord
 from src.common.StringUtil import extract_row_col_from_cell_pos_format
 from src.common.ThreadLocalLogger import get_current_logger
 from src.excel_reader_provider.ExcelReaderProvider import ExcelReaderProvider
-from src.excel_reader_provider.XlwingProvider import XlwingProvider
+from src.excel_reader_provider.ExcelReaderProviderFactory import create_excel_reader_provider
 from src.task.DesktopAppTask import DesktopAppTask
 
 
@@ -32,7 +32,7 @@ class GCSS_Automate(DesktopAppTask):
 
     def automate(self):
         logger: Logger = get_current_logger()
-        self.excel_provider: ExcelReaderProvider = XlwingProvider()
+        self.excel_provider: ExcelReaderProvider = create_excel_reader_provider(self._settings)
         path_to_excel = self._settings['excel.path']
         workbook = self.excel_provider.get_workbook(path=path_to_excel)
         logger.info('Loading excel files')
@@ -40,12 +40,12 @@ class GCSS_Automate(DesktopAppTask):
         sheet_name: str = self._settings['excel.sheet']
         self.current_worksheet = self.excel_provider.get_worksheet(workbook, sheet_name)
 
-        shipments: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                     self._settings['excel.sheet'],
-                                                                     self._settings['excel.shipment'])
-        status_address: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                          self._settings['excel.sheet'],
-                                                                          self._settings['excel.status.address'])
+        records: list[ExcelInputRecord] = get_excel_records_start_at_row(
+            self._settings['excel.path'],
+            self._settings['excel.sheet'],
+            {'shipment': self._settings['excel.shipment'], 'status': self._settings['excel.status.address']})
+        shipments: list[str] = [record['shipment'] for record in records if record['shipment'] is not None]
+        status_address: list[str] = [record['status'] for record in records if record['status'] is not None]
 
         col, row = extract_row_col_from_cell_pos_format(self._settings['excel.status.cell'])
         self.current_status_excel_col_index: int = int(self.get_letter_position(col))
@@ -57,57 +57,62 @@ class GCSS_Automate(DesktopAppTask):
         self.current_element_count = 0
         self.total_element_size = len(shipments)
 
-        for i, shipment in enumerate(shipments):
-
-            if self.terminated is True:
-                return
-
-            with self.pause_condition:
-
-                while self.paused:
-                    logger.info("Currently pause")
-                    self.pause_condition.wait()
+        try:
+            for i, shipment in enumerate(shipments):
 
                 if self.terminated is True:
                     return
 
-            logger.info("Start process shipment " + shipment)
+                with self.pause_condition:
+
+                    while self.paused:
+                        logger.info("Currently pause")
+                        self.pause_condition.wait()
+
+                    if self.terminated is True:
+                        return
+
+                logger.info("Start process shipment " + shipment)
+
+                try:
+                    if status_address[i] != "ADDRESS MATCHED":
+                        logger.info(f"Skipping shipment {shipment} due to status: {status_address[i]}")
+                        self.input_status_into_excel('Skip')
+                        self.excel_provider.save(workbook)
+                        self.current_status_excel_row_index += 1
+                        self.current_element_count += 1
+                        continue
+
+                    pyautogui.hotkey('ctrl', 'o')
+                    pyautogui.typewrite(shipment)
+                    pyautogui.hotkey('tab')
+                    pyautogui.hotkey('enter')
+                    self.sleep()
+                    self.process_on_each_shipment(shipment)
+                    self.input_status_into_excel('Done')
+                    self.excel_provider.save(workbook)
 
-            try:
-                if status_address[i] != "ADDRESS MATCHED":
-                    logger.info(f"Skipping shipment {shipment} due to status: {status_address[i]}")
-                    self.input_status_into_excel('Skip')
+                    logger.info("Done with shipment " + shipment)
+
+                except Exception:
+
+                    self.input_status_into_excel('An exception error')
                     self.excel_provider.save(workbook)
+                    logger.info(f'Cannot handle shipment {shipment}. Moving to next shipment')
+                    self._close_windows_util_reach_first_gscc()
                     self.current_status_excel_row_index += 1
                     self.current_element_count += 1
                     continue
 
-                pyautogui.hotkey('ctrl', 'o')
-                pyautogui.typewrite(shipment)
-                pyautogui.hotkey('tab')
-                pyautogui.hotkey('enter')
-                self.sleep()
-                self.process_on_each_shipment(shipment)
-                self.input_status_into_excel('Done')
-                self.excel_provider.save(workbook)
-
-                logger.info("Done with shipment " + shipment)
-
-            except Exception:
-
-                self.input_status_into_excel('An exception error')
-                self.excel_provider.save(workbook)
-                logger.info(f'Cannot handle shipment {shipment}. Moving to next shipment')
-                self._close_windows_util_reach_first_gscc()
                 self.current_status_excel_row_index += 1
                 self.current_element_count += 1
-                continue
-
-            self.current_status_excel_row_index += 1
-            self.current_element_count += 1
-
-        self.excel_provider.save(workbook)
-        self.excel_provider.close(workbook)
+        finally:
+            # also on terminate or failure, and the shared Excel session is released
+            try:
+                self.excel_provider.save(workbook)
+                self.excel_provider.close(workbook)
+            finally:
+                self.excel_provider.quit_session()
 
     def process_on_each_shipment(self, shipment):
 
@@ -1,14 +1,19 @@
+import multiprocessing
 import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from logging import Logger
-from typing import Callable
+from typing import Callable, Iterator
 
-from PyPDF2 import PdfMerger
+from PyPDF2 import PdfReader, PdfWriter
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row
+from src.common.FileUtil import get_excel_records_start_at_row, ExcelInputRecord
+from src.common.PdfMergeUtil import merge_pdfs_into_file
+from src.common.PrefixIndex import PrefixIndex
 from src.common.StringUtil import get_row_index_from_excel_cell_format
 from src.common.ThreadLocalLogger import get_current_logger
 from src.excel_reader_provider.ExcelReaderProvider import ExcelReaderProvider
-from src.excel_reader_provider.XlwingProvider import XlwingProvider
+from src.excel_reader_provider.ExcelReaderProviderFactory import create_excel_reader_provider
 from src.task.AutomatedTask import AutomatedTask
 
 
@@ -18,6 +23,9 @@ class PDFCombine_KH(AutomatedTask):
 
     def __init__(self, settings: dict[str, str], callback_before_run_task: Callable[[], None]):
         super().__init__(settings, callback_before_run_task)
+        self._excel_provider: ExcelReaderProvider = None
+        # the files of each source folder, listed once per run instead of once per bill
+        self._folder_indexes: dict[str, PrefixIndex] = {}
 
     def mandatory_settings(self) -> list[str]:
         mandatory_keys: list[str] = ['excel.path', 'excel.sheet', 'folder_payment_slip.folder', 'folder_wy.folder',
@@ -28,7 +36,8 @@ class PDFCombine_KH(AutomatedTask):
     def automate(self):
         logger: Logger = get_current_logger()
 
-        excel_reader: ExcelReaderProvider = XlwingProvider()
+        excel_reader: ExcelReaderProvider = create_excel_reader_provider(self._settings)
+        self._excel_provider = excel_reader
 
         path_to_excel_contain_pdfs_content = self._settings['excel.path']
         workbook = excel_reader.get_workbook(path=path_to_excel_contain_pdfs_content)
@@ -37,20 +46,16 @@ class PDFCombine_KH(AutomatedTask):
         sheet_name: str = self._settings['excel.sheet']
         worksheet = excel_reader.get_worksheet(workbook, sheet_name)
 
-        bills: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                 self._settings['excel.sheet'],
-                                                                 self._settings[
-                                                                     'excel.column.bill'])
-
-        withholding_taxes: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                             self._settings['excel.sheet'],
-                                                                             self._settings['excel.column.wht'])
-        if len(bills) == 0:
-            logger.error('Input booking id list is empty ! Please check again')
-
-        if len(bills) != len(withholding_taxes):
+        records: list[ExcelInputRecord] = get_excel_records_start_at_row(
+            self._settings['excel.path'],
+            self._settings['excel.sheet'],
+            {'bill': self._settings['excel.column.bill'], 'wht': self._settings['excel.column.wht']})
+        if not all(record.is_complete() for record in records):
             raise Exception("Please check your input data length of bills, type_bill are not equal")
 
+        bills: list[str] = [record['bill'] for record in records]
+        withholding_taxes: list[str] = [record['wht'] for record in records]
+
         """Step 1: Store bill-to-info mapping"""
         index: int = 0
         for tax in withholding_taxes:
@@ -59,104 +64,165 @@ class PDFCombine_KH(AutomatedTask):
 
         excel_row_index: int = get_row_index_from_excel_cell_format(self._settings['excel.column.bill'])
 
+        self._folder_indexes = {}
+        for folder_key in ['folder_cheque_request.folder', 'folder_payment_slip.folder', 'folder_wy.folder',
+                           'folder_inv.folder']:
+            folder: str = self._settings[folder_key]
+            if folder not in self._folder_indexes:
+                self._folder_indexes[folder] = PrefixIndex(folder)
+
         # Loop through files in the WY folder, rename them according to the bill numbers
         self.rename_files_in_folder_wy()
 
-        """"Step 2: Process each bill + progress bar"""
-
-        self.current_element_count = 0
-        self.total_element_size = len(bills)
-        for bill in bills:
-            logger.info("Processing: " + bill)
-            if self.terminated is True:
-                return
-
-            with self.pause_condition:
-
-                while self.paused:
-                    self.pause_condition.wait()
+        """"Step 2: Add the PDFs of each bill to the combined PDF (and to its own PDF on the worker processes
+        when the bill files are kept) + progress bar"""
+        max_workers: int = os.cpu_count() if self._settings.get('merge.workers') is None \
+            else max(1, int(self._settings.get('merge.workers')))
+        write_bill_files: bool = 'True'.lower() == str(self._settings.get('combine.bill.files')).lower()
+        combined_writer: PdfWriter = PdfWriter()
+        counts_of_bills: list[list[int]] = []
+        merged_bills: Iterator[tuple[str, list[int]]] = self.merge_pdfs_of_bills(bills, max_workers,
+                                                                                  write_bill_files)
+        try:
+            self.current_element_count = 0
+            self.total_element_size = len(bills)
+            for bill, counts in merged_bills:
+                counts_of_bills.append(counts)
+                self.append_bill_to_combined(combined_writer, bill)
+                self.current_element_count = self.current_element_count + 1
 
                 if self.terminated is True:
                     return
 
-            self.combine_pdfs_into_one(bill, worksheet, excel_row_index)
-            excel_row_index += 1
+                with self.pause_condition:
 
-            self.current_element_count = self.current_element_count + 1
-            excel_reader.save(workbook=workbook)
+                    while self.paused:
+                        self.pause_condition.wait()
 
-        self.combine_pdfs_combined()
+                    if self.terminated is True:
+                        return
+        finally:
+            merged_bills.close()
+            # the counts of the bills merged so far, written all at once
+            if len(counts_of_bills) > 0:
+                self.update_excel_sheet(worksheet=worksheet, row_index=excel_row_index, counts=counts_of_bills)
+                excel_reader.save(workbook=workbook)
+            excel_reader.close(workbook=workbook)
+            excel_reader.quit_session()
 
-        # Close the Excel workbook
-        excel_reader.close(workbook=workbook)
-        excel_reader.quit_session()
+        self.write_combined(combined_writer, bills, write_bill_files)
         logger.info('Done input to excel file')
 
     def rename_files_in_folder_wy(self):
         folder_wy: str = self._settings['folder_wy.folder']
-        for file_name in os.listdir(folder_wy):
+        wy_index: PrefixIndex = self._folder_indexes[folder_wy]
+        for file_name in wy_index.names():
             if file_name.endswith(".pdf"):
                 wy_number = file_name.split(".pdf")[0]
 
                 bill_number = self.tax_to_bill.get(wy_number)
                 if bill_number is not None:
-                    os.rename(os.path.join(folder_wy, file_name),
-                              os.path.join(folder_wy, f"{bill_number}_{wy_number}.pdf"))
+                    wy_index.rename(file_name, f"{bill_number}_{wy_number}.pdf")
 
-    def combine_pdfs_into_one(self, bill, worksheet, excel_row_index):
+    def merge_pdfs_of_bills(self, bills: list[str], max_workers: int,
+                            write_bill_files: bool = True) -> Iterator[tuple[str, list[int]]]:
         """
-        Combine PDFs related to the given bill into one file and update the Excel sheet.
+        Merge the PDFs of each bill into <folder_combine>/<bill>.pdf, max_workers bills at the same time on worker
+        processes (in this thread with a single worker). Yields each bill with its counts of PDFs, in the order of
+        the bills, as soon as its merged PDF is written, or straight away when the bill files are not written.
+        Only the bill files are merged on the worker processes: with combine.bill.files False (the default) there is
+        nothing for them to do, Combined.pdf is built from the sources in this process.
         """
-
         logger: Logger = get_current_logger()
+        output_folder: str = self._settings['folder_combine.folder']
 
-        # Define folders
-        folder_cheque_request: str = self._settings['folder_cheque_request.folder']
-        folder_payslip: str = self._settings['folder_payment_slip.folder']
-        folder_wy: str = self._settings['folder_wy.folder']
-        folder_inv: str = self._settings['folder_inv.folder']
+        if not write_bill_files:
+            for bill in bills:
+                logger.info("Processing: " + bill)
+                yield bill, self.counts_of_bill(bill)
+            return
+
+        if max_workers == 1:
+            for bill in bills:
+                logger.info("Processing: " + bill)
+                merge_pdfs_into_file(self.pdf_files_of_bill(bill), os.path.join(output_folder, f"{bill}.pdf"))
+                self.__index_bill_file(bill)
+                logger.info("Combined {}.pdf".format(bill))
+                yield bill, self.counts_of_bill(bill)
+            return
+
+        pending_bills: Iterator[str] = iter(bills)
+        merges: deque[tuple[str, Future]] = deque()
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            try:
+                while True:
+                    # a window of bills in flight, so pausing the task soon pauses the workers too
+                    while len(merges) < max_workers * 2:
+                        bill: str = next(pending_bills, None)
+                        if bill is None:
+                            break
+                        logger.info("Processing: " + bill)
+                        merges.append((bill, executor.submit(merge_pdfs_into_file, self.pdf_files_of_bill(bill),
+                                                             os.path.join(output_folder, f"{bill}.pdf"))))
+
+                    if len(merges) == 0:
+                        return
+
+                    bill, merge = merges.popleft()
+                    merge.result()
+                    self.__index_bill_file(bill)
+                    logger.info("Combined {}.pdf".format(bill))
+                    yield bill, self.counts_of_bill(bill)
+            finally:
+                for bill, merge in merges:
+                    merge.cancel()
+
+    def __index_bill_file(self, bill: str) -> None:
+        # when the combine folder is also a source folder, the bill file is counted like the other files
+        combine_folder_index: PrefixIndex = self._folder_indexes.get(self._settings['folder_combine.folder'])
+        if combine_folder_index is not None:
+            combine_folder_index.add(f"{bill}.pdf")
+
+    def pdf_files_of_bill(self, bill: str) -> list[str]:
+        """
+        The files of the bill in the order they are merged: cheque request, payment slip, WY then invoice
+        """
+        pdf_files: list[str] = []
+        for folder_key in ['folder_cheque_request.folder', 'folder_payment_slip.folder', 'folder_wy.folder',
+                           'folder_inv.folder']:
+            folder: str = self._settings[folder_key]
+            for pdf_file in self._folder_indexes[folder].names_starting_with(bill):
+                pdf_files.append(os.path.join(folder, pdf_file))
 
-        # Step 3: Combine PDFs
-        merger = PdfMerger()
-        for folder in [folder_cheque_request, folder_payslip, folder_wy, folder_inv]:
-            pdf_files = [file for file in os.listdir(folder) if file.startswith(bill)]
-            for pdf_file in pdf_files:
-                merger.append(os.path.join(folder, pdf_file))
+        return pdf_files
 
-        # Save combined PDF
-        output_folder: str = self._settings['folder_combine.folder']
-        output_file = os.path.join(output_folder, f"{bill}.pdf")
-
-        logger.info("Combined {}.pdf".format(bill))
-        if os.path.exists(output_file):
-            os.remove(output_file)
+    def counts_of_bill(self, bill: str) -> list[int]:
+        """
+        The counts of PDFs of the bill written into the Excel sheet: payment slip, WY, invoice then cheque request
+        """
+        counts: list[int] = []
+        for folder_key in ['folder_payment_slip.folder', 'folder_wy.folder', 'folder_inv.folder',
+                           'folder_cheque_request.folder']:
+            counts.append(self.find_and_count_pdfs(self._settings[folder_key], bill))
 
-        with open(output_file, 'wb') as output:
-            merger.write(output)
+        return counts
 
-        # Update Excel sheet
-        counts = []
-        for folder in [folder_payslip, folder_wy, folder_inv, folder_cheque_request]:
-            count = self.find_and_count_pdfs(folder, bill)
-            counts.append(count)
-        self.update_excel_sheet(worksheet=worksheet, row_index=excel_row_index, counts=counts)
+    def append_bill_to_combined(self, combined_writer: PdfWriter, bill: str) -> None:
+        """
+        Append the PDFs of the bill to the combined PDF, straight from the source files: each one is read once,
+        its pages are copied into the writer and the reader is let go
+        """
+        for pdf_file in self.pdf_files_of_bill(bill):
+            combined_writer.append(PdfReader(pdf_file))
 
-    def combine_pdfs_combined(self):
+    def write_combined(self, combined_writer: PdfWriter, bills: list[str], write_bill_files: bool) -> None:
         """
-        Combine PDFs combined before in each folder into one file
+        Write the combined PDF of all the bills, in the order of the bills, as Combined.pdf.
+        Unless the bill files are kept, the <bill>.pdf files left by a previous run are removed.
         """
         logger: Logger = get_current_logger()
 
-        folder_to_combine: str = self._settings['folder_combine.folder']
-        merger = PdfMerger()
-
-        # Iterate through the PDF files in the folder
-        for file in os.listdir(folder_to_combine):
-            if file.lower().endswith('.pdf'):
-                pdf_file_path = os.path.join(folder_to_combine, file)
-                merger.append(pdf_file_path)
-
-        # Save combined PDF
         output_folder: str = self._settings['folder_combine.folder']
         output_file = os.path.join(output_folder, "Combined.pdf")
 
@@ -165,14 +231,17 @@ class PDFCombine_KH(AutomatedTask):
             os.remove(output_file)
 
         with open(output_file, 'wb') as output:
-            merger.write(output)
+            combined_writer.write(output)
 
-        merger.close()
+        combined_writer.close()
+        logger.info('Combined {} bills into {}'.format(len(bills), output_file))
 
-        # Delete all PDF files except the final combined one
-        for file in os.listdir(folder_to_combine):
-            if file.lower().endswith('.pdf') and file != "Combined.pdf":
-                file_path = os.path.join(folder_to_combine, file)
+        if write_bill_files:
+            return
+
+        for bill in bills:
+            file_path = os.path.join(output_folder, f"{bill}.pdf")
+            if os.path.exists(file_path):
                 try:
                     os.remove(file_path)
                 except Exception as e:
@@ -184,21 +253,15 @@ class PDFCombine_KH(AutomatedTask):
         """
         Find and count PDFs in the given folder with the specified prefix.
         """
-        pdf_files = [file for file in os.listdir(folder) if file.startswith(prefix)
-                     and (file.endswith('.pdf') or file.endswith('.PDF'))]
-        return len(pdf_files)
+        return self._folder_indexes[folder].count_starting_with(prefix, ('.pdf', '.PDF'))
 
     def update_excel_sheet(self, worksheet, row_index, counts):
         """
-        Update the Excel sheet with the counts of PDFs.
+        Update the Excel sheet with the counts of PDFs, in one block.
         Args:
-            worksheet (xlwings main.Sheet): The Excel worksheet to update.
-            row_index (int): The row index where you want to update the counts.
-            counts (list): A list containing the counts of PDFs for each folder.
+            worksheet: The Excel worksheet to update, as given by the excel provider.
+            row_index (int): The row index of the first bill.
+            counts (list): The counts of PDFs for each folder, a list per bill on consecutive rows.
         """
-        # Define the starting column index for inputting counts
-        column_index = 3  # Start from column C
-
-        for count in counts:
-            worksheet.range(row_index, column_index).value = count
-            column_index += 1
+        # the counts go side by side from column C
+        self._excel_provider.change_values_at(worksheet=worksheet, row=row_index, column=3, values=counts)
@@ -0,0 +1,58 @@
+import os
+from abc import ABC
+from logging import Logger
+from typing import Callable
+
+from src.common.ThreadLocalLogger import get_current_logger
+from src.pdf_ingestion.PdfIngestionEngine import PdfIngestionEngine
+from src.task.AutomatedTask import AutomatedTask
+
+
+class PdfIngestionTask(AutomatedTask, ABC):
+    """
+        PdfIngestionTask - writes the text of the PDFs of folder_docs.folder into the configured output,
+        through a PdfIngestionEngine. A customer variant only gives its default settings (ordering, filters,
+        cleaners ...), which the properties file can still override
+    """
+
+    def __init__(self, settings: dict[str, str], callback_before_run_task: Callable[[], None]):
+        super().__init__(settings, callback_before_run_task)
+
+    def mandatory_settings(self) -> list[str]:
+        mandatory_keys: list[str] = ['excel.path', 'excel.sheet', 'folder_docs.folder']
+        return mandatory_keys
+
+    def default_settings(self) -> dict[str, str]:
+        return {}
+
+    def automate(self):
+        logger: Logger = get_current_logger()
+
+        settings: dict[str, str] = dict(self.default_settings())
+        settings.update(self._settings)
+
+        with PdfIngestionEngine(settings, cache_name=type(self).__name__) as pdf_ingestion_engine:
+            pdf_paths: list[str] = pdf_ingestion_engine.list_pdf_paths()
+            self.current_element_count = 0
+            self.total_element_size = len(pdf_paths)
+            pdf_counter: int = 1
+
+            for pdf_path, lines in pdf_ingestion_engine.extract_in_order(pdf_paths):
+
+                if self.terminated is True:
+                    return
+
+                with self.pause_condition:
+
+                    while self.paused:
+                        self.pause_condition.wait()
+
+                    if self.terminated is True:
+                        return
+
+                logger.info("File name : {} PDF counter  = {}".format(os.path.basename(pdf_path), pdf_counter))
+                pdf_ingestion_engine.write(pdf_path, lines)
+                self.increase_current_element_count()
+                pdf_counter += 1
+
+        logger.info('Closed excel file - Done')
@@ -6,7 +6,7 @@ from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row
+from src.common.FileUtil import get_excel_records_start_at_row, ExcelInputRecord
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.AutomatedTask import AutomatedTask
 
@@ -75,42 +75,32 @@ class Release(AutomatedTask):
                 continue
 
         # get cneebecode
-        becodes: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                   self._settings['excel.sheet'],
-                                                                   self._settings[
-                                                                       'excel.column.becode'])
-        so_numbers: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                      self._settings['excel.sheet'],
-                                                                      self._settings['excel.column.so'])
-        becode_to_sonumber: dict[str, str] = {}
-
-        if not len(becodes) == len(so_numbers):
+        records: list[ExcelInputRecord] = get_excel_records_start_at_row(
+            self._settings['excel.path'],
+            self._settings['excel.sheet'],
+            {'becode': self._settings['excel.column.becode'], 'so': self._settings['excel.column.so']})
+        if not all(record.is_complete() for record in records):
             raise Exception('be_codes and so_numbers do not have thhe same length')
 
+        becodes: list[str] = [record['becode'] for record in records]
+        so_numbers: list[str] = [record['so'] for record in records]
+        becode_to_sonumber: dict[str, str] = {}
+
         # Processing to upload
         index = 0
         for becode in becodes:
             becode_to_sonumber[becode] = so_numbers[index]
             index += 1
 
-        for becode, so_number in becode_to_sonumber.items():
-
-            if self.terminated is True:
-                return
-
-            with self.pause_condition:
-
-                while self.paused:
-                    self.pause_condition.wait()
-
-                if self.terminated is True:
-                    return
-
-            self._release(becode, so_number)
+        self.perform_mainloop_on_collection(list(becode_to_sonumber.items()),
+                                            lambda becode_and_so_number: self._release(*becode_and_so_number),
+                                            key_of_element=lambda becode_and_so_number: becode_and_so_number[1])
+        if self.terminated is True:
+            return
 
         logger.info("Complete Upload")
 
-        self._driver.close()
+        self._release_driver()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
@@ -155,8 +145,9 @@ class Release(AutomatedTask):
 
         logger.info('Go to next page successfully')
 
-        self._click_when_element_present(by=By.CSS_SELECTOR, value='#template #row0 td:nth-child(2) input',
-                                         time_sleep=2)
+        # the rows of the previous search may still be there until the new results are loaded
+        time.sleep(2 * self._timingFactor)
+        self._click_when_element_present(by=By.CSS_SELECTOR, value='#template #row0 td:nth-child(2) input')
         logger.info('clicked CBL box')
 
         self._click_when_element_present(by=By.CSS_SELECTOR, value='#moreOptionSo button')
@@ -8,7 +8,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row
+from src.common.FileUtil import get_excel_records_start_at_row, ExcelInputRecord
 from src.common.ResourceLock import ResourceLock
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.AutomatedTask import AutomatedTask
@@ -77,43 +77,45 @@ class Upload(AutomatedTask):
                 try_attempt_count += 1
                 continue
 
-        # get cneebecode
-        becodes: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                   self._settings['excel.sheet'],
-                                                                   self._settings[
-                                                                       'excel.column.becode'])
-        so_numbers: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                      self._settings['excel.sheet'],
-                                                                      self._settings['excel.column.so'])
-        becode_to_sonumber: dict[str, str] = {}
+        # in a pipeline, the (so number, becode) come from the download task as soon as their folder is ready
+        if self.input_pipe is not None:
+            self.perform_mainloop_on_collection(self.input_pipe,
+                                                lambda so_number_and_becode: self._upload(*so_number_and_becode),
+                                                key_of_element=lambda so_number_and_becode: so_number_and_becode[0])
+            if self.terminated is True:
+                return
 
-        if not len(so_numbers) == len(becodes):
+            logger.info("Complete Upload")
+            self._release_driver()
+            return
+
+        # get cneebecode
+        records: list[ExcelInputRecord] = get_excel_records_start_at_row(
+            self._settings['excel.path'],
+            self._settings['excel.sheet'],
+            {'becode': self._settings['excel.column.becode'], 'so': self._settings['excel.column.so']})
+        if not all(record.is_complete() for record in records):
             raise Exception('be_codes and so_numbers do not have thhe same length')
 
+        becodes: list[str] = [record['becode'] for record in records]
+        so_numbers: list[str] = [record['so'] for record in records]
+        becode_to_sonumber: dict[str, str] = {}
+
         # Processign to upload
         index = 0
         for so_number in so_numbers:
             becode_to_sonumber[so_number] = becodes[index]
             index += 1
 
-        for so_number, becode in becode_to_sonumber.items():
-
-            if self.terminated is True:
-                return
-
-            with self.pause_condition:
-
-                while self.paused:
-                    self.pause_condition.wait()
-
-                if self.terminated is True:
-                    return
-
-            self._upload(so_number, becode)
+        self.perform_mainloop_on_collection(list(becode_to_sonumber.items()),
+                                            lambda so_number_and_becode: self._upload(*so_number_and_becode),
+                                            key_of_element=lambda so_number_and_becode: so_number_and_becode[0])
+        if self.terminated is True:
+            return
 
         logger.info("Complete Upload")
 
-        self._driver.close()
+        self._release_driver()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
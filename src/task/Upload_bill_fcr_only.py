@@ -8,7 +8,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions
 
-from src.common.FileUtil import get_excel_data_in_column_start_at_row
+from src.common.FileUtil import get_excel_records_start_at_row, ExcelInputRecord
 from src.common.ResourceLock import ResourceLock
 from src.common.ThreadLocalLogger import get_current_logger
 from src.task.AutomatedTask import AutomatedTask
@@ -73,18 +73,17 @@ class Upload_bill_fcr_only(AutomatedTask):
                 continue
 
         # get cneebecode
-        becodes: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                   self._settings['excel.sheet'],
-                                                                   self._settings[
-                                                                       'excel.column.becode'])
-        so_numbers: list[str] = get_excel_data_in_column_start_at_row(self._settings['excel.path'],
-                                                                      self._settings['excel.sheet'],
-                                                                      self._settings['excel.column.so'])
-        becode_to_sonumber: dict[str, str] = {}
-
-        if not len(so_numbers) == len(becodes):
+        records: list[ExcelInputRecord] = get_excel_records_start_at_row(
+            self._settings['excel.path'],
+            self._settings['excel.sheet'],
+            {'becode': self._settings['excel.column.becode'], 'so': self._settings['excel.column.so']})
+        if not all(record.is_complete() for record in records):
             raise Exception('be_codes and so_numbers do not have thhe same length')
 
+        becodes: list[str] = [record['becode'] for record in records]
+        so_numbers: list[str] = [record['so'] for record in records]
+        becode_to_sonumber: dict[str, str] = {}
+
         # Processign to upload
         index = 0
         for so_number in so_numbers:
@@ -108,7 +107,7 @@ class Upload_bill_fcr_only(AutomatedTask):
 
         logger.info("Complete Upload")
 
-        self._driver.close()
+        self._release_driver()
         logger.info(
             "---------------------------------------------------------------------------------------------------------")
         logger.info("End processing")
@@ -0,0 +1,59 @@
+import os
+import tempfile
+
+import openpyxl
+
+from src.excel_reader_provider.BufferedExcelReaderProvider import BufferedExcelReaderProvider
+from src.excel_reader_provider.OpenpyxlProvider import OpenpyxlProvider
+
+
+class CountingProvider(OpenpyxlProvider):
+
+    def __init__(self):
+        super().__init__()
+        self.block_writes: list[tuple[int, int, list[list]]] = []
+        self.save_count: int = 0
+
+    def change_values_at(self, worksheet, row, column, values: list[list]):
+        self.block_writes.append((row, column, values))
+        return super().change_values_at(worksheet, row, column, values)
+
+    def save(self, workbook):
+        self.save_count += 1
+        super().save(workbook)
+
+
+if __name__ == "__main__":
+    workbook_path: str = os.path.join(tempfile.mkdtemp(), 'status.xlsx')
+    new_workbook = openpyxl.Workbook()
+    new_workbook.active.title = 'Status'
+    new_workbook.save(workbook_path)
+
+    # one column of 3 cells plus one row of 4 cells, written cell by cell, become 2 block writes
+    assert BufferedExcelReaderProvider.merge_into_blocks({(1, 1): 'a', (2, 1): 'b', (3, 1): 'c',
+                                                          (5, 3): 1, (5, 4): 2, (5, 5): 3, (5, 6): 4}) \
+           == [(1, 1, [['a'], ['b'], ['c']]), (5, 3, [[1, 2, 3, 4]])]
+
+    counting_provider: CountingProvider = CountingProvider()
+    provider: BufferedExcelReaderProvider = BufferedExcelReaderProvider(counting_provider, save_every=3)
+    workbook = provider.get_workbook(workbook_path)
+    worksheet = provider.get_worksheet(workbook, 'Status')
+
+    for item_index in range(7):
+        for line_index in range(50):
+            provider.change_value_at(worksheet, row=line_index + 1, column=item_index + 1, value=line_index)
+        provider.save(workbook)
+
+    # the pending changes are visible before they are written
+    assert provider.get_value_at(worksheet, row=50, column=7) == 49
+    assert counting_provider.save_count == 2, counting_provider.save_count
+
+    provider.close(workbook)
+    assert counting_provider.save_count == 3, counting_provider.save_count
+    assert len(counting_provider.block_writes) <= 3, counting_provider.block_writes
+
+    saved_worksheet = openpyxl.load_workbook(workbook_path)['Status']
+    assert saved_worksheet.cell(row=50, column=7).value == 49
+    assert saved_worksheet.cell(row=1, column=1).value == 0
+
+    print('Buffered excel provider works as expected')
@@ -0,0 +1,55 @@
+import os
+import tempfile
+
+from src.common.CheckpointJournal import CheckpointJournal
+
+if __name__ == "__main__":
+    journal_folder: str = tempfile.mkdtemp()
+    input_file: str = os.path.join(journal_folder, 'input.xlsx')
+    items: list[str] = ['bill_{}'.format(index) for index in range(10)]
+
+    # first run crashes after 4 items, one of them failed
+    journal = CheckpointJournal('ExampleTask', input_file, journal_folder)
+    journal.mark_done('bill_0')
+    journal.mark_done('bill_1')
+    journal.mark_failed('bill_2')
+    journal.mark_done('bill_3')
+    journal.close()
+
+    # a torn line written while the tool was crashing must not break the reload
+    with open(journal.journal_path, 'a') as journal_stream:
+        journal_stream.write('DON')
+
+    journal = CheckpointJournal('ExampleTask', input_file, journal_folder)
+    assert journal.pending(items) == ['bill_2'] + items[4:], journal.pending(items)
+    assert journal.pending(items, only_failed=True) == ['bill_2']
+
+    # the other task or input file has its own journal
+    assert CheckpointJournal('Duty', input_file, journal_folder).pending(items) == items
+
+    journal.mark_done('bill_2')
+    journal.close()
+    journal = CheckpointJournal('ExampleTask', input_file, journal_folder)
+    assert journal.pending(items, only_failed=True) == [], "The record after a torn line was lost!"
+
+    for item in items[4:]:
+        journal.mark_done(item)
+    assert journal.pending(items) == []
+
+    journal.complete()
+    assert not os.path.exists(journal.journal_path), "The journal of a completed run wasn't removed!"
+
+    # the journal of other input items is started over, the one of the same items is resumed
+    fingerprint: str = CheckpointJournal.fingerprint_of(items)
+    journal = CheckpointJournal('ExampleTask', input_file, journal_folder, input_fingerprint=fingerprint)
+    journal.mark_done('bill_0')
+    journal.close()
+    journal = CheckpointJournal('ExampleTask', input_file, journal_folder, input_fingerprint=fingerprint)
+    assert journal.pending(items) == items[1:], journal.pending(items)
+    journal.close()
+    edited_items: list[str] = ['bill_0'] + ['new_bill_{}'.format(index) for index in range(3)]
+    journal = CheckpointJournal('ExampleTask', input_file, journal_folder,
+                                input_fingerprint=CheckpointJournal.fingerprint_of(edited_items))
+    assert journal.pending(edited_items) == edited_items, "The journal of an edited input was resumed!"
+    journal.close()
+    print('Checkpoint journal works as expected')
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from src.common.DocumentFetcher import DocumentFetcher
+
+
+class StandInPortalHandler(BaseHTTPRequestHandler):
+    # serves /doc/<n> only to the holder of the session cookie, like the portal does
+    def do_GET(self):
+        if self.path.startswith('/auth'):
+            # echoes whether the credentials were sent
+            content: bytes = str(self.headers.get('Authorization') is not None).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+
+        if 'ASP.NET_SessionId=abc' not in str(self.headers.get('Cookie')):
+            self.send_response(403)
+            self.end_headers()
+            return
+
+        document_id: str = self.path.split('/')[-1]
+        content: bytes = 'document {}'.format(document_id).encode('utf-8') * 10000
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInPortalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url: str = 'http://127.0.0.1:{}'.format(server.server_address[1])
+    download_folder: str = tempfile.mkdtemp()
+
+    # the cookie shape returned by selenium's get_cookies()
+    cookies: list[dict] = [{'name': 'ASP.NET_SessionId', 'value': 'abc', 'domain': '127.0.0.1', 'path': '/'}]
+    url_to_file_path: dict[str, str] = {'{}/doc/{}'.format(base_url, index): os.path.join(download_folder,
+                                                                                      '{}.pdf'.format(index))
+                                        for index in range(20)}
+
+    with DocumentFetcher(cookies=cookies, max_workers=4) as fetcher:
+        url_to_failure = fetcher.fetch_all(url_to_file_path)
+
+    assert len(url_to_failure) == 0, url_to_failure
+    for url, file_path in url_to_file_path.items():
+        with open(file_path, 'rb') as document:
+            assert document.read() == 'document {}'.format(url.split('/')[-1]).encode('utf-8') * 10000
+
+    # without the browser's cookies the portal refuses, nothing is left behind
+    with DocumentFetcher(cookies=[], max_workers=2) as fetcher:
+        denied_file_path: str = os.path.join(download_folder, 'denied.pdf')
+        url_to_failure = fetcher.fetch_all({'{}/doc/denied'.format(base_url): denied_file_path})
+
+    assert len(url_to_failure) == 1
+    assert not os.path.exists(denied_file_path) and not os.path.exists(denied_file_path + '.part')
+
+    # the credentials only go to the auth host
+    with DocumentFetcher(cookies=[], auth=('user', 'secret'), auth_host='127.0.0.1') as fetcher:
+        portal_file_path: str = os.path.join(download_folder, 'portal.txt')
+        other_host_file_path: str = os.path.join(download_folder, 'other_host.txt')
+        url_to_failure = fetcher.fetch_all({'{}/auth'.format(base_url): portal_file_path,
+                                            'http://localhost:{}/auth'.format(server.server_address[1]):
+                                                other_host_file_path})
+
+    assert len(url_to_failure) == 0, url_to_failure
+    with open(portal_file_path, 'rb') as document:
+        assert document.read() == b'True'
+    with open(other_host_file_path, 'rb') as document:
+        assert document.read() == b'False'
+
+    server.shutdown()
+    print('Document fetcher works as expected')
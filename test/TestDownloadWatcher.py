@@ -0,0 +1,58 @@
+import os
+import tempfile
+import threading
+import time
+
+from src.common.DownloadWatcher import DownloadWatcher, DownloadTimeoutException
+
+
+def download_slowly(file_path: str, chunk_count: int) -> None:
+    # as a browser does: the chunks go into a partial file which is renamed once complete
+    partial_path: str = file_path + '.crdownload'
+    with open(partial_path, 'wb') as partial_file:
+        for _ in range(chunk_count):
+            partial_file.write(b'x' * 1024)
+            partial_file.flush()
+            time.sleep(0.05)
+    os.rename(partial_path, file_path)
+
+
+def write_later(file_path: str, content: bytes, delay: float) -> None:
+    time.sleep(delay)
+    with open(file_path, 'wb') as written_file:
+        written_file.write(content)
+
+
+if __name__ == "__main__":
+    download_folder: str = tempfile.mkdtemp()
+    with DownloadWatcher(download_folder, stable_time=0.2) as watcher:
+        # a file is only complete once its partial download is renamed into it and it stays stable
+        file_paths: list[str] = [os.path.join(download_folder, 'BL00{}.zip'.format(index)) for index in range(3)]
+        download_threads: list[threading.Thread] = [threading.Thread(target=download_slowly, args=(file_path, 10))
+                                                    for file_path in file_paths]
+        for download_thread in download_threads:
+            download_thread.start()
+        assert watcher.wait_for_files(file_paths, timeout=10) == file_paths
+        for file_path in file_paths:
+            assert os.path.getsize(file_path) == 10 * 1024, "A partial download was reported as complete!"
+        for download_thread in download_threads:
+            download_thread.join()
+
+        # an empty file is not complete, the wait times out naming it
+        empty_path: str = os.path.join(download_folder, 'empty.pdf')
+        open(empty_path, 'w').close()
+        started_at: float = time.time()
+        try:
+            watcher.wait_for_files([empty_path], timeout=0.5)
+            raise AssertionError("An empty file was reported as complete!")
+        except DownloadTimeoutException as exception:
+            assert 'empty.pdf' in str(exception), exception
+        assert time.time() - started_at < 2, "The wait went on after its timeout!"
+
+        # any file with the extension, apart from the ignored ones and the partial downloads
+        threading.Thread(target=write_later, args=(os.path.join(download_folder, 'invoice.pdf'), b'%PDF', 0.3)).start()
+        with open(os.path.join(download_folder, 'ignored.pdf.crdownload'), 'wb') as partial_file:
+            partial_file.write(b'x')
+        assert watcher.wait_for_any_file(timeout=10, extension='.PDF', ignored_file_names={'empty.pdf'}) \
+               == 'invoice.pdf'
+    print('Download watcher works as expected')
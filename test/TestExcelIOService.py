@@ -0,0 +1,83 @@
+import os
+import tempfile
+import threading
+
+import openpyxl
+
+from src.excel_reader_provider.ExcelIOService import ExcelIOClient, ExcelIOService
+from src.excel_reader_provider.OpenpyxlProvider import OpenpyxlProvider
+
+
+class CountingProvider(OpenpyxlProvider):
+    save_count: int = 0
+
+    def save(self, workbook):
+        CountingProvider.save_count += 1
+        super().save(workbook)
+
+
+def create_provider(provider_name: str) -> OpenpyxlProvider:
+    return CountingProvider()
+
+
+def write_statuses(workbook_path: str, column: int, row_count: int) -> None:
+    client: ExcelIOClient = ExcelIOClient('openpyxl', create_provider)
+    workbook = client.get_workbook(workbook_path)
+    worksheet = client.get_worksheet(workbook, 'Status')
+    for row in range(1, row_count + 1):
+        client.change_value_at(worksheet, row, column, 'Done {}'.format(row))
+        client.save(workbook)
+    client.close(workbook)
+    client.quit_session()
+
+
+def fail_to_initialize_com():
+    raise Exception('CoInitialize failed')
+
+
+if __name__ == "__main__":
+    workbook_path: str = os.path.join(tempfile.mkdtemp(), 'status.xlsx')
+    new_workbook = openpyxl.Workbook()
+    new_workbook.active.title = 'Status'
+    new_workbook.save(workbook_path)
+
+    # two tasks write into the same workbook at the same time through the one service thread
+    task_threads: list[threading.Thread] = [threading.Thread(target=write_statuses, args=(workbook_path, column, 50))
+                                            for column in (1, 2)]
+    for task_thread in task_threads:
+        task_thread.start()
+    for task_thread in task_threads:
+        task_thread.join()
+
+    saved_workbook = openpyxl.load_workbook(workbook_path)
+    for column in (1, 2):
+        assert [saved_workbook['Status'].cell(row, column).value for row in range(1, 51)] \
+               == ['Done {}'.format(row) for row in range(1, 51)], "A status was lost!"
+    assert CountingProvider.save_count <= 100, CountingProvider.save_count
+    assert ExcelIOService._instance is None, "The service wasn't stopped by the release of its last client!"
+
+    # the service of a client never released is stopped by shutdown, the client fails instead of waiting then
+    client: ExcelIOClient = ExcelIOClient('openpyxl', create_provider)
+    workbook = client.get_workbook(workbook_path)
+    client.change_value_at(client.get_worksheet(workbook, 'Status'), 1, 3, 'Shutdown')
+    client.save(workbook)
+    ExcelIOService.shutdown()
+    assert ExcelIOService._instance is None
+    assert openpyxl.load_workbook(workbook_path)['Status'].cell(1, 3).value == 'Shutdown'
+    try:
+        client.change_value_at(client.get_worksheet(workbook, 'Status'), 1, 3, 'Too late')
+        raise AssertionError("A call to the stopped service didn't fail!")
+    except Exception as exception:
+        assert 'stopped' in str(exception), exception
+    client.quit_session()
+
+    # a service thread which dies outside of a command fails its callers instead of blocking them forever
+    ExcelIOService._ExcelIOService__initialize_com = staticmethod(fail_to_initialize_com)
+    client = ExcelIOClient('openpyxl', create_provider)
+    try:
+        client.get_workbook(workbook_path)
+        raise AssertionError("A call to the dead service didn't fail!")
+    except Exception as exception:
+        assert 'stopped' in str(exception), exception
+    client.quit_session()
+    print('Excel IO service works as expected')
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import zipfile
+
+from src.common.FileUtil import extract_zip
+from src.task.Download_CottonOn import Download_CottonOn
+
+
+def write_zip(zip_file_path: str, member_to_content: dict[str, str]) -> None:
+    with zipfile.ZipFile(zip_file_path, 'w') as zip_ref:
+        for member_name, content in member_to_content.items():
+            zip_ref.writestr(member_name, content)
+
+
+def read_folder(folder: str) -> dict[str, str]:
+    file_to_content: dict[str, str] = {}
+    for file_name in os.listdir(folder):
+        with open(os.path.join(folder, file_name)) as file_stream:
+            file_to_content[file_name] = file_stream.read()
+
+    return file_to_content
+
+
+if __name__ == "__main__":
+    download_folder: str = tempfile.mkdtemp()
+    extracted_folders: list[str] = []
+
+    # the booking documents of CottonOn: only the invoices and the packing list are wanted, the second invoice
+    # is mapped to the same name as the first one
+    zip_file_path: str = os.path.join(download_folder, 'BK001.zip')
+    write_zip(zip_file_path, {'BK001/Commercial Invoice 1.pdf': 'invoice 1',
+                              'BK001/Commercial Invoice 2.pdf': 'invoice 2',
+                              'BK001/Packing List.pdf': 'packing list',
+                              'BK001/Bill of Lading.pdf': 'bill of lading',
+                              'BK001/docs/': ''})
+    extract_zip(zip_file_path, download_folder, None, extracted_folders.append,
+                member_filter=Download_CottonOn.is_wanted_document,
+                member_name_mapping=lambda member_name: Download_CottonOn.document_name_of(member_name, 'SO001'),
+                extracted_folder_name='SO001')
+
+    so_folder: str = os.path.join(download_folder, 'SO001')
+    assert extracted_folders == [so_folder], extracted_folders
+    assert read_folder(so_folder) == {'SO001_INV.pdf': 'invoice 1',
+                                      'SO001_INV_2.pdf': 'invoice 2',
+                                      'SO001_PKL.pdf': 'packing list'}, read_folder(so_folder)
+    assert not os.path.exists(zip_file_path), "The extracted zip wasn't deleted!"
+
+    # with a filter only, the wanted members keep their path in the zip
+    zip_file_path = os.path.join(download_folder, 'BK002.zip')
+    write_zip(zip_file_path, {'Invoice.pdf': 'invoice', 'Bill of Lading.pdf': 'bill of lading'})
+    extract_zip(zip_file_path, download_folder, None, None,
+                member_filter=Download_CottonOn.is_wanted_document, extracted_folder_name='SO002')
+    assert read_folder(os.path.join(download_folder, 'SO002')) == {'Invoice.pdf': 'invoice'}
+
+    # a member mapped out of the extracted folder is refused
+    zip_file_path = os.path.join(download_folder, 'BK003.zip')
+    write_zip(zip_file_path, {'Invoice.pdf': 'invoice'})
+    try:
+        extract_zip(zip_file_path, download_folder, None, None,
+                    member_name_mapping=lambda member_name: '../' + member_name, extracted_folder_name='SO003')
+        raise AssertionError("A member was extracted out of its folder!")
+    except Exception as exception:
+        assert 'out of' in str(exception), exception
+    assert not os.path.exists(os.path.join(download_folder, 'Invoice.pdf'))
+    print('Extract zip works as expected')
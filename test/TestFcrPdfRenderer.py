@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+from PyPDF2 import PdfReader
+
+from src.common.FcrPdfRenderer import FcrPdfRenderer, render_fcr_text_file
+
+if __name__ == "__main__":
+    lines: list[str] = ['HEADER 1',
+                        'HEADER 2',
+                        'HEADER 3',
+                        '  FORWARDER CARGO RECEIPT  ',
+                        'FCR NUMBER ' + 'X' * 100,
+                        '1`1B control sequence',
+                        'Receipt of the goods in apparent good order and condition',
+                        'Shipper: ACME',
+                        'Attachment',
+                        'Container list',
+                        '1 `1 trailing control']
+    assert FcrPdfRenderer.rows_of(lines) == [('', False),
+                                             ('FORWARDER CARGO RECEIPT', False),
+                                             (('FCR NUMBER ' + 'X' * 100)[:80], False),
+                                             ('', False),
+                                             ('Receipt of the goods in apparent g', False),
+                                             ('Shipper: ACME', True),
+                                             ('Attachment', False),
+                                             ('Container list', False),
+                                             ('', False)]
+
+    # an Attachment right at the start of the page doesn't open an empty page, a text shorter than the header is blank
+    assert FcrPdfRenderer.rows_of(['H1', 'H2', 'H3', 'Attachment']) == [('', False), ('Attachment', False)]
+    assert FcrPdfRenderer.rows_of(['H1', 'H2']) == [('', False)]
+
+    # the rendered PDF has a page per Attachment, a form feed doesn't shift the lines
+    txt_path: str = os.path.join(tempfile.mkdtemp(), 'FCR001.txt')
+    with open(txt_path, 'w', encoding='cp1252') as txt_file:
+        txt_file.write('\n'.join(lines[:7] + ['Shipper: ACME\x0c café', 'Attachment', 'Container list']) + '\n')
+    pdf_path: str = render_fcr_text_file(txt_path, os.path.join(tempfile.mkdtemp(), 'pdf', 'FCR001.pdf'))
+    pages = PdfReader(pdf_path).pages
+    assert len(pages) == 2, len(pages)
+    assert 'FORWARDER CARGO RECEIPT' in pages[0].extract_text()
+    assert 'Container list' in pages[1].extract_text() and 'Attachment' in pages[1].extract_text()
+    print('FCR PDF renderer works as expected')
@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+from PyPDF2 import PdfReader, PdfWriter
+from fpdf import FPDF
+
+from src.common.PrefixIndex import PrefixIndex
+from src.task.PDFCombine_KH import PDFCombine_KH
+
+
+def write_pdf(file_path: str, text: str) -> None:
+    pdf: FPDF = FPDF()
+    pdf.add_page()
+    pdf.set_font('Courier', size=10)
+    pdf.cell(0, 5, text, ln=1)
+    pdf.output(file_path, 'F')
+
+
+def texts_of(file_path: str) -> list[str]:
+    return [page.extract_text().strip() for page in PdfReader(file_path).pages]
+
+
+def combine(document_to_folder: dict[str, str], combine_folder: str, bills: list[str], max_workers: int,
+            write_bill_files: bool) -> list[list[int]]:
+    settings: dict[str, str] = {'invoked_class': 'PDFCombine_KH', 'checkpoint.mode': 'off',
+                                'folder_payment_slip.folder': document_to_folder['PS'],
+                                'folder_wy.folder': document_to_folder['WY'],
+                                'folder_inv.folder': document_to_folder['INV'],
+                                'folder_cheque_request.folder': document_to_folder['CR'],
+                                'folder_combine.folder': combine_folder}
+    task: PDFCombine_KH = PDFCombine_KH(settings, None)
+    task._folder_indexes = {folder: PrefixIndex(folder) for folder in document_to_folder.values()}
+
+    combined_writer: PdfWriter = PdfWriter()
+    counts_of_bills: list[list[int]] = []
+    for bill, counts in task.merge_pdfs_of_bills(bills, max_workers, write_bill_files):
+        counts_of_bills.append(counts)
+        task.append_bill_to_combined(combined_writer, bill)
+    task.write_combined(combined_writer, bills, write_bill_files)
+    return counts_of_bills
+
+
+if __name__ == "__main__":
+    # one folder per kind of document, merged in the order cheque request, payment slip, WY then invoice
+    documents: list[str] = ['CR', 'PS', 'WY', 'INV']
+    document_to_folder: dict[str, str] = {document: tempfile.mkdtemp() for document in documents}
+    bills: list[str] = ['B{}'.format(index) for index in range(6)]
+    for bill in bills:
+        for document in documents:
+            write_pdf(os.path.join(document_to_folder[document], '{}_{}.pdf'.format(bill, document)),
+                      '{} {}'.format(bill, document))
+    expected_texts: list[str] = ['{} {}'.format(bill, document) for bill in bills for document in documents]
+
+    # combine.bill.files = False (the default): the bills go straight into Combined.pdf, no process pool
+    combine_folder: str = tempfile.mkdtemp()
+    counts_of_bills: list[list[int]] = combine(document_to_folder, combine_folder, bills, 4, write_bill_files=False)
+    assert counts_of_bills == [[1, 1, 1, 1]] * len(bills), counts_of_bills
+    assert texts_of(os.path.join(combine_folder, 'Combined.pdf')) == expected_texts
+    assert os.listdir(combine_folder) == ['Combined.pdf'], os.listdir(combine_folder)
+
+    # combine.bill.files = True: the bill files are merged on the process pool, Combined.pdf is the same
+    combine_folder = tempfile.mkdtemp()
+    counts_of_bills = combine(document_to_folder, combine_folder, bills, 4, write_bill_files=True)
+    assert counts_of_bills == [[1, 1, 1, 1]] * len(bills), counts_of_bills
+    assert texts_of(os.path.join(combine_folder, 'Combined.pdf')) == expected_texts
+    for bill in bills:
+        assert texts_of(os.path.join(combine_folder, '{}.pdf'.format(bill))) == ['{} {}'.format(bill, document)
+                                                                                 for document in documents]
+    print('PDFCombine_KH works as expected')
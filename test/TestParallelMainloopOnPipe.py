@@ -0,0 +1,49 @@
+import threading
+import time
+
+from src.common.TaskPipe import TaskPipe
+from src.task.AutomatedTask import AutomatedTask
+
+
+class ConsumerTask(AutomatedTask):
+
+    def __init__(self, settings: dict[str, str]):
+        super().__init__(settings, None)
+        self.consumed_elements: list[int] = []
+        self.__consumed_lock: threading.Lock = threading.Lock()
+
+    def mandatory_settings(self) -> list[str]:
+        return []
+
+    def automate(self) -> None:
+        self.perform_mainloop_on_collection(self.input_pipe, self.consume)
+
+    def consume(self, element: int) -> None:
+        time.sleep(0.01)
+        with self.__consumed_lock:
+            self.consumed_elements.append(element)
+
+
+def fill_late(task_pipe: TaskPipe, element_count: int) -> None:
+    # the producer only starts after the consumer, as in the pipeline runner
+    time.sleep(0.5)
+    task_pipe.expected_size = element_count
+    for element in range(element_count):
+        task_pipe.put(element)
+    task_pipe.close()
+
+
+if __name__ == "__main__":
+    consumer: ConsumerTask = ConsumerTask({'invoked_class': 'ConsumerTask',
+                                           'parallel.sessions': '3',
+                                           'checkpoint.mode': 'off'})
+    consumer.input_pipe = TaskPipe(max_size=4)
+
+    producer_thread: threading.Thread = threading.Thread(target=fill_late, args=(consumer.input_pipe, 50))
+    producer_thread.start()
+    consumer.automate()
+    producer_thread.join()
+
+    assert sorted(consumer.consumed_elements) == list(range(50)), "The late filled pipe wasn't drained!"
+    assert consumer.total_element_size == 50, consumer.total_element_size
+    print('Parallel mainloop on a pipe works as expected')
@@ -0,0 +1,66 @@
+import hashlib
+import os
+import tempfile
+
+from src.pdf_ingestion.PdfTextCache import PdfTextCache
+
+
+def key_of(name: str) -> bytes:
+    return hashlib.sha256(name.encode('utf-8')).digest()
+
+
+if __name__ == "__main__":
+    cache_folder: str = tempfile.mkdtemp()
+
+    # first run: the records are found as soon as they are put, before the index is written
+    cache: PdfTextCache = PdfTextCache('invoices', cache_folder)
+    for index in range(0, 100, 2):
+        cache.put(key_of('pdf_{}'.format(index)), ['Invoice {}'.format(index), 'Total: {} USD'.format(index)])
+    cache.put(key_of('blank'), [])
+    assert cache.get(key_of('pdf_10')) == ['Invoice 10', 'Total: 10 USD']
+    assert cache.get(key_of('blank')) == []
+    assert cache.get(key_of('pdf_1')) is None
+    cache.close()
+    assert (os.path.getsize(cache.index_path) - len(PdfTextCache.INDEX_MAGIC)) \
+           == 51 * PdfTextCache.INDEX_ENTRY.size, "The index doesn't hold one entry per PDF!"
+
+    # second run: the new records are merged with the indexed ones, a PDF put again takes its new lines
+    cache = PdfTextCache('invoices', cache_folder)
+    assert cache.get(key_of('pdf_98')) == ['Invoice 98', 'Total: 98 USD']
+    for index in range(1, 100, 2):
+        cache.put(key_of('pdf_{}'.format(index)), ['Invoice {}'.format(index)])
+    cache.put(key_of('pdf_0'), ['Invoice 0', 'Credit note'])
+    assert cache.get(key_of('pdf_0')) == ['Invoice 0', 'Credit note']
+    cache.close()
+
+    cache = PdfTextCache('invoices', cache_folder)
+    for index in range(1, 100):
+        expected_lines: list[str] = ['Invoice {}'.format(index)] if index % 2 == 1 \
+            else ['Invoice {}'.format(index), 'Total: {} USD'.format(index)]
+        assert cache.get(key_of('pdf_{}'.format(index))) == expected_lines, index
+    assert cache.get(key_of('pdf_0')) == ['Invoice 0', 'Credit note'], "The old record won over the new one!"
+    assert cache.get(key_of('blank')) == []
+    assert cache.get(key_of('pdf_100')) is None
+    assert (cache.hits, cache.misses) == (101, 1), (cache.hits, cache.misses)
+    cache.close()
+    assert (os.path.getsize(cache.index_path) - len(PdfTextCache.INDEX_MAGIC)) \
+           == 101 * PdfTextCache.INDEX_ENTRY.size, "A PDF put twice is indexed twice!"
+
+    # the key changes with the content of the PDF and with the extractor signature
+    pdf_path: str = os.path.join(cache_folder, 'invoice.pdf')
+    with open(pdf_path, 'wb') as pdf_stream:
+        pdf_stream.write(b'%PDF-1.4 first')
+    first_key: bytes = PdfTextCache.key_of(pdf_path, 'extractor-1')
+    assert first_key == PdfTextCache.key_of(pdf_path, 'extractor-1')
+    assert first_key != PdfTextCache.key_of(pdf_path, 'extractor-2')
+    with open(pdf_path, 'wb') as pdf_stream:
+        pdf_stream.write(b'%PDF-1.4 second')
+    assert first_key != PdfTextCache.key_of(pdf_path, 'extractor-1')
+
+    # a corrupt index is ignored along with the records it pointed to
+    with open(cache.index_path, 'wb') as index_stream:
+        index_stream.write(b'NOTANIDX')
+    cache = PdfTextCache('invoices', cache_folder)
+    assert cache.get(key_of('pdf_0')) is None
+    cache.close()
+    print('PDF text cache works as expected')
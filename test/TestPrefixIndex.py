@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+from src.common.PrefixIndex import PrefixIndex
+
+if __name__ == "__main__":
+    folder: str = tempfile.mkdtemp()
+    for file_name in ('B12_INV.pdf', 'B1_CR.pdf', 'B1_INV.pdf', 'B1_PS.PDF', 'B2_CR.pdf', 'B1_notes.txt', 'A1_CR.pdf'):
+        open(os.path.join(folder, file_name), 'w').close()
+
+    prefix_index: PrefixIndex = PrefixIndex(folder)
+    listed_names: list[str] = os.listdir(folder)
+    assert prefix_index.names() == listed_names
+
+    # the files of a prefix come in the order of the listing, a longer name sharing the prefix is found too
+    assert prefix_index.names_starting_with('B1_') == [name for name in listed_names if name.startswith('B1_')]
+    assert sorted(prefix_index.names_starting_with('B1')) == ['B12_INV.pdf', 'B1_CR.pdf', 'B1_INV.pdf', 'B1_PS.PDF',
+                                                               'B1_notes.txt']
+    assert prefix_index.names_starting_with('B3') == []
+    assert prefix_index.names_starting_with('') == listed_names
+    assert prefix_index.count_starting_with('B1_', ('.pdf', '.PDF')) == 3
+    assert prefix_index.count_starting_with('B1_') == 4
+
+    # the files added and removed through the index, an added file goes at the end of the listing
+    prefix_index.add('B1_WY.pdf')
+    prefix_index.add('B1_WY.pdf')
+    assert prefix_index.names()[-1] == 'B1_WY.pdf' and prefix_index.names().count('B1_WY.pdf') == 1
+    prefix_index.remove('B1_notes.txt')
+    prefix_index.remove('missing.pdf')
+    assert 'B1_notes.txt' not in prefix_index.names_starting_with('B1_')
+    assert prefix_index.count_starting_with('B1_') == 4
+
+    # a renamed file keeps its place in the listing order, on disk as in the index
+    position: int = prefix_index.names().index('B2_CR.pdf')
+    prefix_index.rename('B2_CR.pdf', 'B1_CR_2.pdf')
+    assert prefix_index.names()[position] == 'B1_CR_2.pdf'
+    assert prefix_index.names_starting_with('B2') == []
+    assert 'B1_CR_2.pdf' in prefix_index.names_starting_with('B1_')
+    assert os.path.exists(os.path.join(folder, 'B1_CR_2.pdf')) and not os.path.exists(os.path.join(folder, 'B2_CR.pdf'))
+    print('PrefixIndex works as expected')
@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+import openpyxl
+
+from src.common.StatusReconciliation import StatusReconciliation
+
+if __name__ == "__main__":
+    produced_folder: str = tempfile.mkdtemp()
+    for folder_name in ('BL001', 'BL003_REVISED'):
+        os.mkdir(os.path.join(produced_folder, folder_name))
+    # a file named as a bill doesn't count when only the folders are produced
+    open(os.path.join(produced_folder, 'BL004'), 'w').close()
+
+    reconciliation: StatusReconciliation = StatusReconciliation(
+        produced_folder=produced_folder,
+        produced_names_of_key=lambda bill: [bill, '{}_REVISED'.format(bill)],
+        only_folders=True)
+    bills: list[str] = ['BL001', 'BL002', 'BL003', 'BL004']
+    assert reconciliation.reconcile(bills) == (['BL001', 'BL003'], ['BL002', 'BL004'])
+
+    # the input workbook has a header, a blank row in the middle and a formatted but empty row at the end
+    excel_path: str = os.path.join(tempfile.mkdtemp(), 'input.xlsx')
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.title = 'Bills'
+    worksheet['A1'] = 'Bill'
+    worksheet['B1'] = 'Status'
+    for row, value in ((2, 'BL001'), (3, 'BL002'), (4, None), (5, '  '), (6, 'BL003'), (7, 'BL004')):
+        worksheet['A{}'.format(row)] = value
+    worksheet['B8'] = 'Untouched'
+    worksheet['A9'].number_format = '@'
+    workbook.save(excel_path)
+
+    output_path: str = os.path.join(tempfile.mkdtemp(), 'output.xlsx')
+    assert reconciliation.write_statuses(excel_path, 'Bills', 'A2', 'B', output_path) == (2, 2)
+
+    statuses: list[str] = [openpyxl.load_workbook(output_path)['Bills']['B{}'.format(row)].value
+                           for row in range(1, 10)]
+    assert statuses == ['Status', 'Done', 'Missing', None, None, 'Done', 'Missing', 'Untouched', None], statuses
+    assert openpyxl.load_workbook(excel_path)['Bills']['B2'].value is None, "The input workbook was written!"
+    print('Status reconciliation works as expected')
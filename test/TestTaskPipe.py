@@ -0,0 +1,71 @@
+import threading
+import time
+
+from src.common.TaskPipe import TaskPipe
+
+
+def produce(task_pipe: TaskPipe, elements: list[int], produced_elements: list[int]) -> None:
+    task_pipe.expected_size = len(elements)
+    for element in elements:
+        task_pipe.put(element)
+        produced_elements.append(element)
+    task_pipe.close()
+
+
+if __name__ == "__main__":
+    # the producer is held back by a full pipe, the consumer gets every element in order
+    task_pipe: TaskPipe = TaskPipe(max_size=2)
+    produced_elements: list[int] = []
+    producer_thread: threading.Thread = threading.Thread(target=produce,
+                                                         args=(task_pipe, list(range(20)), produced_elements))
+    producer_thread.start()
+    time.sleep(0.2)
+    assert len(produced_elements) <= 2, "The producer ran away from the consumer!"
+    assert task_pipe.wait_for_expected_size() == 20
+    assert list(task_pipe) == list(range(20))
+    producer_thread.join()
+    assert len(task_pipe) == 20
+
+    # nothing can be put into a closed pipe
+    try:
+        task_pipe.put(20)
+        raise AssertionError("An element was put into a closed pipe!")
+    except Exception as exception:
+        assert 'closed pipe' in str(exception), exception
+
+    # len() is the announced size, or the received count when more elements came than announced
+    task_pipe = TaskPipe()
+    task_pipe.expected_size = 1
+    assert task_pipe.is_expected_size_announced and len(task_pipe) == 1
+    task_pipe.put('a')
+    task_pipe.put('b')
+    task_pipe.close()
+    assert list(task_pipe) == ['a', 'b'] and len(task_pipe) == 2
+
+    # a pipe closed without any announcement doesn't keep its consumer waiting
+    task_pipe = TaskPipe()
+    task_pipe.close()
+    assert not task_pipe.is_expected_size_announced
+    assert task_pipe.wait_for_expected_size() == 0
+    assert list(task_pipe) == []
+
+    # the skipped elements are no longer expected
+    task_pipe = TaskPipe(max_size=10)
+    task_pipe.keep_only(lambda element: element % 2 == 0)
+    produce(task_pipe, list(range(10)), [])
+    assert list(task_pipe) == [0, 2, 4, 6, 8]
+    assert len(task_pipe) == 5, len(task_pipe)
+
+    # the consumer abandons the pipe, the producer blocked on a full pipe is released and its elements dropped
+    task_pipe = TaskPipe(max_size=1)
+    produced_elements = []
+    producer_thread = threading.Thread(target=produce, args=(task_pipe, list(range(10)), produced_elements))
+    producer_thread.start()
+    for element in task_pipe:
+        if element == 2:
+            task_pipe.abandon()
+    producer_thread.join(timeout=5)
+    assert not producer_thread.is_alive(), "The producer is still blocked on the abandoned pipe!"
+    assert produced_elements == list(range(10))
+    assert list(task_pipe) == []
+    print('TaskPipe works as expected')